@@ -0,0 +1,54 @@
+import hmac
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import PlainTextResponse
+
+from app import profiling
+
+router = APIRouter(prefix="/admin")
+
+
+def get_admin_token(request: Request) -> str:
+    return getattr(request.app.state, "admin_token", "")
+
+
+def is_admin(token: str, provided: str | None) -> bool:
+    # Starlette decodes header values as latin-1; compare the raw bytes,
+    # since compare_digest rejects str with non-ASCII characters
+    return (
+        bool(token) and provided is not None
+        and hmac.compare_digest(token.encode(), provided.encode("latin-1"))
+    )
+
+
+def require_admin(
+    request: Request,
+    x_admin_token: str | None = Header(default=None),
+) -> None:
+    token = get_admin_token(request)
+    if not token:
+        raise HTTPException(status_code=503, detail="Admin token not configured")
+    if not is_admin(token, x_admin_token):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+
+
+@router.get("/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+async def capture_profile(
+    seconds: float = Query(5.0, gt=0, le=profiling.MAX_PROFILE_SECONDS),
+    interval_ms: float = Query(profiling.DEFAULT_INTERVAL * 1000, ge=1, le=1000),
+) -> PlainTextResponse:
+    """Sample all threads for ``seconds``; returns collapsed stacks for flamegraph tools."""
+    try:
+        counts = await profiling.profile(seconds, interval_ms / 1000)
+    except profiling.ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return PlainTextResponse(profiling.render_collapsed(counts))
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+def get_request_profile(profile_id: str) -> PlainTextResponse:
+    """A per-request profile captured via the ``X-Profile`` header."""
+    collapsed = profiling.get_profile(profile_id)
+    if collapsed is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(collapsed)
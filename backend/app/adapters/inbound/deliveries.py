@@ -1,5 +1,4 @@
 import asyncio
-import json
 
 from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request
 from fastapi.responses import StreamingResponse
@@ -28,24 +27,24 @@ async def stream_delivery(delivery_id: str, request: Request):
     event_bus = get_event_bus(request)
 
     async def event_generator():
-        sub = event_bus.subscribe(delivery_id)
+        sub = event_bus.subscribe_frames(delivery_id)
         try:
             while True:
                 try:
-                    event = await asyncio.wait_for(anext(sub), timeout=15)
+                    frame = await asyncio.wait_for(anext(sub), timeout=15)
                 except StopAsyncIteration:
                     break
                 except asyncio.TimeoutError:
                     if await request.is_disconnected():
                         break
-                    yield ": heartbeat\n\n"
+                    yield b": heartbeat\n\n"
                     continue
                 if await request.is_disconnected():
                     break
-                yield f"data: {json.dumps(event)}\n\n"
+                yield frame
         finally:
             await sub.aclose()
-        yield "event: done\ndata: {}\n\n"
+        yield b"event: done\ndata: {}\n\n"
 
     return StreamingResponse(
         event_generator(),
@@ -68,6 +67,12 @@ def get_schema():
     return DeliveryCreate.model_json_schema()
 
 
+# Must stay above /deliveries/{delivery_id}, which would capture "timings"
+@router.get("/deliveries/timings")
+def get_run_timings(uc=Depends(get_usecases)):
+    return uc.get_run_timings()
+
+
 @router.get("/deliveries/{delivery_id}")
 def get_delivery(delivery_id: str, uc=Depends(get_usecases)):
     delivery = uc.get_delivery(delivery_id)
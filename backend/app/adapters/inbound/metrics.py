@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+from fastapi.responses import Response
+
+from app.metrics import CONTENT_TYPE, REGISTRY
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics() -> Response:
+    # Rendered on the loop: gauge callbacks read event-bus state the loop mutates
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -0,0 +1,12 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+from app import json_codec
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured fast JSON codec."""
+
+    def render(self, content: Any) -> bytes:
+        return json_codec.dumps(content)
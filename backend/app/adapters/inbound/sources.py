@@ -51,5 +51,5 @@ def delete_source(source_id: str, uc=Depends(get_usecases)):
 
 
 @router.post("/sources/sync")
-def sync_now(issue_sync=Depends(get_issue_sync)):
-    return issue_sync.sync_once()
+async def sync_now(issue_sync=Depends(get_issue_sync)):
+    return await issue_sync.poll_once()
@@ -0,0 +1,67 @@
+import asyncio
+import hashlib
+import hmac
+
+from fastapi import APIRouter, Header, HTTPException, Request
+
+from app import json_codec
+from app.domain.models.github import GitHubIssue
+
+router = APIRouter()
+
+HANDLED_ISSUE_ACTIONS = {"opened", "reopened", "closed"}
+
+
+def get_issue_sync(request: Request):
+    return request.app.state.delivery_sync
+
+
+def get_webhook_secret(request: Request) -> str:
+    return getattr(request.app.state, "github_webhook_secret", "")
+
+
+def verify_signature(secret: str, body: bytes, signature: str | None) -> bool:
+    """Check an ``X-Hub-Signature-256`` header against the raw body."""
+    if not signature or not signature.startswith("sha256="):
+        return False
+    expected = hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+    return hmac.compare_digest(expected, signature.removeprefix("sha256="))
+
+
+@router.post("/webhooks/github", status_code=202)
+async def github_webhook(
+    request: Request,
+    x_github_event: str = Header(default=""),
+    x_hub_signature_256: str | None = Header(default=None),
+):
+    secret = get_webhook_secret(request)
+    if not secret:
+        raise HTTPException(status_code=503, detail="GitHub webhook secret not configured")
+    body = await request.body()
+    if not verify_signature(secret, body, x_hub_signature_256):
+        raise HTTPException(status_code=401, detail="Invalid webhook signature")
+
+    if x_github_event == "ping":
+        return {"status": "pong"}
+    if x_github_event != "issues":
+        return {"status": "ignored", "event": x_github_event}
+
+    try:
+        payload = json_codec.loads(body)
+        action = payload["action"]
+        repository = payload["repository"]["full_name"]
+        if action not in HANDLED_ISSUE_ACTIONS:
+            return {"status": "ignored", "event": x_github_event, "action": action}
+        item = payload["issue"]
+        issue = GitHubIssue(
+            number=item["number"],
+            title=item["title"],
+            html_url=item["html_url"],
+            state=item["state"],
+        )
+    except (*json_codec.DecodeError, ValueError, KeyError, TypeError):
+        raise HTTPException(status_code=400, detail="Malformed issues payload")
+    result = await asyncio.to_thread(
+        get_issue_sync(request).handle_issue_event, repository, action, issue,
+    )
+    return {"status": "processed", "action": action, **result}
@@ -1,17 +1,25 @@
 from __future__ import annotations
 
 import asyncio
-import json
-from collections.abc import AsyncGenerator
+from collections.abc import AsyncGenerator, Sequence
 from typing import Any
 
 import structlog
 
+from app import json_codec
+
 logger = structlog.get_logger()
 
 
 class ClaudeCliAdapter:
-    def __init__(self) -> None:
+    """Runs the ``claude`` CLI as a subprocess.
+
+    ``binary`` is the command prefix used in place of ``claude``; a list
+    allows wrappers such as ``["python", "fake_claude.py"]``.
+    """
+
+    def __init__(self, binary: str | Sequence[str] = "claude") -> None:
+        self._binary = [binary] if isinstance(binary, str) else list(binary)
         self._processes: dict[str, asyncio.subprocess.Process] = {}
 
     async def run(
@@ -22,7 +30,7 @@ class ClaudeCliAdapter:
         append_system_prompt: str | None = None,
         delivery_id: str | None = None,
     ) -> tuple[str, str | None]:
-        cmd = ["claude", "-p", prompt, "--output-format", "json"]
+        cmd = [*self._binary, "-p", prompt, "--output-format", "json"]
         if allowed_tools:
             cmd += ["--allowedTools", ",".join(allowed_tools)]
         if append_system_prompt:
@@ -51,7 +59,7 @@ class ClaudeCliAdapter:
         if proc.returncode != 0:
             raise RuntimeError(f"claude CLI failed: {stderr.decode().strip()}")
 
-        data = json.loads(stdout.decode())
+        data = json_codec.loads(stdout)
         result_text = data.get("result", "")
         session_id = data.get("session_id")
 
@@ -68,7 +76,7 @@ class ClaudeCliAdapter:
         append_system_prompt: str | None = None,
         delivery_id: str | None = None,
     ) -> AsyncGenerator[dict[str, Any], None]:
-        cmd = ["claude", "-p", prompt, "--output-format", "stream-json", "--verbose"]
+        cmd = [*self._binary, "-p", prompt, "--output-format", "stream-json", "--verbose"]
         if allowed_tools:
             cmd += ["--allowedTools", ",".join(allowed_tools)]
         if append_system_prompt:
@@ -99,17 +107,18 @@ class ClaudeCliAdapter:
                     raise RuntimeError("claude CLI streaming timeout (exceeded 600s)")
                 if not line:
                     break
-                text = line.decode().strip()
-                if not text:
+                line = line.strip()
+                if not line:
                     continue
                 try:
-                    parsed = json.loads(text)
-                    event_count += 1
-                    event_types.append(parsed.get("type", "?"))
-                    yield parsed
-                except json.JSONDecodeError:
+                    parsed = json_codec.loads(line)
+                except json_codec.DecodeError:
                     skipped_lines += 1
-                    logger.warning("skipping non-JSON line", line=text[:200])
+                    logger.warning("skipping non-JSON line", line=line[:200].decode(errors="replace"))
+                    continue
+                event_count += 1
+                event_types.append(parsed.get("type", "?"))
+                yield parsed
 
             # Drain any remaining stdout after EOF (handles missing trailing newline)
             remaining = await proc.stdout.read()
@@ -119,14 +128,15 @@ class ClaudeCliAdapter:
                     if not fragment:
                         continue
                     try:
-                        parsed = json.loads(fragment)
-                        event_count += 1
-                        event_types.append(parsed.get("type", "?"))
-                        yield parsed
-                        logger.info("recovered event from stdout remainder", event_type=parsed.get("type"))
-                    except json.JSONDecodeError:
+                        parsed = json_codec.loads(fragment)
+                    except json_codec.DecodeError:
                         skipped_lines += 1
                         logger.warning("skipping non-JSON remainder", line=fragment[:200])
+                        continue
+                    event_count += 1
+                    event_types.append(parsed.get("type", "?"))
+                    yield parsed
+                    logger.info("recovered event from stdout remainder", event_type=parsed.get("type"))
 
             await proc.wait()
             logger.info(
@@ -1,10 +1,11 @@
-import json
 import os
 import tempfile
 from pathlib import Path
 
 import structlog
 
+from app import json_codec
+
 logger = structlog.get_logger()
 
 
@@ -22,9 +23,9 @@ class FileSystemDeliveryRepository:
             if not f.exists():
                 continue
             try:
-                data = json.loads(f.read_text(encoding="utf-8"))
+                data = json_codec.loads(f.read_bytes())
                 items.append(data)
-            except (json.JSONDecodeError, ValueError):
+            except (*json_codec.DecodeError, ValueError):
                 logger.warning("Skipping corrupted delivery file", path=str(f))
         items.sort(key=lambda x: x.get("created_at", ""), reverse=True)
         return items
@@ -33,7 +34,7 @@ class FileSystemDeliveryRepository:
         file = self._dir / delivery_id / "delivery.json"
         if not file.exists():
             return None
-        return json.loads(file.read_text(encoding="utf-8"))
+        return json_codec.loads(file.read_bytes())
 
     def save_delivery(self, delivery_id: str, data: dict) -> None:
         delivery_dir = self._dir / delivery_id
@@ -45,7 +46,7 @@ class FileSystemDeliveryRepository:
         file = self._dir / delivery_id / f"run-{run_id}.transcript.json"
         if not file.exists():
             return None
-        return json.loads(file.read_text(encoding="utf-8"))
+        return json_codec.loads(file.read_bytes())
 
     def save_run_transcript(self, delivery_id: str, run_id: str, data: dict) -> None:
         delivery_dir = self._dir / delivery_id
@@ -57,7 +58,7 @@ class FileSystemDeliveryRepository:
         file = self._dir / delivery_id / f"run-{run_id}.stream_log.json"
         if not file.exists():
             return None
-        return json.loads(file.read_text(encoding="utf-8"))
+        return json_codec.loads(file.read_bytes())
 
     def save_stream_log(self, delivery_id: str, run_id: str, data: dict) -> None:
         delivery_dir = self._dir / delivery_id
@@ -74,21 +75,21 @@ class FileSystemDeliveryRepository:
             if not f.exists():
                 continue
             try:
-                data = json.loads(f.read_text(encoding="utf-8"))
+                data = json_codec.loads(f.read_bytes())
                 max_seq = max(max_seq, data.get("seq", 0))
-            except (json.JSONDecodeError, ValueError):
+            except (*json_codec.DecodeError, ValueError):
                 continue
         return max_seq + 1
 
     def _atomic_write(self, target: Path, data: dict) -> None:
         """Write JSON atomically: write to temp file, then rename."""
-        content = json.dumps(data, ensure_ascii=False, indent=2)
+        content = json_codec.dumps_pretty(data)
         fd, tmp_path = tempfile.mkstemp(
             dir=target.parent, suffix=".tmp", prefix=".delivery_"
         )
         closed = False
         try:
-            os.write(fd, content.encode("utf-8"))
+            os.write(fd, content)
             os.close(fd)
             closed = True
             Path(tmp_path).replace(target)
@@ -1,10 +1,13 @@
-import json
+import copy
 import os
 import tempfile
+import threading
 from pathlib import Path
 
 import structlog
 
+from app import json_codec
+
 logger = structlog.get_logger()
 
 
@@ -12,14 +15,19 @@ class FileSystemSourceRepository:
     def __init__(self, data_dir: Path) -> None:
         self._dir = data_dir
         self._dir.mkdir(parents=True, exist_ok=True)
+        # (owner, repo) -> source, built lazily from disk and kept current by
+        # save/delete. When several sources share a repository the newest
+        # (by created_at) wins, matching list_sources order.
+        self._by_repo: dict[tuple[str, str], dict] | None = None
+        self._lock = threading.Lock()
 
     def list_sources(self) -> list[dict]:
         items: list[dict] = []
         for f in self._dir.glob("*.json"):
             try:
-                data = json.loads(f.read_text(encoding="utf-8"))
+                data = json_codec.loads(f.read_bytes())
                 items.append(data)
-            except (json.JSONDecodeError, ValueError):
+            except (*json_codec.DecodeError, ValueError):
                 logger.warning("Skipping corrupted source file", path=str(f))
         items.sort(key=lambda x: x.get("created_at", ""), reverse=True)
         return items
@@ -28,28 +36,70 @@ class FileSystemSourceRepository:
         file = self._dir / f"{source_id}.json"
         if not file.exists():
             return None
-        return json.loads(file.read_text(encoding="utf-8"))
+        return json_codec.loads(file.read_bytes())
+
+    def get_source_by_repo(self, owner: str, repo: str) -> dict | None:
+        """Return the source for ``owner/repo`` from the in-memory index."""
+        with self._lock:
+            source = self._repo_index().get((owner, repo))
+            return copy.deepcopy(source) if source is not None else None
 
     def save_source(self, source_id: str, data: dict) -> None:
         file = self._dir / f"{source_id}.json"
         self._atomic_write(file, data)
+        with self._lock:
+            if self._by_repo is None:
+                return
+            key = (data.get("owner"), data.get("repo"))
+            current = self._by_repo.get(key)
+            if current is not None and current.get("id") == source_id:
+                self._by_repo[key] = copy.deepcopy(data)
+                return
+            # New source, or its repository changed
+            self._unindex(source_id)
+            current = self._by_repo.get(key)
+            if current is None or data.get("created_at", "") >= current.get("created_at", ""):
+                self._by_repo[key] = copy.deepcopy(data)
 
     def delete_source(self, source_id: str) -> bool:
         file = self._dir / f"{source_id}.json"
         if not file.exists():
             return False
         file.unlink()
+        with self._lock:
+            if self._by_repo is not None:
+                self._unindex(source_id)
         return True
 
+    def _repo_index(self) -> dict[tuple[str, str], dict]:
+        if self._by_repo is None:
+            index: dict[tuple[str, str], dict] = {}
+            for source in self.list_sources():
+                index.setdefault((source.get("owner"), source.get("repo")), source)
+            self._by_repo = index
+        return self._by_repo
+
+    def _unindex(self, source_id: str) -> None:
+        """Drop ``source_id`` from the index, promoting any other source for its repository."""
+        key = next((k for k, s in self._by_repo.items() if s.get("id") == source_id), None)
+        if key is None:
+            return
+        del self._by_repo[key]
+        # Rare: another source shares the repository; rescan to find it.
+        for source in self.list_sources():
+            if (source.get("owner"), source.get("repo")) == key and source.get("id") != source_id:
+                self._by_repo[key] = source
+                break
+
     def _atomic_write(self, target: Path, data: dict) -> None:
         """Write JSON atomically: write to temp file, then rename."""
-        content = json.dumps(data, ensure_ascii=False, indent=2)
+        content = json_codec.dumps_pretty(data)
         fd, tmp_path = tempfile.mkstemp(
             dir=target.parent, suffix=".tmp", prefix=".source_"
         )
         closed = False
         try:
-            os.write(fd, content.encode("utf-8"))
+            os.write(fd, content)
             os.close(fd)
             closed = True
             Path(tmp_path).replace(target)
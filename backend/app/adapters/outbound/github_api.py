@@ -1,50 +1,377 @@
+import asyncio
+import importlib.util
+from typing import NamedTuple
+
 import httpx
 import structlog
 
-from app.domain.models.github import GitHubIssue
+from app.domain.models.github import GitHubIssue, RateLimit, token_key
 
 logger = structlog.get_logger()
 
+API_BASE = "https://api.github.com"
+GRAPHQL_URL = f"{API_BASE}/graphql"
+PER_PAGE = 100
+# Repositories per aliased GraphQL query; keeps each query well under
+# GitHub's node limit (GRAPHQL_BATCH_SIZE * PER_PAGE issues).
+GRAPHQL_BATCH_SIZE = 50
+REQUEST_TIMEOUT = 30
+
+DEFAULT_MAX_RETRIES = 3
+RETRY_STATUSES = {500, 502, 503, 504}
+BACKOFF_BASE_SEC = 0.5
+MAX_BACKOFF_SEC = 60.0
+
+
+def create_http_client(
+    max_connections: int = 20,
+    max_keepalive_connections: int = 10,
+    http2: bool = True,
+) -> httpx.AsyncClient:
+    """Build the pooled async client the adapter shares across sources.
+
+    HTTP/2 needs the optional ``h2`` package (``pip install jakeops[http2]``);
+    without it the clients fall back to HTTP/1.1 keep-alive.
+    """
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("h2 not installed, GitHub client falls back to HTTP/1.1")
+        http2 = False
+    limits = httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive_connections,
+    )
+    return httpx.AsyncClient(limits=limits, http2=http2, timeout=REQUEST_TIMEOUT)
+
+
+def _retry_delay(resp: httpx.Response, attempt: int) -> float | None:
+    """Seconds to wait before retrying ``resp``, or None if it is final.
+
+    Retries 5xx and GitHub secondary rate limits (403/429 honouring
+    ``Retry-After``). An exhausted primary limit is not retried here; the
+    poll scheduler waits for its reset instead.
+    """
+    backoff = min(MAX_BACKOFF_SEC, BACKOFF_BASE_SEC * 2 ** attempt)
+    status = resp.status_code
+    if status in RETRY_STATUSES:
+        return backoff
+    if status not in (403, 429):
+        return None
+    retry_after = resp.headers.get("Retry-After")
+    if isinstance(retry_after, str) and retry_after.isdigit():
+        return min(MAX_BACKOFF_SEC, float(retry_after))
+    if resp.headers.get("X-RateLimit-Remaining") == "0":
+        return None
+    if status == 429 or "secondary rate limit" in resp.text.lower():
+        return backoff
+    return None
+
+
+def _headers(token: str) -> dict[str, str]:
+    headers: dict[str, str] = {"Accept": "application/vnd.github+json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    return headers
+
+
+def _parse_issues(items: list[dict]) -> list[GitHubIssue]:
+    issues = []
+    for item in items:
+        if item.get("pull_request"):
+            continue
+        issues.append(GitHubIssue(
+            number=item["number"],
+            title=item["title"],
+            html_url=item["html_url"],
+            state=item["state"],
+            updated_at=item.get("updated_at"),
+        ))
+    return issues
+
+
+class _Page(NamedTuple):
+    etag: str | None
+    last_modified: str | None
+    issues: list[GitHubIssue]
+    next_url: str | None
+
+
+def _issues_query(batch: list[tuple[str, str | None]]) -> tuple[str, dict]:
+    """Build one aliased query fetching a page of open issues per repository.
+
+    ``batch`` holds ``("owner/repo", cursor)`` pairs; alias ``rN`` maps back
+    to the Nth entry.
+    """
+    params: list[str] = []
+    fields: list[str] = []
+    variables: dict[str, str | None] = {}
+    for i, (full_repo, cursor) in enumerate(batch):
+        owner, _, name = full_repo.partition("/")
+        params.append(f"$o{i}: String!, $n{i}: String!, $c{i}: String")
+        fields.append(
+            f"r{i}: repository(owner: $o{i}, name: $n{i}) {{"
+            f" issues(states: OPEN, first: {PER_PAGE}, after: $c{i}) {{"
+            " pageInfo { hasNextPage endCursor } nodes { number title url state updatedAt } } }"
+        )
+        variables.update({f"o{i}": owner, f"n{i}": name, f"c{i}": cursor})
+    return f"query({', '.join(params)}) {{ {' '.join(fields)} }}", variables
+
+
+def _parse_graphql_issues(nodes: list[dict]) -> list[GitHubIssue]:
+    return [
+        GitHubIssue(
+            number=node["number"],
+            title=node["title"],
+            html_url=node["url"],
+            state=node["state"].lower(),
+            updated_at=node.get("updatedAt"),
+        )
+        for node in nodes
+    ]
+
+
+def _page_key(url: str, params: dict | None, token: str) -> tuple:
+    # Per token: a 304 must only replay a body fetched with the same visibility
+    return (token_key(token), url, tuple(sorted(params.items())) if params else ())
+
 
 class GitHubApiAdapter:
-    def list_open_issues(self, owner: str, repo: str, token: str = "") -> list[GitHubIssue]:
-        url = f"https://api.github.com/repos/{owner}/{repo}/issues"
-        headers: dict[str, str] = {"Accept": "application/vnd.github+json"}
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
-        params = {"state": "open", "per_page": 100}
+    def __init__(
+        self,
+        client: httpx.AsyncClient | None = None,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        # Long-lived pooled client, normally built by create_http_client in lifespan
+        self._client = client
+        self._max_retries = max_retries
+        # Validators and parsed issues of the last 200 per (token, page) of the open listing
+        self._pages: dict[tuple, _Page] = {}
+        # Last seen X-RateLimit-* values per (token (hashed), resource); "" is
+        # unauthenticated. REST ("core") and GraphQL budgets are separate.
+        self._rate_limits: dict[tuple[str, str], RateLimit] = {}
+        # Open issue numbers per "owner/repo" from the last batched listing
+        self._batch_numbers: dict[str, frozenset[int]] = {}
+
+    def rate_limit(self, token: str = "", resource: str = "core") -> RateLimit | None:
+        """Return the most recent rate-limit headers seen for ``token`` on ``resource``.
 
+        ``resource`` is ``"core"`` for REST calls or ``"graphql"`` for batched listings.
+        """
+        return self._rate_limits.get((token_key(token), resource))
+
+    async def fetch_open_issues(
+        self, owner: str, repo: str, token: str = "", if_changed: bool = False,
+    ) -> list[GitHubIssue] | None:
+        """List all open issues, following ``Link`` pagination.
+
+        Every page is revalidated with its cached ETag / Last-Modified. When
+        all pages answer 304 the cached issues are reused, or ``None`` is
+        returned if ``if_changed`` is set so callers can skip unchanged repos.
+        """
         try:
-            resp = httpx.get(url, headers=headers, params=params, timeout=30)
-            resp.raise_for_status()
+            issues, changed = await self._walk_pages(owner, repo, {"state": "open"}, token, conditional=True)
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
                 logger.warning("GitHub repository not found", owner=owner, repo=repo)
                 return []
             raise
-        except httpx.HTTPError:
+        if if_changed and not changed:
+            return None
+        return issues
+
+    async def fetch_issues_since(self, owner: str, repo: str, since: str, token: str = "") -> list[GitHubIssue]:
+        """List open and closed issues updated at or after ``since`` (ISO 8601)."""
+        try:
+            issues, _ = await self._walk_pages(
+                owner, repo, {"state": "all", "since": since}, token, conditional=False,
+            )
+        except httpx.HTTPStatusError as e:
+            if e.response.status_code == 404:
+                logger.warning("GitHub repository not found", owner=owner, repo=repo)
+                return []
             raise
+        return issues
+
+    async def fetch_open_issues_batch(
+        self, repositories: list[tuple[str, str]], token: str, if_changed: bool = False,
+    ) -> dict[str, list[GitHubIssue] | None]:
+        """List open issues of many repositories through aliased GraphQL queries.
+
+        Returns issues keyed by ``"owner/repo"``. A repository GitHub reports
+        as NOT_FOUND maps to ``[]``, like a REST 404; one that fails with any
+        other error (FORBIDDEN, SSO enforcement, missing scopes) is left out,
+        so callers do not reconcile it against an empty listing. Repositories
+        are paginated by cursor independently, up to ``GRAPHQL_BATCH_SIZE``
+        per round trip. GraphQL has no conditional requests, so with
+        ``if_changed`` a repository whose set of open issue numbers matches
+        the previous batch maps to ``None``. Requires a token.
+        """
+        pending, results = self._start_batch(repositories)
+        while pending:
+            batch = list(pending.items())[:GRAPHQL_BATCH_SIZE]
+            query, variables = _issues_query(batch)
+            resp = await self._request(
+                "POST", GRAPHQL_URL, headers=_headers(token), json={"query": query, "variables": variables},
+            )
+            self._note_rate_limit(token, resp, "graphql")
+            self._read_batch(batch, resp, pending, results)
+        return self._finish_batch(results, if_changed)
 
-        issues = []
-        for item in resp.json():
-            if item.get("pull_request"):
+    @staticmethod
+    def _start_batch(
+        repositories: list[tuple[str, str]],
+    ) -> tuple[dict[str, str | None], dict[str, list[GitHubIssue]]]:
+        names = [f"{owner}/{repo}" for owner, repo in repositories]
+        return dict.fromkeys(names), {name: [] for name in names}
+
+    @staticmethod
+    def _read_batch(
+        batch: list[tuple[str, str | None]],
+        resp: httpx.Response,
+        pending: dict[str, str | None],
+        results: dict[str, list[GitHubIssue]],
+    ) -> None:
+        """Collect one page per repository and advance or retire its cursor."""
+        resp.raise_for_status()
+        payload = resp.json()
+        data = payload.get("data")
+        if data is None:
+            messages = "; ".join(e.get("message", "") for e in payload.get("errors", []))
+            raise RuntimeError(f"GitHub GraphQL query failed: {messages}")
+        # Per-alias failures come back as a null alias plus an error whose
+        # path starts with that alias
+        failures = {
+            error["path"][0]: error.get("type")
+            for error in payload.get("errors") or []
+            if error.get("path")
+        }
+        for i, (full_repo, _) in enumerate(batch):
+            repository = data.get(f"r{i}")
+            if repository is None:
+                pending.pop(full_repo)
+                error_type = failures.get(f"r{i}")
+                if error_type == "NOT_FOUND":
+                    logger.warning("GitHub repository not found", repository=full_repo)
+                    results[full_repo] = []
+                else:
+                    logger.warning(
+                        "GitHub repository not readable, skipping", repository=full_repo, error_type=error_type,
+                    )
+                    results.pop(full_repo)
                 continue
-            issues.append(GitHubIssue(
-                number=item["number"],
-                title=item["title"],
-                html_url=item["html_url"],
-                state=item["state"],
-            ))
-        return issues
+            issues = repository["issues"]
+            results[full_repo].extend(_parse_graphql_issues(issues["nodes"]))
+            page_info = issues["pageInfo"]
+            if page_info["hasNextPage"]:
+                pending[full_repo] = page_info["endCursor"]
+            else:
+                pending.pop(full_repo)
+
+    def _finish_batch(
+        self, results: dict[str, list[GitHubIssue]], if_changed: bool,
+    ) -> dict[str, list[GitHubIssue] | None]:
+        listings: dict[str, list[GitHubIssue] | None] = {}
+        for full_repo, issues in results.items():
+            numbers = frozenset(issue.number for issue in issues)
+            unchanged = self._batch_numbers.get(full_repo) == numbers
+            self._batch_numbers[full_repo] = numbers
+            listings[full_repo] = None if if_changed and unchanged else issues
+        return listings
+
+    async def _walk_pages(
+        self, owner: str, repo: str, query: dict, token: str, conditional: bool,
+    ) -> tuple[list[GitHubIssue], bool]:
+        url: str | None = f"{API_BASE}/repos/{owner}/{repo}/issues"
+        params: dict | None = {**query, "per_page": PER_PAGE}
+        issues: list[GitHubIssue] = []
+        changed = False
+        while url:
+            key = _page_key(url, params, token)
+            headers = self._conditional_headers(key, token) if conditional else _headers(token)
+            resp = await self._get(url, headers=headers, params=params)
+            self._note_rate_limit(token, resp)
+            page, modified = self._read_page(key, resp, conditional)
+            changed |= modified
+            issues.extend(page.issues)
+            # The next link already carries the full query string
+            url, params = page.next_url, None
+        return issues, changed
+
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        return await self._request("GET", url, **kwargs)
+
+    async def _request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=REQUEST_TIMEOUT)
+        for attempt in range(self._max_retries + 1):
+            last = attempt == self._max_retries
+            try:
+                resp = await self._client.request(method, url, **kwargs)
+            except httpx.TransportError as e:
+                if last:
+                    raise
+                self._log_retry(url, attempt, BACKOFF_BASE_SEC * 2 ** attempt, error=str(e))
+                await asyncio.sleep(BACKOFF_BASE_SEC * 2 ** attempt)
+                continue
+            delay = None if last else _retry_delay(resp, attempt)
+            if delay is None:
+                return resp
+            self._log_retry(url, attempt, delay, status_code=resp.status_code)
+            await asyncio.sleep(delay)
+        raise AssertionError("unreachable")
 
-    def get_issue(self, owner: str, repo: str, number: int, token: str = "") -> GitHubIssue | None:
-        url = f"https://api.github.com/repos/{owner}/{repo}/issues/{number}"
-        headers: dict[str, str] = {"Accept": "application/vnd.github+json"}
-        if token:
-            headers["Authorization"] = f"Bearer {token}"
+    @staticmethod
+    def _log_retry(url: str, attempt: int, delay: float, **details) -> None:
+        logger.warning("Retrying GitHub request", url=url, attempt=attempt + 1, delay_sec=delay, **details)
 
+    def _note_rate_limit(self, token: str, resp: httpx.Response, resource: str = "core") -> None:
+        remaining = resp.headers.get("X-RateLimit-Remaining")
+        reset = resp.headers.get("X-RateLimit-Reset")
+        if not isinstance(remaining, str) or not isinstance(reset, str):
+            return
         try:
-            resp = httpx.get(url, headers=headers, timeout=30)
+            limit = resp.headers.get("X-RateLimit-Limit")
+            self._rate_limits[(token_key(token), resource)] = RateLimit(
+                remaining=int(remaining),
+                reset_at=float(reset),
+                limit=int(limit) if limit else None,
+            )
+        except ValueError:
+            logger.warning("Unparseable GitHub rate-limit headers", remaining=remaining, reset=reset)
+
+    def _conditional_headers(self, key: tuple, token: str) -> dict[str, str]:
+        headers = _headers(token)
+        cached = self._pages.get(key)
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        return headers
+
+    def _read_page(self, key: tuple, resp: httpx.Response, conditional: bool) -> tuple[_Page, bool]:
+        """Return the page for a response and whether it changed."""
+        if conditional and resp.status_code == 304 and key in self._pages:
+            return self._pages[key], False
+        resp.raise_for_status()
+        page = _Page(
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+            issues=_parse_issues(resp.json()),
+            next_url=resp.links.get("next", {}).get("url"),
+        )
+        if conditional:
+            if page.etag or page.last_modified:
+                self._pages[key] = page
+            else:
+                self._pages.pop(key, None)
+        return page, True
+
+    async def get_issue(self, owner: str, repo: str, number: int, token: str = "") -> GitHubIssue | None:
+        url = f"{API_BASE}/repos/{owner}/{repo}/issues/{number}"
+
+        try:
+            resp = await self._get(url, headers=_headers(token))
+            self._note_rate_limit(token, resp)
             resp.raise_for_status()
         except httpx.HTTPStatusError as e:
             if e.response.status_code == 404:
@@ -62,3 +389,8 @@ class GitHubApiAdapter:
             state=item["state"],
             body=item.get("body") or "",
         )
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
@@ -2,7 +2,7 @@ from enum import Enum
 
 from pydantic import BaseModel
 
-from app.domain.models.delivery import ExecutionStats, Phase, Session
+from app.domain.models.delivery import ExecutionStats, Phase, RunTimings, Session
 
 
 class AgentRunStatus(str, Enum):
@@ -18,6 +18,7 @@ class AgentRun(BaseModel):
     created_at: str
     session: Session
     stats: ExecutionStats
+    timings: RunTimings | None = None
     error: str | None = None
     summary: str | None = None
     session_id: str | None = None
@@ -83,6 +83,22 @@ class ExecutionStats(BaseModel):
     duration_ms: int = 0
 
 
+class RunTimings(BaseModel):
+    """Wall-clock milliseconds spent in each step of an agent run.
+
+    A step that did not happen (e.g. no checkout without a PR branch, no
+    PR outside the plan phase) is left as None.
+    """
+
+    queue_wait_ms: float | None = None
+    clone_ms: float | None = None
+    checkout_ms: float | None = None
+    agent_ms: float | None = None
+    analyze_ms: float | None = None
+    persist_ms: float | None = None
+    pr_ms: float | None = None
+
+
 class DeliveryCreate(BaseModel, extra="ignore"):
     schema_version: int | None = None
     id: str | None = None
@@ -1,3 +1,5 @@
+import hashlib
+
 from pydantic import BaseModel
 
 
@@ -7,3 +9,19 @@ class GitHubIssue(BaseModel):
     html_url: str
     state: str
     body: str = ""
+    updated_at: str | None = None
+
+
+class RateLimit(BaseModel):
+    remaining: int
+    reset_at: float
+    limit: int | None = None
+
+
+def token_key(token: str) -> str:
+    """Short stable id for ``token`` ("" when unauthenticated), safe to keep in memory and logs.
+
+    Rate-limit state is tracked per token under this key, both by the
+    GitHub adapter and by the poll scheduler's budgets.
+    """
+    return hashlib.sha256(token.encode()).hexdigest()[:12] if token else ""
@@ -1,3 +1,5 @@
+from typing import NamedTuple
+
 from pydantic import BaseModel
 
 
@@ -9,6 +11,26 @@ class StreamEvent(BaseModel):
     session_id: str | None = None
 
 
+class EventRecord(NamedTuple):
+    """Lightweight internal event with the same fields as ``StreamEvent``.
+
+    Used on the per-event hot path (streaming, session parsing); convert
+    with ``to_model`` where a validated model is needed.
+    """
+
+    type: str
+    subtype: str | None = None
+    parent_tool_use_id: str | None = None
+    message: dict | None = None
+    session_id: str | None = None
+
+    def to_model(self) -> StreamEvent:
+        return StreamEvent(**self._asdict())
+
+
+AnyStreamEvent = StreamEvent | EventRecord
+
+
 class StreamMetadata(BaseModel):
     model: str = "unknown"
     cwd: str | None = None
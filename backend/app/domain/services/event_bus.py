@@ -1,49 +1,207 @@
 from __future__ import annotations
 
 import asyncio
-from collections import defaultdict, deque
-from typing import Any, AsyncGenerator
+import time
+from collections import deque
+from typing import Any, AsyncGenerator, NamedTuple
+
+from app import json_codec
 
 _SENTINEL = object()
 
 MAX_BUFFER_SIZE = 2000
+# Replay budget shared by all delivery buffers, in encoded bytes.
+MAX_TOTAL_BUFFER_BYTES = 64 * 1024 * 1024
+# tool_result frames at least this large are the first to be evicted.
+LARGE_EVENT_BYTES = 32 * 1024
+# Buffers with no subscribers and no publish for this long are dropped.
+IDLE_TTL_SECONDS = 3600
+SWEEP_INTERVAL_SECONDS = 60
+
+
+class Frame(NamedTuple):
+    """A published event paired with its pre-encoded SSE frame."""
+
+    event: dict[str, Any]
+    data: bytes
+
+
+def encode_frame(event: dict[str, Any]) -> bytes:
+    """Encode an event as a ready-to-send SSE ``data:`` frame."""
+    return b"data: " + json_codec.dumps(event) + b"\n\n"
+
+
+def _is_tool_result(event: dict[str, Any]) -> bool:
+    content = (event.get("message") or {}).get("content")
+    if not isinstance(content, list):
+        return False
+    return any(
+        isinstance(block, dict) and block.get("type") == "tool_result"
+        for block in content
+    )
 
 
 class EventBus:
-    """In-memory pub/sub per delivery_id with replay buffer."""
+    """In-memory pub/sub per delivery_id with replay buffer.
+
+    Each event is serialized once in ``publish``; subscribers share the
+    encoded frame, so fan-out cost does not grow with viewer count.
+
+    Replay buffers share a global byte budget. When it is exceeded, large
+    tool_result frames are evicted first, then the oldest frames of the
+    least recently active deliveries. Live subscribers are unaffected;
+    only late joiners see a shorter replay.
+    """
+
+    def __init__(
+        self,
+        max_total_bytes: int = MAX_TOTAL_BUFFER_BYTES,
+        idle_ttl: float = IDLE_TTL_SECONDS,
+    ) -> None:
+        self._max_total_bytes = max_total_bytes
+        self._idle_ttl = idle_ttl
+        # Insertion order doubles as LRU order (oldest activity first)
+        self._buffers: dict[str, deque[Frame]] = {}
+        # Evictable large tool_result frames per delivery, oldest first;
+        # only deliveries that currently hold one have an entry
+        self._large: dict[str, deque[Frame]] = {}
+        self._subscribers: dict[str, list[asyncio.Queue]] = {}
+        self._last_activity: dict[str, float] = {}
+        self._total_bytes = 0
+        self._last_sweep = time.monotonic()
+
+    @property
+    def buffered_bytes(self) -> int:
+        return self._total_bytes
 
-    def __init__(self) -> None:
-        self._buffers: dict[str, deque[dict]] = defaultdict(
-            lambda: deque(maxlen=MAX_BUFFER_SIZE)
-        )
-        self._subscribers: dict[str, list[asyncio.Queue]] = defaultdict(list)
+    def stats(self) -> dict[str, int]:
+        """Buffer and subscriber counts plus frames waiting in subscriber queues.
+
+        Snapshots the subscriber lists first, so it is safe to call from
+        another thread while the loop (un)subscribes.
+        """
+        depths = [q.qsize() for queues in list(self._subscribers.values()) for q in list(queues)]
+        return {
+            "buffers": len(self._buffers),
+            "subscribers": len(depths),
+            "buffered_bytes": self._total_bytes,
+            "queue_depth": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+        }
 
     async def publish(self, delivery_id: str, event: dict[str, Any]) -> None:
-        self._buffers[delivery_id].append(event)
-        for queue in self._subscribers[delivery_id]:
-            queue.put_nowait(event)
+        frame = Frame(event, encode_frame(event))
+        buffer = self._buffers.pop(delivery_id, None)
+        if buffer is None:
+            buffer = deque(maxlen=MAX_BUFFER_SIZE)
+        self._buffers[delivery_id] = buffer
+        if len(buffer) == buffer.maxlen:
+            self._forget(delivery_id, buffer[0])
+        buffer.append(frame)
+        self._total_bytes += len(frame.data)
+        if len(frame.data) >= LARGE_EVENT_BYTES and _is_tool_result(event):
+            self._large.setdefault(delivery_id, deque()).append(frame)
+        self._touch(delivery_id)
+
+        for queue in self._subscribers.get(delivery_id, []):
+            queue.put_nowait(frame)
+
+        if self._total_bytes > self._max_total_bytes:
+            self._enforce_budget()
+        self._maybe_sweep()
 
-    async def subscribe(self, delivery_id: str) -> AsyncGenerator[dict[str, Any], None]:
+    def subscribe(self, delivery_id: str) -> AsyncGenerator[dict[str, Any], None]:
+        return self._subscribe(delivery_id, raw=False)
+
+    def subscribe_frames(self, delivery_id: str) -> AsyncGenerator[bytes, None]:
+        """Like ``subscribe`` but yields pre-encoded SSE frames."""
+        return self._subscribe(delivery_id, raw=True)
+
+    async def _subscribe(self, delivery_id: str, raw: bool) -> AsyncGenerator[Any, None]:
         queue: asyncio.Queue = asyncio.Queue()
         # Replay buffered events
-        for event in list(self._buffers.get(delivery_id, [])):
-            queue.put_nowait(event)
-        self._subscribers[delivery_id].append(queue)
+        for frame in list(self._buffers.get(delivery_id, [])):
+            queue.put_nowait(frame)
+        self._subscribers.setdefault(delivery_id, []).append(queue)
+        self._touch(delivery_id)
         try:
             while True:
                 item = await queue.get()
                 if item is _SENTINEL:
                     break
-                yield item
+                yield item.data if raw else item.event
         finally:
-            self._subscribers[delivery_id].remove(queue)
+            queues = self._subscribers.get(delivery_id, [])
+            if queue in queues:
+                queues.remove(queue)
+            if not queues:
+                self._subscribers.pop(delivery_id, None)
+            self._touch(delivery_id)
 
     async def close(self, delivery_id: str) -> None:
         # Snapshot subscriber list to avoid mutation during iteration
         queues = list(self._subscribers.get(delivery_id, []))
         for queue in queues:
             queue.put_nowait(_SENTINEL)
-        self._buffers.pop(delivery_id, None)
+        self._drop_buffer(delivery_id)
 
     def is_active(self, delivery_id: str) -> bool:
         return delivery_id in self._buffers
+
+    def sweep(self, now: float | None = None) -> int:
+        """Drop idle buffers and activity records. Returns buffers dropped."""
+        now = time.monotonic() if now is None else now
+        self._last_sweep = now
+        dropped = 0
+        for delivery_id, last in list(self._last_activity.items()):
+            if delivery_id in self._subscribers or now - last < self._idle_ttl:
+                continue
+            if delivery_id in self._buffers:
+                dropped += 1
+            self._drop_buffer(delivery_id)
+        return dropped
+
+    def _touch(self, delivery_id: str) -> None:
+        self._last_activity[delivery_id] = time.monotonic()
+
+    def _maybe_sweep(self) -> None:
+        if time.monotonic() - self._last_sweep >= SWEEP_INTERVAL_SECONDS:
+            self.sweep()
+
+    def _forget(self, delivery_id: str, frame: Frame) -> None:
+        """Account for ``frame`` leaving the left end of its buffer."""
+        self._total_bytes -= len(frame.data)
+        large = self._large.get(delivery_id)
+        if large and large[0] is frame:
+            large.popleft()
+            if not large:
+                del self._large[delivery_id]
+
+    def _drop_buffer(self, delivery_id: str) -> None:
+        buffer = self._buffers.pop(delivery_id, None)
+        self._large.pop(delivery_id, None)
+        if buffer is not None:
+            self._total_bytes -= sum(len(f.data) for f in buffer)
+        if delivery_id not in self._subscribers:
+            self._last_activity.pop(delivery_id, None)
+
+    def _enforce_budget(self) -> None:
+        # Pass 1: shed just enough large tool_result payloads, oldest first.
+        # Only buffers that hold one are visited, and each visit evicts one.
+        while self._large and self._total_bytes > self._max_total_bytes:
+            delivery_id, large = next(iter(self._large.items()))
+            frame = large.popleft()
+            if not large:
+                del self._large[delivery_id]
+            buffer = self._buffers[delivery_id]
+            # Scan from the left: evicted frames are the buffer's oldest large ones
+            index = next(i for i, f in enumerate(buffer) if f is frame)
+            del buffer[index]
+            self._total_bytes -= len(frame.data)
+
+        # Pass 2: trim oldest frames, least recently active first
+        for delivery_id, buffer in self._buffers.items():
+            while buffer and self._total_bytes > self._max_total_bytes:
+                self._forget(delivery_id, buffer.popleft())
+            if self._total_bytes <= self._max_total_bytes:
+                return
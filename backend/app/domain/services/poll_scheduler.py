@@ -0,0 +1,108 @@
+"""Adaptive per-source poll scheduling.
+
+Each source keeps its own interval: it shrinks when a poll sees changes and
+grows while the source stays quiet. Sources sharing a GitHub token share its
+rate-limit budget, so when the polls they need before the limit resets
+exceed what the remaining budget allows, all of their intervals stretch
+proportionally.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Hashable, Iterable
+
+DEFAULT_MIN_INTERVAL = 15.0
+DEFAULT_MAX_INTERVAL = 900.0
+SPEEDUP = 0.5
+SLOWDOWN = 1.5
+# Share of the remaining budget left untouched for agent runs and PR creation
+RATE_LIMIT_RESERVE = 0.2
+
+
+class PollScheduler:
+    """Track next-poll times per source. All times are ``time.monotonic()`` seconds."""
+
+    def __init__(
+        self,
+        base_interval: float,
+        min_interval: float = DEFAULT_MIN_INTERVAL,
+        max_interval: float = DEFAULT_MAX_INTERVAL,
+    ) -> None:
+        self._base = base_interval
+        self._min = min(min_interval, base_interval)
+        self._max = max(max_interval, base_interval)
+        self._intervals: dict[str, float] = {}
+        self._next: dict[str, float] = {}
+        self._tokens: dict[str, Hashable] = {}
+        # token key -> (remaining requests, monotonic reset deadline)
+        self._budgets: dict[Hashable, tuple[int, float]] = {}
+
+    def due(self, source_ids: Iterable[str], now: float) -> list[str]:
+        """Return sources due for polling; unseen sources are due immediately.
+
+        State for sources not in ``source_ids`` is dropped.
+        """
+        ids = list(source_ids)
+        for stale in set(self._next) - set(ids):
+            self._forget(stale)
+        return [sid for sid in ids if self._next.get(sid, now) <= now]
+
+    def record(
+        self,
+        source_id: str,
+        token_key: Hashable,
+        changed: bool,
+        now: float,
+        remaining: int | None = None,
+        reset_in: float | None = None,
+    ) -> float:
+        """Record a finished poll and return the source's next poll time."""
+        interval = self._intervals.get(source_id, self._base)
+        interval *= SPEEDUP if changed else SLOWDOWN
+        interval = min(self._max, max(self._min, interval))
+        self._intervals[source_id] = interval
+        self._tokens[source_id] = token_key
+        if remaining is not None and reset_in is not None:
+            self._budgets[token_key] = (remaining, now + max(reset_in, 1.0))
+
+        self._next[source_id] = self._next_time(source_id, interval, now)
+        return self._next[source_id]
+
+    def delay(self, now: float) -> float:
+        """Seconds until the earliest scheduled poll.
+
+        Capped at the base interval so newly added sources are picked up
+        promptly even when every known source is scheduled far out.
+        """
+        if not self._next:
+            return self._base
+        return min(self._base, max(1.0, min(self._next.values()) - now))
+
+    def interval(self, source_id: str) -> float:
+        return self._intervals.get(source_id, self._base)
+
+    def _next_time(self, source_id: str, interval: float, now: float) -> float:
+        token_key = self._tokens[source_id]
+        budget = self._budgets.get(token_key)
+        if budget is None:
+            return now + interval
+        remaining, reset_at = budget
+        if reset_at <= now:
+            # Window has rolled over; the next response will refresh it
+            del self._budgets[token_key]
+            return now + interval
+        usable = remaining * (1 - RATE_LIMIT_RESERVE)
+        if usable < 1:
+            return max(now + interval, reset_at)
+        window = reset_at - now
+        demand = sum(
+            window / self._intervals[sid]
+            for sid, key in self._tokens.items()
+            if key == token_key
+        )
+        return now + interval * max(1.0, demand / usable)
+
+    def _forget(self, source_id: str) -> None:
+        self._intervals.pop(source_id, None)
+        self._next.pop(source_id, None)
+        self._tokens.pop(source_id, None)
@@ -0,0 +1,62 @@
+"""Aggregate per-run step timings across deliveries.
+
+Each agent run records a ``timings`` map (see ``RunTimings``). The summary
+groups them by repository so it is visible whether git, persistence or the
+agent itself dominates a repository's run latency.
+"""
+
+from __future__ import annotations
+
+import math
+from collections.abc import Iterable
+
+from app.domain.models.delivery import RunTimings
+
+TIMING_KEYS: tuple[str, ...] = tuple(RunTimings.model_fields)
+
+
+def _nearest_rank(ordered: list[float], pct: float) -> float:
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def _step_summary(values: list[float]) -> dict[str, float]:
+    ordered = sorted(values)
+    total = sum(ordered)
+    return {
+        "count": len(ordered),
+        "mean_ms": round(total / len(ordered), 1),
+        "p50_ms": _nearest_rank(ordered, 50),
+        "p95_ms": _nearest_rank(ordered, 95),
+        "total_ms": round(total, 1),
+    }
+
+
+def summarize_timings(deliveries: Iterable[dict]) -> dict[str, dict]:
+    """Per repository: runs with timings and count/mean/p50/p95 per step.
+
+    ``share`` is each step's fraction of the repository's total recorded
+    time, so the dominant step stands out without comparing percentiles.
+    """
+    samples: dict[str, dict[str, list[float]]] = {}
+    runs: dict[str, int] = {}
+    for delivery in deliveries:
+        repository = delivery.get("repository", "")
+        for run in delivery.get("runs", []):
+            timings = run.get("timings")
+            if not timings:
+                continue
+            runs[repository] = runs.get(repository, 0) + 1
+            steps = samples.setdefault(repository, {})
+            for key in TIMING_KEYS:
+                value = timings.get(key)
+                if value is not None:
+                    steps.setdefault(key, []).append(value)
+
+    summary: dict[str, dict] = {}
+    for repository, steps in sorted(samples.items()):
+        per_step = {key: _step_summary(values) for key, values in steps.items()}
+        grand_total = sum(s["total_ms"] for s in per_step.values())
+        for stats in per_step.values():
+            stats["share"] = round(stats["total_ms"] / grand_total, 3) if grand_total else 0.0
+        summary[repository] = {"runs": runs[repository], "steps": per_step}
+    return summary
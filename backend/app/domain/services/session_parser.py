@@ -1,17 +1,25 @@
 """Parse Claude session files (.jsonl).
 
 Reads session files in `~/.claude/projects/<hash>/<session_id>.jsonl`
-and converts them into StreamEvent lists.
+and converts them into EventRecords.
 Differences from stream-json: camelCase keys, no result event, noise event types.
+
+`analyze_session_file` streams a file line by line through `StreamAnalyzer`,
+so memory does not grow with the size of the raw session.
 """
 
 from __future__ import annotations
 
-import json
 import logging
+import threading
+import time
+from collections import OrderedDict
 from pathlib import Path
+from typing import Any, Iterable, Iterator
 
-from app.domain.models.stream import StreamEvent
+from app import json_codec
+from app.domain.models.stream import AnyStreamEvent, EventRecord, StreamMetadata
+from app.domain.services.stream_parser import StreamAnalyzer
 
 CLAUDE_PROJECTS_DIR = Path.home() / ".claude" / "projects"
 
@@ -19,8 +27,47 @@ logger = logging.getLogger(__name__)
 
 NOISE_TYPES = {"progress", "file-history-snapshot"}
 
+# Full rescan of the session index, in case a directory mtime change was missed
+SESSION_RESCAN_INTERVAL_SEC = 300
+SESSION_LRU_SIZE = 256
+
+
+class _ResultSynthesizer:
+    """Fold assistant usage and text into a synthetic result event."""
+
+    def __init__(self) -> None:
+        self.total_input = 0
+        self.total_output = 0
+        self.last_text = ""
 
-def synthesize_result_event(events: list[StreamEvent]) -> StreamEvent:
+    def add(self, ev: AnyStreamEvent) -> None:
+        if ev.type != "assistant" or not ev.message:
+            return
+        usage = ev.message.get("usage", {})
+        self.total_input += usage.get("input_tokens", 0)
+        self.total_output += usage.get("output_tokens", 0)
+        for block in ev.message.get("content", []):
+            if isinstance(block, dict) and block.get("type") == "text":
+                self.last_text = block.get("text", "")
+
+    def result_event(self) -> EventRecord:
+        if not self.last_text:
+            raise ValueError("no assistant message text found — session file looks invalid")
+        return EventRecord(
+            type="result",
+            subtype="success",
+            message={
+                "result": self.last_text,
+                "is_error": False,
+                "cost_usd": 0.0,
+                "input_tokens": self.total_input,
+                "output_tokens": self.total_output,
+                "duration_ms": 0,
+            },
+        )
+
+
+def synthesize_result_event(events: list[AnyStreamEvent]) -> EventRecord:
     """Synthesize a result event by aggregating assistant usage.
 
     Session files do not contain stream-json result events,
@@ -29,47 +76,21 @@ def synthesize_result_event(events: list[StreamEvent]) -> StreamEvent:
     Raises:
         ValueError: if no assistant message text exists
     """
-    total_input = 0
-    total_output = 0
-    last_text = ""
-
+    synthesizer = _ResultSynthesizer()
     for ev in events:
-        if ev.type != "assistant" or not ev.message:
-            continue
-        usage = ev.message.get("usage", {})
-        total_input += usage.get("input_tokens", 0)
-        total_output += usage.get("output_tokens", 0)
-        for block in ev.message.get("content", []):
-            if isinstance(block, dict) and block.get("type") == "text":
-                last_text = block.get("text", "")
-
-    if not last_text:
-        raise ValueError("no assistant message text found — session file looks invalid")
-
-    return StreamEvent(
-        type="result",
-        subtype="success",
-        message={
-            "result": last_text,
-            "is_error": False,
-            "cost_usd": 0.0,
-            "input_tokens": total_input,
-            "output_tokens": total_output,
-            "duration_ms": 0,
-        },
-    )
-
-
-def parse_session_lines(lines: list[str]) -> list[StreamEvent]:
-    """Session JSONL -> StreamEvents with noise filtering and camelCase mapping."""
-    events: list[StreamEvent] = []
+        synthesizer.add(ev)
+    return synthesizer.result_event()
+
+
+def iter_session_events(lines: Iterable[str]) -> Iterator[EventRecord]:
+    """Lazily convert session JSONL lines (e.g. an open file) to EventRecords."""
     for idx, line in enumerate(lines):
         line = line.strip()
         if not line:
             continue
         try:
-            data = json.loads(line)
-        except json.JSONDecodeError as exc:
+            data = json_codec.loads(line)
+        except json_codec.DecodeError as exc:
             logger.warning("Session JSONL parse failed (line %d): %s", idx, exc)
             continue
 
@@ -77,27 +98,126 @@ def parse_session_lines(lines: list[str]) -> list[StreamEvent]:
         if event_type in NOISE_TYPES:
             continue
 
-        events.append(StreamEvent(
-            type=event_type,
-            subtype=data.get("subtype"),
-            parent_tool_use_id=data.get("parentToolUseID"),
-            message=data.get("message"),
-            session_id=data.get("sessionId"),
-        ))
-    return events
+        yield EventRecord(
+            event_type,
+            data.get("subtype"),
+            data.get("parentToolUseID"),
+            data.get("message"),
+            data.get("sessionId"),
+        )
+
+
+def parse_session_lines(lines: Iterable[str]) -> list[EventRecord]:
+    """Session JSONL -> EventRecords with noise filtering and camelCase mapping."""
+    return list(iter_session_events(lines))
+
+
+def analyze_session_file(path: Path) -> tuple[StreamMetadata, dict[str, Any]]:
+    """Return metadata and transcript of a session file in a single streaming pass.
+
+    Lines are read through the file's buffer and folded into a
+    ``StreamAnalyzer`` as they are parsed; neither the raw text nor the
+    event list is held in memory.
+
+    Raises:
+        ValueError: if no assistant message text exists
+        OSError: if the file cannot be read
+    """
+    analyzer = StreamAnalyzer()
+    synthesizer = _ResultSynthesizer()
+    with path.open(encoding="utf-8") as f:
+        for ev in iter_session_events(f):
+            analyzer.push(ev)
+            synthesizer.add(ev)
+    analyzer.push(synthesizer.result_event())
+    return analyzer.metadata(), analyzer.transcript()
+
+
+class SessionIndex:
+    """session_id -> session file index over one or more projects roots.
+
+    Lookups hit a small LRU of recent results, then the index; only a miss
+    refreshes. A refresh stats each known project directory and relists
+    just those whose mtime changed (plus the roots, for new projects).
+    Every ``rescan_interval`` seconds a refresh rebuilds the whole index.
+    Returned paths are checked to still exist.
+    """
+
+    def __init__(
+        self,
+        base_dirs: list[Path],
+        rescan_interval: float = SESSION_RESCAN_INTERVAL_SEC,
+        lru_size: int = SESSION_LRU_SIZE,
+    ) -> None:
+        self._base_dirs = list(base_dirs)
+        self._rescan_interval = rescan_interval
+        self._lru_size = lru_size
+        self._lru: OrderedDict[str, Path] = OrderedDict()
+        self._paths: dict[str, Path] = {}
+        self._project_dirs: dict[Path, list[Path]] = {}
+        self._mtimes: dict[Path, int] = {}
+        self._last_full_scan = float("-inf")
+        self._lock = threading.Lock()
+
+    def find(self, session_id: str) -> Path | None:
+        with self._lock:
+            path = self._lru.get(session_id)
+            if path is not None and path.is_file():
+                self._lru.move_to_end(session_id)
+                return path
+            self._lru.pop(session_id, None)
+
+            path = self._paths.get(session_id)
+            if path is None or not path.is_file():
+                self._paths.pop(session_id, None)
+                self._refresh(time.monotonic())
+                path = self._paths.get(session_id)
+            if path is None:
+                return None
+            self._lru[session_id] = path
+            if len(self._lru) > self._lru_size:
+                self._lru.popitem(last=False)
+            return path
+
+    def _refresh(self, now: float) -> None:
+        full = now - self._last_full_scan >= self._rescan_interval
+        if full:
+            self._paths = {}
+            self._mtimes = {}
+            self._last_full_scan = now
+        for base in self._base_dirs:
+            if self._changed(base):
+                self._project_dirs[base] = [p for p in base.iterdir() if p.is_dir()]
+            for project_dir in self._project_dirs.get(base, []):
+                if self._changed(project_dir):
+                    for candidate in project_dir.glob("*.jsonl"):
+                        self._paths.setdefault(candidate.stem, candidate)
+
+    def _changed(self, directory: Path) -> bool:
+        """Record ``directory``'s mtime; True if it differs from the last refresh."""
+        try:
+            mtime = directory.stat().st_mtime_ns
+        except OSError:
+            return False
+        if self._mtimes.get(directory) == mtime:
+            return False
+        self._mtimes[directory] = mtime
+        return True
+
+
+_indexes: dict[tuple[Path, ...], SessionIndex] = {}
+_indexes_lock = threading.Lock()
 
 
 def find_session_file(
     session_id: str,
     search_dirs: list[Path] | None = None,
 ) -> Path | None:
-    """Find a session file under ~/.claude/projects/ recursively by project folder."""
+    """Find a session file under ~/.claude/projects/ by project folder, via a cached index."""
     dirs = search_dirs or ([CLAUDE_PROJECTS_DIR] if CLAUDE_PROJECTS_DIR.exists() else [])
-    for base in dirs:
-        for project_dir in base.iterdir():
-            if not project_dir.is_dir():
-                continue
-            candidate = project_dir / f"{session_id}.jsonl"
-            if candidate.exists():
-                return candidate
-    return None
+    key = tuple(dirs)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = SessionIndex(dirs)
+    return index.find(session_id)
@@ -1,7 +1,8 @@
-"""Extract metadata and transcript from StreamEvent lists.
+"""Extract metadata and transcript from stream event lists.
 
-`extract_metadata` and `extract_transcript` are consumed by the delivery
-pipeline. Events are produced by `session_parser.parse_session_lines` (from
+`StreamAnalyzer` consumes events once as they stream; `extract_metadata`,
+`extract_transcript` and `extract_agent_buckets` run it over a complete
+event list. Events are produced by `session_parser.parse_session_lines` (from
 local session JSONL files under ~/.claude/projects/).
 
 `parse_stream_lines` is retained for testing but is no longer used in the
@@ -10,151 +11,45 @@ production flow (the adapter now uses `--output-format json`).
 
 from __future__ import annotations
 
-import json
+from collections import deque
 from typing import Any
 
 import structlog
 
-from app.domain.models.stream import StreamEvent, StreamMetadata
+from app import json_codec
+from app.domain.models.stream import AnyStreamEvent, EventRecord, StreamMetadata
 
 logger = structlog.get_logger()
 
 
-def extract_metadata(events: list[StreamEvent]) -> StreamMetadata:
+def extract_metadata(events: list[AnyStreamEvent]) -> StreamMetadata:
     """Extract metadata from init + result events.
 
     When a result event is missing (e.g. CLI cancelled or crashed),
     falls back to assembling result_text from assistant text blocks.
     """
-    meta = StreamMetadata()
-    has_result = False
-    used_skills: list[str] = []
-
-    for ev in events:
-        if ev.type == "system" and ev.subtype == "init" and ev.message:
-            meta.model = ev.message.get("model", "unknown")
-            meta.cwd = ev.message.get("cwd")
-            meta.tools = ev.message.get("tools", [])
-            meta.skills = ev.message.get("skills", [])
-            raw_plugins = ev.message.get("plugins", [])
-            meta.plugins = [
-                p["name"] if isinstance(p, dict) else p
-                for p in raw_plugins
-            ]
-            meta.agents = ev.message.get("agents", [])
-        elif ev.type == "result" and ev.message:
-            has_result = True
-            msg = ev.message
-            meta.result_text = msg.get("result", "")
-            meta.cost_usd = msg.get("cost_usd") or msg.get("total_cost_usd", 0.0)
-            usage = msg.get("usage", {})
-            meta.input_tokens = msg.get("input_tokens") or usage.get("input_tokens", 0)
-            meta.output_tokens = msg.get("output_tokens") or usage.get("output_tokens", 0)
-            meta.duration_ms = msg.get("duration_ms", 0)
-            meta.is_success = not msg.get("is_error", True)
-
-        # Collect Skill tool invocations from assistant messages
-        if ev.type == "assistant" and ev.message:
-            content = ev.message.get("content")
-            if isinstance(content, list):
-                for block in content:
-                    if (
-                        isinstance(block, dict)
-                        and block.get("type") == "tool_use"
-                        and block.get("name") == "Skill"
-                    ):
-                        skill_name = (block.get("input") or {}).get("skill", "")
-                        if skill_name:
-                            used_skills.append(skill_name)
-
-    # Deduplicate while preserving invocation order
-    seen: set[str] = set()
-    meta.used_skills = [s for s in used_skills if not (s in seen or seen.add(s))]
-
-    if not has_result:
-        logger.warning(
-            "stream has no result event — falling back to assistant text",
-            event_count=len(events),
-            event_types=[ev.type for ev in events[-5:]],
-        )
-        meta.result_text = _assemble_result_text(events)
-        meta.is_success = bool(meta.result_text)
-
-    if not meta.result_text:
-        meta.result_text = "(no output captured)"
-
-    return meta
-
-
-def _assemble_result_text(events: list[StreamEvent]) -> str:
-    """Build result_text from the last assistant message text blocks."""
-    parts: list[str] = []
-    for ev in reversed(events):
-        if ev.type != "assistant" or not ev.message:
-            continue
-        content = ev.message.get("content")
-        if not isinstance(content, list):
-            continue
-        for block in content:
-            if isinstance(block, dict) and block.get("type") == "text":
-                text = block.get("text", "")
-                if text:
-                    parts.append(text)
-        if parts:
-            break
-    return "\n".join(reversed(parts))
+    return _analyze(events).metadata()
 
 
-def extract_transcript(events: list[StreamEvent]) -> dict[str, Any]:
+def extract_transcript(events: list[AnyStreamEvent]) -> dict[str, Any]:
     """Build transcript structure grouped by parent_tool_use_id."""
-    SKIP_TYPES = {"system", "result", "progress", "file-history-snapshot"}
-
-    buckets: dict[str, list[dict]] = {"leader": []}
-    agent_models: dict[str, str] = {}
-
-    for ev in events:
-        if ev.type == "system" and ev.subtype == "init" and ev.message:
-            agent_models["leader"] = ev.message.get("model", "unknown")
-            break
-    if "leader" not in agent_models:
-        agent_models["leader"] = "unknown"
-
-    for ev in events:
-        if ev.type in SKIP_TYPES:
-            continue
+    return _analyze(events).transcript()
 
-        msg = ev.message or {}
-        role = msg.get("role") or ev.type
-        content = _transform_content(msg.get("content"))
 
-        entry = {
-            "role": role,
-            "content": content,
-        }
+def extract_agent_buckets(events: list[AnyStreamEvent]) -> list[dict]:
+    """Extract agent bucket metadata for UI dropdown.
 
-        if ev.parent_tool_use_id is None:
-            buckets["leader"].append(entry)
-        else:
-            key = f"subagent_{ev.parent_tool_use_id}"
-            if key not in buckets:
-                buckets[key] = []
-            buckets[key].append(entry)
-            if key not in agent_models and msg.get("model"):
-                agent_models[key] = msg["model"]
-
-    agents_meta: dict[str, dict] = {}
-    for agent_key in buckets:
-        agents_meta[agent_key] = {
-            "model": agent_models.get(agent_key, "unknown"),
-        }
+    Collects unique parent_tool_use_id values (skipping system/result)
+    and labels them from the matching Task tool_use blocks.
+    """
+    return _analyze(events).agent_buckets()
 
-    result: dict[str, Any] = {
-        "meta": {"agents": agents_meta},
-    }
-    for agent_key, messages in buckets.items():
-        result[agent_key] = messages
 
-    return result
+def _analyze(events: list[AnyStreamEvent]) -> StreamAnalyzer:
+    analyzer = StreamAnalyzer()
+    for ev in events:
+        analyzer.push(ev)
+    return analyzer
 
 
 def _transform_content(content: Any) -> Any:
@@ -186,72 +81,13 @@ def _transform_content(content: Any) -> Any:
     return transformed
 
 
-def extract_agent_buckets(events: list[StreamEvent]) -> list[dict]:
-    """Extract agent bucket metadata for UI dropdown.
-
-    Scans events (skipping system/result) to collect unique
-    parent_tool_use_id values, then matches them to Task tool_use
-    blocks to build human-readable labels.
-    """
-    SKIP_TYPES = {"system", "result"}
-
-    ordered_parent_ids: list[str] = []
-    seen_parent_ids: set[str] = set()
-    has_leader = False
-
-    for ev in events:
-        if ev.type in SKIP_TYPES:
-            continue
-        if ev.parent_tool_use_id:
-            pid = ev.parent_tool_use_id
-            if pid not in seen_parent_ids:
-                ordered_parent_ids.append(pid)
-                seen_parent_ids.add(pid)
-        else:
-            has_leader = True
-
-    # Build label lookup from Task tool_use blocks
-    task_labels: dict[str, str] = {}
-    for ev in events:
-        if ev.type != "assistant" or not ev.message:
-            continue
-        content = ev.message.get("content")
-        if not isinstance(content, list):
-            continue
-        for block in content:
-            if not isinstance(block, dict):
-                continue
-            if (
-                block.get("type") == "tool_use"
-                and block.get("name") == "Task"
-                and block.get("id")
-            ):
-                bid = block["id"]
-                if bid in seen_parent_ids and bid not in task_labels:
-                    inp = block.get("input") or {}
-                    desc = inp.get("description", "")
-                    agent_type = inp.get("subagent_type", "")
-                    label = f"{agent_type}: {desc}" if agent_type else desc
-                    if label:
-                        task_labels[bid] = label
-
-    buckets: list[dict] = []
-    if has_leader:
-        buckets.append({"id": "leader", "label": "Leader"})
-
-    for pid in ordered_parent_ids:
-        label = task_labels.get(pid, pid[:8])
-        buckets.append({"id": pid, "label": label})
-
-    return buckets
-
-
 class StreamMetaTracker:
     """Incrementally track model and agent_buckets from streaming events.
 
-    Call ``push(event)`` for each incoming ``StreamEvent``.  When internal
-    state changes, ``push`` returns a ``meta`` dict suitable for SSE
-    broadcast; otherwise it returns ``None`` (no-op).
+    Call ``push(event)`` for each incoming ``EventRecord`` (or
+    ``StreamEvent``).  When internal state changes, ``push`` returns a
+    ``meta`` dict suitable for SSE broadcast; otherwise it returns ``None``
+    (no-op).
     """
 
     _SKIP_TYPES = frozenset({"system", "result"})
@@ -265,7 +101,7 @@ class StreamMetaTracker:
         self._used_skills: list[str] = []
         self._seen_skills: set[str] = set()
 
-    def push(self, ev: StreamEvent) -> dict | None:
+    def push(self, ev: AnyStreamEvent) -> dict | None:
         changed = False
 
         # Extract model from init event
@@ -300,14 +136,16 @@ class StreamMetaTracker:
                     name = block.get("name", "")
                     if name == "Task" and block.get("id"):
                         bid = block["id"]
-                        if bid in self._seen_parent_ids and bid not in self._task_labels:
+                        if bid not in self._task_labels:
                             inp = block.get("input") or {}
                             desc = inp.get("description", "")
                             agent_type = inp.get("subagent_type", "")
                             label = f"{agent_type}: {desc}" if agent_type else desc
                             if label:
+                                # The Task call usually precedes its subagent's
+                                # events; keep the label until the bucket appears.
                                 self._task_labels[bid] = label
-                                changed = True
+                                changed |= bid in self._seen_parent_ids
                     elif name == "Skill":
                         skill = (block.get("input") or {}).get("skill", "")
                         if skill and skill not in self._seen_skills:
@@ -319,36 +157,145 @@ class StreamMetaTracker:
             return None
         return self._snapshot()
 
-    def _snapshot(self) -> dict:
+    def agent_buckets(self) -> list[dict]:
         buckets: list[dict] = []
         if self._has_leader:
             buckets.append({"id": "leader", "label": "Leader"})
         for pid in self._ordered_parent_ids:
             buckets.append({"id": pid, "label": self._task_labels.get(pid, pid[:8])})
+        return buckets
+
+    def _snapshot(self) -> dict:
         return {
             "model": self.model,
-            "agent_buckets": buckets,
+            "agent_buckets": self.agent_buckets(),
             "used_skills": list(self._used_skills),
         }
 
 
-def parse_stream_lines(lines: list[str]) -> list[StreamEvent]:
-    """Convert JSONL lines to StreamEvents; skip malformed lines with warning."""
-    events: list[StreamEvent] = []
+class StreamAnalyzer(StreamMetaTracker):
+    """Single-pass analysis of a run's events as they stream.
+
+    Extends ``StreamMetaTracker`` (``push`` still returns live ``meta``
+    updates) and accumulates everything the post-run steps need, so
+    ``metadata()``, ``transcript()`` and ``agent_buckets()`` are available
+    at the end without keeping or re-reading the event list.
+    """
+
+    _TRANSCRIPT_SKIP_TYPES = frozenset({"system", "result", "progress", "file-history-snapshot"})
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._event_count = 0
+        self._recent_types: deque[str] = deque(maxlen=5)
+        self._init: dict | None = None
+        self._result: dict | None = None
+        # Text of the latest assistant message that had any
+        self._last_assistant_text = ""
+        self._buckets: dict[str, list[dict]] = {"leader": []}
+        self._agent_models: dict[str, str] = {}
+
+    def push(self, ev: AnyStreamEvent) -> dict | None:
+        meta = super().push(ev)
+        self._event_count += 1
+        self._recent_types.append(ev.type)
+        msg = ev.message
+
+        if ev.type == "system" and ev.subtype == "init" and msg:
+            self._init = msg
+            self._agent_models.setdefault("leader", msg.get("model", "unknown"))
+        elif ev.type == "result" and msg:
+            self._result = msg
+        elif ev.type == "assistant" and msg:
+            content = msg.get("content")
+            if isinstance(content, list):
+                parts = [
+                    block.get("text", "") for block in content
+                    if isinstance(block, dict) and block.get("type") == "text"
+                ]
+                parts = [p for p in parts if p]
+                if parts:
+                    self._last_assistant_text = "\n".join(reversed(parts))
+
+        if ev.type not in self._TRANSCRIPT_SKIP_TYPES:
+            msg = msg or {}
+            entry = {
+                "role": msg.get("role") or ev.type,
+                "content": _transform_content(msg.get("content")),
+            }
+            if ev.parent_tool_use_id is None:
+                self._buckets["leader"].append(entry)
+            else:
+                key = f"subagent_{ev.parent_tool_use_id}"
+                self._buckets.setdefault(key, []).append(entry)
+                if key not in self._agent_models and msg.get("model"):
+                    self._agent_models[key] = msg["model"]
+        return meta
+
+    def metadata(self) -> StreamMetadata:
+        meta = StreamMetadata()
+        if self._init is not None:
+            init = self._init
+            meta.model = init.get("model", "unknown")
+            meta.cwd = init.get("cwd")
+            meta.tools = init.get("tools", [])
+            meta.skills = init.get("skills", [])
+            meta.plugins = [
+                p["name"] if isinstance(p, dict) else p
+                for p in init.get("plugins", [])
+            ]
+            meta.agents = init.get("agents", [])
+        if self._result is not None:
+            msg = self._result
+            meta.result_text = msg.get("result", "")
+            meta.cost_usd = msg.get("cost_usd") or msg.get("total_cost_usd", 0.0)
+            usage = msg.get("usage", {})
+            meta.input_tokens = msg.get("input_tokens") or usage.get("input_tokens", 0)
+            meta.output_tokens = msg.get("output_tokens") or usage.get("output_tokens", 0)
+            meta.duration_ms = msg.get("duration_ms", 0)
+            meta.is_success = not msg.get("is_error", True)
+        else:
+            logger.warning(
+                "stream has no result event — falling back to assistant text",
+                event_count=self._event_count,
+                event_types=list(self._recent_types),
+            )
+            meta.result_text = self._last_assistant_text
+            meta.is_success = bool(meta.result_text)
+        meta.used_skills = list(self._used_skills)
+
+        if not meta.result_text:
+            meta.result_text = "(no output captured)"
+        return meta
+
+    def transcript(self) -> dict[str, Any]:
+        agents_meta = {
+            key: {"model": self._agent_models.get(key, "unknown")}
+            for key in self._buckets
+        }
+        result: dict[str, Any] = {"meta": {"agents": agents_meta}}
+        for key, messages in self._buckets.items():
+            result[key] = list(messages)
+        return result
+
+
+def parse_stream_lines(lines: list[str]) -> list[EventRecord]:
+    """Convert JSONL lines to EventRecords; skip malformed lines with warning."""
+    events: list[EventRecord] = []
     for idx, line in enumerate(lines):
         line = line.strip()
         if not line:
             continue
         try:
-            data = json.loads(line)
-        except json.JSONDecodeError as exc:
+            data = json_codec.loads(line)
+        except json_codec.DecodeError as exc:
             logger.warning("JSONL parse failed", line_number=idx, error=str(exc), content=line[:200])
             continue
-        events.append(StreamEvent(
-            type=data.get("type", ""),
-            subtype=data.get("subtype"),
-            parent_tool_use_id=data.get("parent_tool_use_id"),
-            message=data.get("message"),
-            session_id=data.get("session_id"),
+        events.append(EventRecord(
+            data.get("type", ""),
+            data.get("subtype"),
+            data.get("parent_tool_use_id"),
+            data.get("message"),
+            data.get("session_id"),
         ))
     return events
@@ -0,0 +1,89 @@
+"""Pluggable JSON codec for hot paths (storage, SSE frames, CLI stream parsing).
+
+Uses orjson, then msgspec, when installed (``pip install jakeops[fast-json]``)
+and falls back to the stdlib ``json`` module. Set JSON_CODEC to ``orjson``,
+``msgspec`` or ``json`` to force a backend; the default is ``auto``.
+
+All backends share one interface: ``loads`` accepts str or bytes, ``dumps``
+returns compact UTF-8 bytes, ``dumps_pretty`` returns 2-space indented UTF-8
+bytes, and ``DecodeError`` is the exception tuple raised on invalid input.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import json
+import os
+from typing import Any, Callable, NamedTuple
+
+
+class Codec(NamedTuple):
+    name: str
+    loads: Callable[[str | bytes], Any]
+    dumps: Callable[[Any], bytes]
+    dumps_pretty: Callable[[Any], bytes]
+    decode_error: tuple[type[Exception], ...]
+
+
+def _stdlib_codec() -> Codec:
+    def dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode()
+
+    def dumps_pretty(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode()
+
+    return Codec("json", json.loads, dumps, dumps_pretty, (json.JSONDecodeError,))
+
+
+def _orjson_codec() -> Codec:
+    import orjson
+
+    def dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+
+    def dumps_pretty(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_INDENT_2)
+
+    # orjson.JSONDecodeError subclasses json.JSONDecodeError
+    return Codec("orjson", orjson.loads, dumps, dumps_pretty, (json.JSONDecodeError,))
+
+
+def _msgspec_codec() -> Codec:
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps_pretty(obj: Any) -> bytes:
+        return msgspec.json.format(encoder.encode(obj), indent=2)
+
+    return Codec("msgspec", decoder.decode, encoder.encode, dumps_pretty, (msgspec.DecodeError,))
+
+
+_BACKENDS: dict[str, Callable[[], Codec]] = {
+    "orjson": _orjson_codec,
+    "msgspec": _msgspec_codec,
+    "json": _stdlib_codec,
+}
+
+
+def available_codecs() -> list[str]:
+    """Backends importable in this environment, fastest first."""
+    return [name for name in _BACKENDS if name == "json" or importlib.util.find_spec(name) is not None]
+
+
+def get_codec(name: str = "auto") -> Codec:
+    """Return the named backend, or the fastest available one for ``auto``."""
+    if name == "auto":
+        name = available_codecs()[0]
+    if name not in _BACKENDS:
+        raise ValueError(f"Unknown JSON codec: {name}")
+    return _BACKENDS[name]()
+
+
+codec = get_codec(os.environ.get("JSON_CODEC", "auto").lower())
+
+loads = codec.loads
+dumps = codec.dumps
+dumps_pretty = codec.dumps_pretty
+DecodeError = codec.decode_error
@@ -2,18 +2,115 @@
 
 Reads LOG_LEVEL and LOG_FORMAT from environment variables and configures
 structlog with appropriate processors and renderer.
+
+With LOG_QUEUE=true, log calls only enqueue the event dict; rendering and
+writing happen on a ``QueueListener`` thread, so a slow stderr/pipe cannot
+stall the event loop. The queue is bounded (LOG_QUEUE_SIZE) and drops
+records when full instead of blocking.
+
+Warnings are rate-limited per event name: at most LOG_RATE_LIMIT per
+LOG_RATE_WINDOW seconds (0 disables). The first warning after a window
+with drops carries ``suppressed=<count>``.
 """
 
+import atexit
+import copy
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 
 import structlog
 
+from app.metrics import REGISTRY
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "jakeops_log_records_dropped_total",
+    "Log records dropped by the rate limiter or a full log queue.",
+    ("reason",),
+)
+
+_RATE_LIMITED_LEVELS = frozenset({"warning", "warn"})
+
+_listener: logging.handlers.QueueListener | None = None
+
+
+class RateLimiter:
+    """Structlog processor that caps how often each warning is logged.
+
+    Counts warnings per ``event`` name in fixed windows of ``window``
+    seconds and drops those beyond ``limit``. Other levels pass through.
+    """
+
+    def __init__(self, limit: int, window: float) -> None:
+        self._limit = limit
+        self._window = window
+        self._lock = threading.Lock()
+        # event -> [window start, logged in window, suppressed in window]
+        self._state: dict[str, list] = {}
+
+    def __call__(self, logger, method_name: str, event_dict: dict) -> dict:
+        if method_name not in _RATE_LIMITED_LEVELS:
+            return event_dict
+        key = str(event_dict.get("event"))
+        now = time.monotonic()
+        with self._lock:
+            state = self._state.get(key)
+            if state is None or now - state[0] >= self._window:
+                suppressed = state[2] if state else 0
+                self._state[key] = [now, 1, 0]
+                if suppressed:
+                    event_dict["suppressed"] = suppressed
+                return event_dict
+            if state[1] < self._limit:
+                state[1] += 1
+                return event_dict
+            state[2] += 1
+        LOG_RECORDS_DROPPED.inc(reason="rate_limited")
+        raise structlog.DropEvent
+
+
+class _NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records without formatting them; drop instead of blocking.
+
+    structlog records carry the event dict in ``msg`` and are rendered by the
+    listener's ``ProcessorFormatter``. Foreign stdlib records get their
+    message merged here so later mutation of ``args`` cannot change it.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if not isinstance(record.msg, dict):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc(reason="queue_full")
+
+
+def stop_log_listener() -> None:
+    """Flush and stop the queue listener, if one is running."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
 
 def configure_logging() -> None:
     """Configure structlog and bridge stdlib logging."""
+    global _listener
     log_level = os.environ.get("LOG_LEVEL", "INFO").upper()
     log_format = os.environ.get("LOG_FORMAT", "console").lower()
+    log_queue = os.environ.get("LOG_QUEUE", "false").lower() == "true"
+    queue_size = int(os.environ.get("LOG_QUEUE_SIZE", "10000"))
+    rate_limit = int(os.environ.get("LOG_RATE_LIMIT", "20"))
+    rate_window = float(os.environ.get("LOG_RATE_WINDOW", "10"))
 
     shared_processors: list[structlog.types.Processor] = [
         structlog.contextvars.merge_contextvars,
@@ -28,8 +125,15 @@ def configure_logging() -> None:
     else:
         renderer = structlog.dev.ConsoleRenderer()
 
+    # Skip all processing for disabled levels, then drop floods before
+    # paying for timestamps and context merging
+    entry_processors: list[structlog.types.Processor] = [structlog.stdlib.filter_by_level]
+    if rate_limit > 0:
+        entry_processors.append(RateLimiter(rate_limit, rate_window))
+
     structlog.configure(
         processors=[
+            *entry_processors,
             *shared_processors,
             structlog.stdlib.ProcessorFormatter.wrap_for_formatter,
         ],
@@ -52,5 +156,15 @@ def configure_logging() -> None:
     handler = logging.StreamHandler()
     handler.setFormatter(formatter)
 
+    stop_log_listener()
     root_logger.handlers.clear()
-    root_logger.addHandler(handler)
+    if log_queue:
+        records: queue.Queue = queue.Queue(maxsize=queue_size)
+        _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+        _listener.start()
+        root_logger.addHandler(_NonBlockingQueueHandler(records))
+    else:
+        root_logger.addHandler(handler)
+
+
+atexit.register(stop_log_listener)
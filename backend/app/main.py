@@ -1,5 +1,6 @@
 import asyncio
 import os
+import shlex
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -7,20 +8,25 @@ import structlog
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import json_codec, profiling, tracing
+from app.metrics import instrument_event_bus
 from app.logging import configure_logging
 from app.middleware.logging import RequestLoggingMiddleware
-from app.adapters.inbound import deliveries, sources
+from app.adapters.inbound import admin, deliveries, metrics, sources, webhooks
+from app.adapters.inbound.responses import CodecJSONResponse
 from app.adapters.outbound.filesystem_delivery import FileSystemDeliveryRepository
 from app.adapters.outbound.filesystem_source import FileSystemSourceRepository
-from app.adapters.outbound.github_api import GitHubApiAdapter
+from app.adapters.outbound.github_api import GitHubApiAdapter, create_http_client
 from app.adapters.outbound.claude_cli import ClaudeCliAdapter
 from app.adapters.outbound.git_cli import GitCliAdapter
 from app.domain.services.event_bus import EventBus
+from app.domain.services.poll_scheduler import PollScheduler
 from app.usecases.delivery_usecases import DeliveryUseCasesImpl
 from app.usecases.source_usecases import SourceUseCasesImpl
 from app.usecases.delivery_sync import DeliverySyncUseCase
 
 configure_logging()
+tracing.configure_tracing()
 
 logger = structlog.get_logger()
 
@@ -30,6 +36,28 @@ DELIVERIES_DIR = Path(os.environ.get("JAKEOPS_DATA_DIR", PROJECT_ROOT / "deliver
 SOURCES_DIR = Path(os.environ.get("JAKEOPS_SOURCES_DIR", PROJECT_ROOT / "sources"))
 
 GITHUB_POLL_INTERVAL = int(os.environ.get("GITHUB_POLL_INTERVAL", "60"))
+GITHUB_POLL_MIN_INTERVAL = float(os.environ.get("GITHUB_POLL_MIN_INTERVAL", "15"))
+GITHUB_POLL_MAX_INTERVAL = float(os.environ.get("GITHUB_POLL_MAX_INTERVAL", "900"))
+GITHUB_POLL_CONCURRENCY = int(os.environ.get("GITHUB_POLL_CONCURRENCY", "8"))
+GITHUB_POLL_JITTER = float(os.environ.get("GITHUB_POLL_JITTER", "1.0"))
+GITHUB_POLL_INCREMENTAL = os.environ.get("GITHUB_POLL_INCREMENTAL", "true").lower() == "true"
+GITHUB_FULL_SYNC_EVERY = int(os.environ.get("GITHUB_FULL_SYNC_EVERY", "10"))
+GITHUB_POLL_GRAPHQL = os.environ.get("GITHUB_POLL_GRAPHQL", "false").lower() == "true"
+GITHUB_HTTP_MAX_CONNECTIONS = int(os.environ.get("GITHUB_HTTP_MAX_CONNECTIONS", "20"))
+GITHUB_HTTP_MAX_KEEPALIVE = int(os.environ.get("GITHUB_HTTP_MAX_KEEPALIVE", "10"))
+GITHUB_HTTP2 = os.environ.get("GITHUB_HTTP2", "true").lower() == "true"
+GITHUB_HTTP_MAX_RETRIES = int(os.environ.get("GITHUB_HTTP_MAX_RETRIES", "3"))
+CLAUDE_BIN = shlex.split(os.environ.get("CLAUDE_BIN", "claude"))
+GITHUB_WEBHOOK_SECRET = os.environ.get("GITHUB_WEBHOOK_SECRET", "")
+LOG_REQUEST_SAMPLE_RATE = float(os.environ.get("LOG_REQUEST_SAMPLE_RATE", "1.0"))
+LOG_SLOW_REQUEST_MS = float(os.environ.get("LOG_SLOW_REQUEST_MS", "1000"))
+# Enables /api/admin/* and per-request profiling; empty disables both
+ADMIN_TOKEN = os.environ.get("JAKEOPS_ADMIN_TOKEN", "")
+LOOP_LAG_THRESHOLD_MS = float(os.environ.get("LOOP_LAG_THRESHOLD_MS", "100"))
+LOOP_LAG_INTERVAL = float(os.environ.get("LOOP_LAG_INTERVAL", "0.5"))
+# Opt-in: attributes stalls to call sites from a thread pinging the loop
+LOOP_WATCHDOG = os.environ.get("LOOP_WATCHDOG", "false").lower() == "true"
+LOOP_WATCHDOG_INTERVAL = float(os.environ.get("LOOP_WATCHDOG_INTERVAL", "0.05"))
 CORS_ORIGINS = os.environ.get("JAKEOPS_CORS_ORIGINS", "*").split(",")
 
 
@@ -39,12 +67,19 @@ async def _poll_loop(
 ) -> None:
     while True:
         try:
-            result = await asyncio.to_thread(delivery_sync.sync_once)
+            with tracing.span("poll_once"):
+                result = await delivery_sync.poll_once(due_only=True)
             if result["created"] or result["closed"]:
                 logger.info("Delivery sync completed", created=result["created"], closed=result["closed"])
+            slowest = max(result["sources"], key=lambda r: r["duration_ms"], default=None)
+            logger.debug(
+                "Delivery poll timings",
+                sources=len(result["sources"]),
+                slowest=slowest,
+            )
         except Exception as e:
             logger.error("Delivery sync failed", error=str(e))
-        await asyncio.sleep(interval)
+        await asyncio.sleep(delivery_sync.next_poll_delay(interval))
 
 
 @asynccontextmanager
@@ -54,9 +89,10 @@ async def lifespan(app: FastAPI):
     source_repo = FileSystemSourceRepository(SOURCES_DIR)
 
     # Use Cases
-    runner = ClaudeCliAdapter()
+    runner = ClaudeCliAdapter(binary=CLAUDE_BIN)
     git_ops = GitCliAdapter()
     event_bus = EventBus()
+    instrument_event_bus(event_bus)
     app.state.delivery_usecases = DeliveryUseCasesImpl(
         delivery_repo, runner, git_ops, source_repo, event_bus=event_bus
     )
@@ -64,23 +100,64 @@ async def lifespan(app: FastAPI):
     app.state.source_usecases = SourceUseCasesImpl(source_repo)
 
     # Delivery Sync
-    github_adapter = GitHubApiAdapter()
+    github_client = create_http_client(
+        max_connections=GITHUB_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=GITHUB_HTTP_MAX_KEEPALIVE,
+        http2=GITHUB_HTTP2,
+    )
+    github_adapter = GitHubApiAdapter(
+        client=github_client,
+        max_retries=GITHUB_HTTP_MAX_RETRIES,
+    )
     delivery_sync = DeliverySyncUseCase(
         github_repo=github_adapter,
         source_repo=source_repo,
         delivery_usecases=app.state.delivery_usecases,
+        max_concurrency=GITHUB_POLL_CONCURRENCY,
+        jitter_sec=GITHUB_POLL_JITTER,
+        incremental=GITHUB_POLL_INCREMENTAL,
+        full_sync_every=GITHUB_FULL_SYNC_EVERY,
+        batch=GITHUB_POLL_GRAPHQL,
+        scheduler=PollScheduler(
+            base_interval=GITHUB_POLL_INTERVAL,
+            min_interval=GITHUB_POLL_MIN_INTERVAL,
+            max_interval=GITHUB_POLL_MAX_INTERVAL,
+        ),
     )
     app.state.delivery_sync = delivery_sync
+    # Webhooks push issue changes immediately; polling remains the reconciliation fallback
+    app.state.github_webhook_secret = GITHUB_WEBHOOK_SECRET
+    app.state.admin_token = ADMIN_TOKEN
     poll_task = asyncio.create_task(
         _poll_loop(delivery_sync, GITHUB_POLL_INTERVAL)
     )
     logger.info("Delivery polling started", interval_sec=GITHUB_POLL_INTERVAL)
+    logger.info("JSON codec selected", codec=json_codec.codec.name)
+    # With the watchdog on, it owns the stall warning (with the call site)
+    # and the lag monitor only records the lag histogram
+    lag_task = asyncio.create_task(
+        profiling.monitor_loop_lag(LOOP_LAG_THRESHOLD_MS, LOOP_LAG_INTERVAL, warn=not LOOP_WATCHDOG)
+    )
+    watchdog = None
+    if LOOP_WATCHDOG:
+        watchdog = profiling.LoopWatchdog(
+            asyncio.get_running_loop(), LOOP_LAG_THRESHOLD_MS, LOOP_WATCHDOG_INTERVAL,
+        ).start()
 
     yield
+    if watchdog is not None:
+        watchdog.stop()
+    lag_task.cancel()
     poll_task.cancel()
+    await github_adapter.aclose()
 
 
-app = FastAPI(title="jakeops", version="0.3.0", lifespan=lifespan)
+app = FastAPI(
+    title="jakeops",
+    version="0.3.0",
+    lifespan=lifespan,
+    default_response_class=CodecJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -88,8 +165,15 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(
+    RequestLoggingMiddleware,
+    sample_rate=LOG_REQUEST_SAMPLE_RATE,
+    slow_ms=LOG_SLOW_REQUEST_MS,
+)
 
 # Inbound Adapters (Routers)
 app.include_router(deliveries.router, prefix="/api")
 app.include_router(sources.router, prefix="/api")
+app.include_router(webhooks.router, prefix="/api")
+app.include_router(admin.router, prefix="/api")
+app.include_router(metrics.router)
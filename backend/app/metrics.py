@@ -0,0 +1,320 @@
+"""In-process metrics with Prometheus text exposition.
+
+A small dependency-free registry of counters, gauges and histograms,
+rendered by ``GET /metrics`` in the Prometheus text format (0.0.4). The
+application's metrics are declared at module level below; instrumented
+code imports them and calls ``inc``/``set``/``observe`` with label values
+as keyword arguments.
+"""
+
+from __future__ import annotations
+
+import abc
+import math
+import threading
+import time
+from bisect import bisect_left
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Agent runs and git operations take seconds to tens of minutes
+LONG_BUCKETS = (0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1200, 1800)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: tuple[str, ...]) -> str:
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+class _Metric(abc.ABC):
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, object]) -> tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    @abc.abstractmethod
+    def samples(self) -> Iterator[tuple[str, tuple[str, ...], tuple[str, ...], float]]:
+        """Yield ``(sample name, label names, label values, value)`` for rendering."""
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.type_name}"]
+        for name, labelnames, labelvalues, value in self.samples():
+            lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    type_name = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: object) -> None:
+        if amount < 0:
+            raise ValueError("counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: object) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self.labelnames, key, value
+
+
+class Gauge(_Metric):
+    """A value that goes up and down, or is read from a callback at scrape time."""
+
+    type_name = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+        self._function: Callable[[], float] | None = None
+
+    def set(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def set_function(self, function: Callable[[], float] | None) -> None:
+        """Read the (unlabelled) value from ``function`` on every scrape."""
+        if self.labelnames:
+            raise ValueError("set_function is only supported on unlabelled gauges")
+        self._function = function
+
+    def value(self, **labels: object) -> float:
+        if self._function is not None:
+            return self._function()
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self):
+        if self._function is not None:
+            yield self.name, (), (), self._function()
+            return
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, self.labelnames, key, value
+
+
+class Histogram(_Metric):
+    type_name = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [per-bucket counts..., +Inf count], sum
+        self._counts: dict[tuple[str, ...], list[int]] = {}
+        self._sums: dict[tuple[str, ...], float] = {}
+
+    def observe(self, value: float, **labels: object) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            counts = self._counts.get(key)
+            if counts is None:
+                counts = self._counts[key] = [0] * (len(self.buckets) + 1)
+            counts[index] += 1
+            self._sums[key] = self._sums.get(key, 0) + value
+
+    @contextmanager
+    def time(self, **labels: object) -> Iterator[None]:
+        """Observe the duration of the ``with`` block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: object) -> int:
+        return sum(self._counts.get(self._key(labels), ()))
+
+    def sum(self, **labels: object) -> float:
+        return self._sums.get(self._key(labels), 0)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(counts), self._sums[key]) for key, counts in self._counts.items()]
+        bucket_labels = (*self.labelnames, "le")
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), counts):
+                cumulative += count
+                yield f"{self.name}_bucket", bucket_labels, (*key, _format_value(bound)), cumulative
+            yield f"{self.name}_count", self.labelnames, key, cumulative
+            yield f"{self.name}_sum", self.labelnames, key, total
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._hooks: dict[str, Callable[[], None]] = {}
+
+    def before_render(self, key: str, function: Callable[[], None]) -> None:
+        """Call ``function`` once at the start of every render; reusing ``key`` replaces it."""
+        self._hooks[key] = function
+
+    def _register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"metric already registered: {metric.name}")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        for hook in list(self._hooks.values()):
+            hook()
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "jakeops_http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ("method", "route", "status"),
+)
+
+AGENT_RUNS = REGISTRY.counter(
+    "jakeops_agent_runs_total",
+    "Agent runs by phase, repository and outcome.",
+    ("phase", "repository", "status"),
+)
+AGENT_RUN_SECONDS = REGISTRY.histogram(
+    "jakeops_agent_run_duration_seconds",
+    "CLI-reported agent run duration.",
+    ("phase", "repository"),
+    buckets=LONG_BUCKETS,
+)
+AGENT_RUN_COST = REGISTRY.counter(
+    "jakeops_agent_run_cost_usd_total",
+    "CLI-reported agent cost in USD.",
+    ("phase", "repository"),
+)
+AGENT_RUN_TOKENS = REGISTRY.counter(
+    "jakeops_agent_run_tokens_total",
+    "Agent tokens by direction (input/output).",
+    ("phase", "repository", "direction"),
+)
+
+GIT_OPERATION_SECONDS = REGISTRY.histogram(
+    "jakeops_git_operation_duration_seconds",
+    "Duration of clone, checkout, push and PR creation.",
+    ("operation", "status"),
+    buckets=LONG_BUCKETS,
+)
+
+POLL_SECONDS = REGISTRY.histogram(
+    "jakeops_poll_duration_seconds",
+    "GitHub issue fetch duration per source and poll mode.",
+    ("repository", "mode"),
+)
+POLL_ERRORS = REGISTRY.counter(
+    "jakeops_poll_errors_total",
+    "Failed GitHub issue fetches per source.",
+    ("repository",),
+)
+
+EVENT_BUS_BUFFERS = REGISTRY.gauge(
+    "jakeops_event_bus_buffers", "Deliveries with a live replay buffer.",
+)
+EVENT_BUS_SUBSCRIBERS = REGISTRY.gauge(
+    "jakeops_event_bus_subscribers", "Connected SSE subscribers.",
+)
+EVENT_BUS_BUFFERED_BYTES = REGISTRY.gauge(
+    "jakeops_event_bus_buffered_bytes", "Encoded bytes held in replay buffers.",
+)
+EVENT_BUS_QUEUE_DEPTH = REGISTRY.gauge(
+    "jakeops_event_bus_queue_depth", "Frames waiting in subscriber queues, summed.",
+)
+EVENT_BUS_MAX_QUEUE_DEPTH = REGISTRY.gauge(
+    "jakeops_event_bus_max_queue_depth", "Frames waiting in the slowest subscriber's queue.",
+)
+
+EVENT_LOOP_LAG_SECONDS = REGISTRY.histogram(
+    "jakeops_event_loop_lag_seconds",
+    "How late the event loop woke up from a timed sleep.",
+)
+EVENT_LOOP_BLOCKS = REGISTRY.counter(
+    "jakeops_event_loop_blocks_total",
+    "Event-loop stalls over the watchdog threshold by blocking call site.",
+    ("call_site",),
+)
+EVENT_LOOP_BLOCKED_SECONDS = REGISTRY.counter(
+    "jakeops_event_loop_blocked_seconds_total",
+    "Time the event loop spent blocked by call site.",
+    ("call_site",),
+)
+
+
+def instrument_event_bus(event_bus) -> None:
+    """Point the event bus gauges at ``event_bus``'s live counters.
+
+    ``stats()`` walks every subscriber queue, so it runs once per scrape
+    and the gauges read from that snapshot.
+    """
+    stats = event_bus.stats()
+
+    def refresh() -> None:
+        stats.update(event_bus.stats())
+
+    REGISTRY.before_render("event_bus", refresh)
+    EVENT_BUS_BUFFERS.set_function(lambda: stats["buffers"])
+    EVENT_BUS_SUBSCRIBERS.set_function(lambda: stats["subscribers"])
+    EVENT_BUS_BUFFERED_BYTES.set_function(lambda: event_bus.buffered_bytes)
+    EVENT_BUS_QUEUE_DEPTH.set_function(lambda: stats["queue_depth"])
+    EVENT_BUS_MAX_QUEUE_DEPTH.set_function(lambda: stats["max_queue_depth"])
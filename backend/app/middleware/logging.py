@@ -1,21 +1,85 @@
 """ASGI middleware for structured request logging."""
 
+import hmac
+import random
 import time
 from uuid import uuid4
 
 import structlog
 from starlette.types import ASGIApp, Receive, Scope, Send
 
+from app import profiling, tracing
+from app.metrics import HTTP_REQUEST_SECONDS
+
 logger = structlog.get_logger()
 
-SKIP_PATHS = {"/health", "/api/health"}
+SKIP_PATHS = {"/health", "/api/health", "/metrics"}
+# Requests at least this slow are always logged, regardless of sampling
+DEFAULT_SLOW_REQUEST_MS = 1000.0
+
+
+def _route_template(scope: Scope) -> str:
+    """Matched route path (e.g. ``/api/deliveries/{delivery_id}``) to bound label cardinality."""
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _profile_requested(scope: Scope, headers: dict[bytes, bytes]) -> bool:
+    """``X-Profile: 1`` with a valid ``X-Admin-Token`` turns on profiling."""
+    if headers.get(b"x-profile", b"").lower() not in (b"1", b"true"):
+        return False
+    app = scope.get("app")
+    token = getattr(getattr(app, "state", None), "admin_token", "")
+    # Compare bytes: compare_digest rejects non-ASCII str
+    provided = headers.get(b"x-admin-token", b"")
+    return bool(token) and hmac.compare_digest(token.encode(), provided)
+
+
+def _start_sampler() -> profiling.StackSampler | None:
+    try:
+        return profiling.StackSampler().start()
+    except profiling.ProfilerBusyError as e:
+        logger.warning("request profiling skipped", error=str(e))
+        return None
+
+
+def _end_request_span(span: tracing.Span, scope: Scope, status_code: int) -> None:
+    if span.end_ns is not None:
+        return
+    span.name = f"{scope.get('method', '')} {_route_template(scope)}"
+    span.set_attribute("http_status_code", status_code)
+    if status_code >= 500:
+        span.status = "error"
+    span.end()
 
 
 class RequestLoggingMiddleware:
-    """Log method, path, status_code, and duration_ms for each HTTP request."""
+    """Log method, path, status_code, and duration_ms for each HTTP request.
+
+    Also records the latency in ``jakeops_http_request_duration_seconds``,
+    labelled by route template rather than raw path, and wraps the request
+    in a tracing span (continuing an incoming ``traceparent``). The span
+    ends with the response; background tasks started by the handler stay
+    its children.
+
+    ``sample_rate`` is the fraction of fast, successful requests that are
+    logged; errors (status >= 400) and requests slower than ``slow_ms`` are
+    always logged. Metrics and spans cover every request either way.
 
-    def __init__(self, app: ASGIApp) -> None:
+    Admins can profile a single request by sending ``X-Profile: 1`` with
+    their ``X-Admin-Token``: the response carries ``X-Profile-Id`` and the
+    collapsed stacks are served from ``/api/admin/profiles/{id}``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        sample_rate: float = 1.0,
+        slow_ms: float = DEFAULT_SLOW_REQUEST_MS,
+    ) -> None:
         self.app = app
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
 
     async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         if scope["type"] != "http":
@@ -34,22 +98,57 @@ class RequestLoggingMiddleware:
 
         structlog.contextvars.clear_contextvars()
         structlog.contextvars.bind_contextvars(request_id=request_id)
+        headers = dict(scope.get("headers") or [])
+        traceparent = headers.get(b"traceparent", b"").decode("latin-1")
+        span = tracing.start_span(
+            f"{method} {path}", traceparent=traceparent, request_id=request_id, http_method=method,
+        )
+        sampler = _start_sampler() if _profile_requested(scope, headers) else None
 
         async def send_wrapper(message: dict) -> None:
             nonlocal status_code
             if message["type"] == "http.response.start":
                 status_code = message.get("status", 0)
+                if sampler is not None:
+                    message["headers"] = [
+                        *message.get("headers", []), (b"x-profile-id", request_id.encode()),
+                    ]
             await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                _end_request_span(span, scope, status_code)
 
         try:
-            await self.app(scope, receive, send_wrapper)
+            with tracing.use_span(span):
+                await self.app(scope, receive, send_wrapper)
+        except BaseException as e:
+            span.record_error(e)
+            raise
         finally:
-            duration_ms = round((time.monotonic() - start) * 1000, 1)
-            logger.info(
-                "request",
-                method=method,
-                path=path,
-                status_code=status_code,
-                duration_ms=duration_ms,
+            _end_request_span(span, scope, status_code)
+            if sampler is not None:
+                self._save_profile(request_id, sampler)
+            elapsed = time.monotonic() - start
+            duration_ms = round(elapsed * 1000, 1)
+            HTTP_REQUEST_SECONDS.observe(
+                elapsed, method=method, route=_route_template(scope), status=status_code,
             )
+            if self._should_log(status_code, duration_ms):
+                logger.info(
+                    "request",
+                    method=method,
+                    path=path,
+                    status_code=status_code,
+                    duration_ms=duration_ms,
+                )
             structlog.contextvars.clear_contextvars()
+
+    @staticmethod
+    def _save_profile(request_id: str, sampler: profiling.StackSampler) -> None:
+        counts = sampler.stop()
+        profiling.save_profile(request_id, profiling.render_collapsed(counts))
+        logger.info("request profiled", profile_id=request_id, samples=sampler.samples)
+
+    def _should_log(self, status_code: int, duration_ms: float) -> bool:
+        if self.sample_rate >= 1 or status_code >= 400 or duration_ms >= self.slow_ms:
+            return True
+        return random.random() < self.sample_rate
@@ -6,6 +6,7 @@ from app.domain.models.delivery import DeliveryCreate, DeliveryUpdate
 class DeliveryUseCases(Protocol):
     def list_deliveries(self) -> list[dict]: ...
     def get_delivery(self, delivery_id: str) -> dict | None: ...
+    def get_run_timings(self) -> dict[str, dict]: ...
     def create_delivery(self, body: DeliveryCreate) -> dict: ...
     def update_delivery(self, delivery_id: str, body: DeliveryUpdate) -> dict | None: ...
     def close_delivery(self, delivery_id: str) -> dict | None: ...
@@ -1,8 +1,30 @@
 from typing import Protocol
 
-from app.domain.models.github import GitHubIssue
+from app.domain.models.github import GitHubIssue, RateLimit
 
 
 class GitHubRepository(Protocol):
-    def list_open_issues(self, owner: str, repo: str, token: str = "") -> list[GitHubIssue]: ...
-    def get_issue(self, owner: str, repo: str, number: int, token: str = "") -> GitHubIssue | None: ...
+    async def fetch_open_issues(
+        self, owner: str, repo: str, token: str = "", if_changed: bool = False,
+    ) -> list[GitHubIssue] | None:
+        """List all open issues. With ``if_changed``, return None when unchanged since the last call."""
+        ...
+
+    async def fetch_issues_since(self, owner: str, repo: str, since: str, token: str = "") -> list[GitHubIssue]:
+        """List open and closed issues updated at or after ``since`` (ISO 8601)."""
+        ...
+
+    async def fetch_open_issues_batch(
+        self, repositories: list[tuple[str, str]], token: str, if_changed: bool = False,
+    ) -> dict[str, list[GitHubIssue] | None]:
+        """List open issues of many repositories at once, keyed by ``"owner/repo"``.
+
+        Repositories that could not be read (other than not found) are omitted.
+        """
+        ...
+
+    async def get_issue(self, owner: str, repo: str, number: int, token: str = "") -> GitHubIssue | None: ...
+
+    def rate_limit(self, token: str = "", resource: str = "core") -> RateLimit | None:
+        """Most recent rate-limit state observed for ``token`` on ``resource`` ("core" or "graphql"), if any."""
+        ...
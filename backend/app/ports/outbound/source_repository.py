@@ -4,5 +4,6 @@ from typing import Protocol
 class SourceRepository(Protocol):
     def list_sources(self) -> list[dict]: ...
     def get_source(self, source_id: str) -> dict | None: ...
+    def get_source_by_repo(self, owner: str, repo: str) -> dict | None: ...
     def save_source(self, source_id: str, data: dict) -> None: ...
     def delete_source(self, source_id: str) -> bool: ...
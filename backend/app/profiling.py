@@ -0,0 +1,271 @@
+"""Wall-clock sampling profiler and event-loop lag monitor.
+
+``StackSampler`` polls ``sys._current_frames()`` from a background thread
+and counts every other thread's stack (the event loop, the ``to_thread``
+pool, the log listener, ...). ``render_collapsed`` writes the counts in
+the collapsed-stack format read by ``flamegraph.pl``, speedscope and
+inferno: one ``thread;outer;...;inner <count>`` line per distinct stack.
+Sampling is wall-clock, so threads waiting on I/O show up too (the loop
+idles in ``select``); that is what makes blocking calls visible.
+
+``monitor_loop_lag`` measures how late ``asyncio.sleep`` wakes up, records
+it in ``jakeops_event_loop_lag_seconds`` and logs when the loop was
+blocked longer than a threshold.
+
+``LoopWatchdog`` explains those stalls: while the loop is unresponsive it
+samples the loop thread's stack and, once the loop recovers, attributes
+the stall to the innermost application frame seen most often (e.g.
+``app/adapters/outbound/git_cli.py:GitCliAdapter._run_subprocess``).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from collections.abc import Sequence
+from pathlib import Path
+from types import FrameType
+
+import structlog
+
+from app.metrics import EVENT_LOOP_BLOCKED_SECONDS, EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG_SECONDS
+
+logger = structlog.get_logger()
+
+DEFAULT_INTERVAL = 0.005
+# Upper bound for one profile, also for per-request profiles of long SSE streams
+MAX_PROFILE_SECONDS = 60.0
+# Samplers running at once; each costs a few percent CPU at the default interval
+MAX_ACTIVE_SAMPLERS = 2
+RECENT_PROFILES_LIMIT = 20
+# Frames under these directories count as call sites for blocking attribution
+APP_ROOTS = (str(Path(__file__).resolve().parent),)
+# Innermost frames of the dominant stack included in blocking reports
+REPORT_STACK_DEPTH = 12
+
+_slots = threading.BoundedSemaphore(MAX_ACTIVE_SAMPLERS)
+_recent: OrderedDict[str, str] = OrderedDict()
+_recent_lock = threading.Lock()
+
+# Longest first, so files resolve against the most specific import root
+_PATH_PREFIXES = sorted(
+    {os.path.join(os.path.abspath(p), "") for p in sys.path if p},
+    key=len,
+    reverse=True,
+)
+
+
+class ProfilerBusyError(RuntimeError):
+    """Raised when ``MAX_ACTIVE_SAMPLERS`` profiles are already running."""
+
+
+def _short_path(filename: str) -> str:
+    for prefix in _PATH_PREFIXES:
+        if filename.startswith(prefix):
+            return filename[len(prefix):]
+    return filename
+
+
+def collapse_stack(frame: FrameType | None, thread_name: str) -> str:
+    """Root-first ``thread;func (file:line);...`` for one thread's frame."""
+    parts: list[str] = []
+    while frame is not None:
+        code = frame.f_code
+        parts.append(f"{code.co_name} ({_short_path(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    parts.append(thread_name)
+    parts.reverse()
+    # ';' separates frames and the last space separates the count
+    return ";".join(part.replace(";", ":") for part in parts)
+
+
+def render_collapsed(counts: Counter[str]) -> str:
+    """Collapsed-stack text, one ``stack count`` line per stack."""
+    return "".join(f"{stack} {count}\n" for stack, count in sorted(counts.items()))
+
+
+class StackSampler:
+    """Sample all other threads' stacks every ``interval`` seconds.
+
+    ``start`` takes one of ``MAX_ACTIVE_SAMPLERS`` slots and raises
+    ``ProfilerBusyError`` when none is free. Sampling stops on ``stop`` or
+    after ``max_seconds``, whichever comes first.
+    """
+
+    def __init__(self, interval: float = DEFAULT_INTERVAL, max_seconds: float = MAX_PROFILE_SECONDS) -> None:
+        self.interval = interval
+        self.max_seconds = max_seconds
+        self.counts: Counter[str] = Counter()
+        self.samples = 0
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> StackSampler:
+        if not _slots.acquire(blocking=False):
+            raise ProfilerBusyError(f"{MAX_ACTIVE_SAMPLERS} profiles already running")
+        self._thread = threading.Thread(target=self._run, name="jakeops-profiler", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> Counter[str]:
+        """Stop sampling and return the stack counts collected so far."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        return self.counts
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + self.max_seconds
+        try:
+            while not self._stopped.is_set() and time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                for thread_id, frame in sys._current_frames().items():
+                    if thread_id == own_id or names.get(thread_id) == "jakeops-profiler":
+                        continue
+                    self.counts[collapse_stack(frame, names.get(thread_id, str(thread_id)))] += 1
+                self.samples += 1
+                self._stopped.wait(self.interval)
+        finally:
+            _slots.release()
+
+
+async def profile(seconds: float, interval: float = DEFAULT_INTERVAL) -> Counter[str]:
+    """Sample the process for ``seconds`` without blocking the event loop."""
+    sampler = StackSampler(interval, max_seconds=seconds).start()
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        counts = sampler.stop()
+    return counts
+
+
+def save_profile(profile_id: str, collapsed: str) -> None:
+    """Keep a rendered profile for ``get_profile``; the oldest are evicted."""
+    with _recent_lock:
+        _recent[profile_id] = collapsed
+        _recent.move_to_end(profile_id)
+        while len(_recent) > RECENT_PROFILES_LIMIT:
+            _recent.popitem(last=False)
+
+
+def get_profile(profile_id: str) -> str | None:
+    with _recent_lock:
+        return _recent.get(profile_id)
+
+
+async def monitor_loop_lag(threshold_ms: float, interval: float = 0.5, warn: bool = True) -> None:
+    """Measure event-loop lag every ``interval`` seconds until cancelled.
+
+    Lag is how much later than requested ``asyncio.sleep`` returned; any
+    callback that runs synchronously for long shows up here. Pass
+    ``warn=False`` when a ``LoopWatchdog`` runs: it reports the same stalls
+    with their call site, and the monitor then only records the histogram.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        start = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(loop.time() - start - interval, 0.0)
+        EVENT_LOOP_LAG_SECONDS.observe(lag)
+        if warn and lag * 1000 >= threshold_ms:
+            logger.warning("event loop blocked", lag_ms=round(lag * 1000, 1), threshold_ms=threshold_ms)
+
+
+class LoopWatchdog:
+    """Attribute event-loop stalls to the call sites that caused them.
+
+    A daemon thread pings the loop with ``call_soon_threadsafe`` every
+    ``interval`` seconds. While a ping is unanswered for ``threshold_ms``
+    the thread samples the loop thread's stack; once the loop answers, the
+    stall is logged and counted under the dominant call site. The loop is
+    only sampled while it is stalled, so the steady-state cost is one
+    callback per ``interval``.
+
+    ``start`` must be called from the loop's own thread.
+    """
+
+    def __init__(
+        self,
+        loop: asyncio.AbstractEventLoop,
+        threshold_ms: float = 100.0,
+        interval: float = 0.05,
+        roots: Sequence[str] = APP_ROOTS,
+    ) -> None:
+        self.loop = loop
+        self.threshold_ms = threshold_ms
+        self.interval = interval
+        self._roots = tuple(os.path.join(os.path.abspath(root), "") for root in roots)
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._loop_thread_id: int | None = None
+        self._acked_at: float | None = None
+
+    def start(self) -> LoopWatchdog:
+        self._loop_thread_id = threading.get_ident()
+        self._thread = threading.Thread(target=self._run, name="jakeops-loop-watchdog", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _ack(self) -> None:
+        self._acked_at = time.monotonic()
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self._acked_at = None
+            sent_at = time.monotonic()
+            try:
+                self.loop.call_soon_threadsafe(self._ack)
+            except RuntimeError:
+                return  # loop closed
+            sites: Counter[str] = Counter()
+            stacks: Counter[str] = Counter()
+            while self._acked_at is None and not self._stopped.wait(self.interval):
+                if (time.monotonic() - sent_at) * 1000 >= self.threshold_ms:
+                    self._sample(sites, stacks)
+            if sites and self._acked_at is not None:
+                self._report(self._acked_at - sent_at, sites, stacks)
+            self._stopped.wait(self.interval)
+
+    def _sample(self, sites: Counter[str], stacks: Counter[str]) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        if frame is None:
+            return
+        sites[self.call_site(frame)] += 1
+        stacks[collapse_stack(frame, "loop")] += 1
+
+    def call_site(self, frame: FrameType) -> str:
+        """Innermost frame under one of ``roots``, else the innermost frame."""
+        leaf = frame
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if filename.startswith(self._roots) and filename != __file__:
+                break
+            frame = frame.f_back
+        code = (frame or leaf).f_code
+        return f"{_short_path(code.co_filename)}:{code.co_qualname}"
+
+    def _report(self, blocked: float, sites: Counter[str], stacks: Counter[str]) -> None:
+        call_site, hits = sites.most_common(1)[0]
+        stack = stacks.most_common(1)[0][0].split(";")
+        EVENT_LOOP_BLOCKS.inc(call_site=call_site)
+        EVENT_LOOP_BLOCKED_SECONDS.inc(blocked, call_site=call_site)
+        logger.warning(
+            "blocking call detected",
+            call_site=call_site,
+            blocked_ms=round(blocked * 1000, 1),
+            samples=sum(sites.values()),
+            share=round(hits / sum(sites.values()), 2),
+            stack=stack[-REPORT_STACK_DEPTH:],
+        )
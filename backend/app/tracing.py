@@ -0,0 +1,290 @@
+"""Lightweight tracing spans propagated through contextvars.
+
+``span(name, **attributes)`` opens a child of the current span (or a new
+trace) for the duration of a ``with`` block, in sync and async code alike:
+asyncio tasks and ``asyncio.to_thread`` copy the context, so spans opened
+there nest under their caller. The active ``trace_id``/``span_id`` are
+bound into structlog's contextvars next to ``request_id``, so log lines
+can be joined to spans.
+
+Trace and span ids follow the W3C Trace Context format and
+``RequestLoggingMiddleware`` honours an incoming ``traceparent`` header,
+so traces line up with OpenTelemetry-instrumented callers. Finished spans
+go to a pluggable ``SpanExporter``. Configure with TRACE_EXPORTER
+(``none`` | ``file`` | ``log``, default ``none``) and TRACE_FILE (JSON
+lines, default ``traces.jsonl``). The file exporter writes from a
+background thread, so finishing a span never touches the disk.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import queue
+import random
+import re
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Protocol
+
+import structlog
+
+from app import json_codec
+from app.metrics import REGISTRY
+
+logger = structlog.get_logger()
+
+SPANS_DROPPED = REGISTRY.counter(
+    "jakeops_spans_dropped_total",
+    "Finished spans dropped because the span export queue was full.",
+)
+
+DEFAULT_SPAN_QUEUE_SIZE = 10_000
+
+_TRACEPARENT_RE = re.compile(r"^00-([0-9a-f]{32})-([0-9a-f]{16})-[0-9a-f]{2}$")
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start_ns", "end_ns", "attributes", "status", "error")
+
+    def __init__(
+        self,
+        name: str,
+        trace_id: str,
+        parent_id: str | None = None,
+        attributes: dict[str, Any] | None = None,
+    ) -> None:
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: int | None = None
+        self.attributes = attributes or {}
+        self.status = "unset"
+        self.error: str | None = None
+
+    @property
+    def duration_ms(self) -> float | None:
+        if self.end_ns is None:
+            return None
+        return round((self.end_ns - self.start_ns) / 1e6, 3)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException | str) -> None:
+        self.status = "error"
+        self.error = str(error)
+
+    def end(self) -> None:
+        """Finish the span and hand it to the exporter. Later calls are no-ops."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if self.status == "unset":
+            self.status = "ok"
+        if _exporter is not None:
+            try:
+                _exporter.export(self)
+            except Exception as e:
+                logger.warning("span export failed", span=self.name, error=str(e))
+
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def to_dict(self) -> dict[str, Any]:
+        """OTLP/JSON-style field names, one span per record."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id,
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "durationMs": self.duration_ms,
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error,
+        }
+
+
+class SpanExporter(Protocol):
+    def export(self, span: Span) -> None:
+        """Receive a finished span. Must not block for long."""
+        ...
+
+
+class FileSpanExporter:
+    """Append finished spans as JSON lines to ``path`` from a writer thread.
+
+    ``export`` only enqueues the span's record; a daemon thread serializes
+    it and writes it through one file handle held open until ``close``.
+    The queue is bounded (``max_queue``) and drops spans when full instead
+    of blocking the caller.
+    """
+
+    _STOP = object()
+
+    def __init__(self, path: Path, max_queue: int = DEFAULT_SPAN_QUEUE_SIZE) -> None:
+        self._path = Path(path)
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = self._path.open("ab")
+        self._queue: queue.Queue = queue.Queue(max_queue)
+        self._thread: threading.Thread | None = threading.Thread(
+            target=self._run, name="jakeops-span-writer", daemon=True,
+        )
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        try:
+            self._queue.put_nowait(span.to_dict())
+        except queue.Full:
+            SPANS_DROPPED.inc()
+
+    def flush(self) -> None:
+        """Block until every span exported so far is written to the file."""
+        self._queue.join()
+
+    def close(self) -> None:
+        """Write the queued spans, stop the writer thread and close the file."""
+        if self._thread is None:
+            return
+        self._queue.put(self._STOP)
+        self._thread.join()
+        self._thread = None
+        self._file.close()
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            try:
+                if record is self._STOP:
+                    return
+                self._file.write(json_codec.dumps(record) + b"\n")
+                # Hand a burst to the OS once the queue is drained
+                if self._queue.empty():
+                    self._file.flush()
+            except Exception as e:
+                logger.warning("span export failed", span=record.get("name"), error=str(e))
+            finally:
+                self._queue.task_done()
+
+
+class LogSpanExporter:
+    """Emit finished spans as structlog ``span`` events."""
+
+    def export(self, span: Span) -> None:
+        logger.info(
+            "span",
+            span=span.name,
+            duration_ms=span.duration_ms,
+            status=span.status,
+            parent_span_id=span.parent_id,
+            **span.attributes,
+        )
+
+
+class InMemorySpanExporter:
+    """Keep finished spans in a list; for tests and the benchmarks."""
+
+    def __init__(self) -> None:
+        self.spans: list[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+_exporter: SpanExporter | None = None
+_current: ContextVar[Span | None] = ContextVar("jakeops_current_span", default=None)
+
+
+def set_exporter(exporter: SpanExporter | None) -> SpanExporter | None:
+    """Install ``exporter`` (``None`` disables export); returns the previous one."""
+    global _exporter
+    previous, _exporter = _exporter, exporter
+    return previous
+
+
+def shutdown_tracing() -> None:
+    """Uninstall the exporter, writing out spans it still buffers."""
+    previous = set_exporter(None)
+    close = getattr(previous, "close", None)
+    if close is not None:
+        close()
+
+
+def configure_tracing() -> None:
+    """Install the exporter selected by TRACE_EXPORTER / TRACE_FILE."""
+    kind = os.environ.get("TRACE_EXPORTER", "none").lower()
+    if kind not in ("file", "log", "none"):
+        raise ValueError(f"Unknown TRACE_EXPORTER: {kind}")
+    shutdown_tracing()
+    if kind == "file":
+        set_exporter(FileSpanExporter(Path(os.environ.get("TRACE_FILE", "traces.jsonl"))))
+    elif kind == "log":
+        set_exporter(LogSpanExporter())
+
+
+atexit.register(shutdown_tracing)
+
+
+def current_span() -> Span | None:
+    return _current.get()
+
+
+def parse_traceparent(header: str | None) -> tuple[str, str] | None:
+    """Return ``(trace_id, parent_span_id)`` from a W3C ``traceparent`` header."""
+    if not header:
+        return None
+    match = _TRACEPARENT_RE.match(header.strip().lower())
+    if match is None or set(match.group(1)) == {"0"} or set(match.group(2)) == {"0"}:
+        return None
+    return match.group(1), match.group(2)
+
+
+def start_span(name: str, traceparent: str | None = None, **attributes: Any) -> Span:
+    """Create a span under the current one, ``traceparent``, or a new trace.
+
+    The span is not made current; use ``span`` for that, or ``use_span``
+    when its end is decoupled from the block (e.g. an HTTP response).
+    """
+    parent = _current.get()
+    remote = parse_traceparent(traceparent)
+    if remote is not None:
+        trace_id, parent_id = remote
+    elif parent is not None:
+        trace_id, parent_id = parent.trace_id, parent.span_id
+    else:
+        trace_id, parent_id = f"{random.getrandbits(128):032x}", None
+    return Span(name, trace_id, parent_id, attributes)
+
+
+@contextmanager
+def use_span(span: Span) -> Iterator[Span]:
+    """Make ``span`` current (and visible in logs) without ending it."""
+    token = _current.set(span)
+    log_tokens = structlog.contextvars.bind_contextvars(trace_id=span.trace_id, span_id=span.span_id)
+    try:
+        yield span
+    finally:
+        structlog.contextvars.reset_contextvars(**log_tokens)
+        _current.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Span]:
+    """Run the block inside a new child span; exceptions mark it as errored."""
+    current = start_span(name, **attributes)
+    try:
+        with use_span(current):
+            yield current
+    except BaseException as e:
+        current.record_error(e)
+        raise
+    finally:
+        current.end()
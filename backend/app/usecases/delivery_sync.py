@@ -1,16 +1,69 @@
+import asyncio
 import hashlib
-from datetime import datetime
+import random
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 
 import structlog
 
+from app import metrics, tracing
 from app.domain.constants import KST, ID_HEX_LENGTH
 from app.domain.models.delivery import Ref, RefRole, RefType, DeliveryCreate, Phase, RunStatus, Session
+from app.domain.models.github import GitHubIssue, token_key
+from app.domain.services.poll_scheduler import PollScheduler
 from app.ports.outbound.github_repository import GitHubRepository
 from app.ports.outbound.source_repository import SourceRepository
 from app.ports.inbound.delivery_usecases import DeliveryUseCases
 
 logger = structlog.get_logger()
 
+DEFAULT_POLL_CONCURRENCY = 8
+DEFAULT_FULL_SYNC_EVERY = 10
+# Incremental fetches start this far before last_polled_at to absorb clock
+# skew between us and GitHub; re-applying an overlapping delta is a no-op.
+SINCE_OVERLAP = timedelta(seconds=60)
+# Rebuild the issue index from storage this often to pick up deliveries
+# created or closed outside of sync (API, webhooks, manual edits).
+INDEX_REFRESH_SEC = 300
+
+_UNSEEN = object()
+
+
+def _record_poll_metrics(report: dict) -> None:
+    repository = report["repository"]
+    metrics.POLL_SECONDS.observe(report["duration_ms"] / 1000, repository=repository, mode=report["mode"])
+    if "error" in report:
+        metrics.POLL_ERRORS.inc(repository=repository)
+
+
+def _since(last_polled_at: str) -> str:
+    ts = datetime.fromisoformat(last_polled_at) - SINCE_OVERLAP
+    return ts.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _delivery_id(owner: str, repo: str, number: int) -> str:
+    raw = f"{owner}/{repo}:#{number}"
+    return hashlib.sha256(raw.encode()).hexdigest()[:ID_HEX_LENGTH]
+
+
+def _full_repo(source: dict) -> str:
+    return f"{source['owner']}/{source['repo']}"
+
+
+def _request_issue_number(delivery: dict) -> int | None:
+    request_ref = next(
+        (r for r in delivery.get("refs", [])
+         if r.get("role") == "request" and r.get("type") == "github_issue"),
+        None,
+    )
+    if request_ref is None:
+        return None
+    label = request_ref.get("label", "")
+    if not label.startswith("#") or not label[1:].isdigit():
+        return None
+    return int(label[1:])
+
 
 class DeliverySyncUseCase:
     def __init__(
@@ -18,86 +71,394 @@ class DeliverySyncUseCase:
         github_repo: GitHubRepository,
         source_repo: SourceRepository,
         delivery_usecases: DeliveryUseCases,
+        max_concurrency: int = DEFAULT_POLL_CONCURRENCY,
+        jitter_sec: float = 0.0,
+        incremental: bool = False,
+        full_sync_every: int = DEFAULT_FULL_SYNC_EVERY,
+        scheduler: PollScheduler | None = None,
+        batch: bool = False,
     ) -> None:
         self._github = github_repo
         self._sources = source_repo
         self._deliveries = delivery_usecases
+        self._max_concurrency = max(1, max_concurrency)
+        self._jitter_sec = jitter_sec
+        self._incremental = incremental
+        self._full_sync_every = full_sync_every
+        self._scheduler = scheduler
+        self._batch = batch
+        # source_id -> incremental polls since the last full listing
+        self._delta_polls: dict[str, int] = {}
+        # repository -> {issue number -> delivery id} for open deliveries
+        self._open_index: dict[str, dict[int, str]] = {}
+        # repository -> issue numbers whose delivery is already closed
+        self._closed_index: dict[str, set[int]] = {}
+        # source_id -> {issue number -> updated_at} from its recent listings
+        self._seen_updates: dict[str, dict[int, str | None]] = {}
+        self._index_built_at: float | None = None
+        self._lock = threading.Lock()
 
     def sync_once(self) -> dict:
-        created = 0
-        closed = 0
-        sources = self._sources.list_sources()
-        for source in sources:
-            if not source.get("active", True):
-                continue
-            owner, repo = source["owner"], source["repo"]
-            try:
-                gh_issues = self._github.list_open_issues(owner, repo, token=source.get("token", ""))
-            except Exception as e:
-                logger.error("Failed to fetch issues", owner=owner, repo=repo, error=str(e))
-                continue
+        """Blocking ``poll_once`` over every active source, for callers without a running loop.
+
+        Returns only the ``created`` and ``closed`` counts.
+        """
+        result = asyncio.run(self.poll_once())
+        return {"created": result["created"], "closed": result["closed"]}
+
+    async def poll_once(self, due_only: bool = False) -> dict:
+        """Poll active sources concurrently, then reconcile deliveries.
+
+        Fetches run on the GitHub adapter's shared async client, bounded by
+        ``max_concurrency`` and staggered by up to ``jitter_sec`` per source.
+        Reconciliation touches the delivery repository and runs serially in a
+        worker thread; sources whose listing is unchanged since the last poll
+        skip it. The result carries per-source fetch timings.
 
-            source["last_polled_at"] = datetime.now(KST).isoformat()
-            self._sources.save_source(source["id"], source)
-
-            default_endpoint = source.get("endpoint", "deploy")
-            default_checkpoints = source.get("checkpoints", ["plan", "implement", "review"])
-
-            for gh_issue in gh_issues:
-                label = f"#{gh_issue.number}"
-                raw = f"{owner}/{repo}:{label}"
-                delivery_id = hashlib.sha256(raw.encode()).hexdigest()[:ID_HEX_LENGTH]
-
-                if self._deliveries.get_delivery(delivery_id):
-                    continue
-
-                body = DeliveryCreate(
-                    phase=Phase.intake,
-                    run_status=RunStatus.succeeded,
-                    endpoint=Phase(default_endpoint),
-                    checkpoints=[Phase(cp) for cp in default_checkpoints],
-                    summary=f"GitHub Issue #{gh_issue.number}: {gh_issue.title}",
-                    repository=f"{owner}/{repo}",
-                    refs=[
-                        Ref(
-                            role=RefRole.request,
-                            type=RefType.github_issue,
-                            label=label,
-                            url=gh_issue.html_url,
+        With a scheduler, every poll outcome feeds it, and ``due_only``
+        restricts the round to sources whose next poll time has passed.
+        In batch mode, due sources sharing a token are fetched with one
+        GraphQL listing per group instead of one REST walk each.
+        """
+        sources = await asyncio.to_thread(self._active_sources)
+        if due_only and self._scheduler is not None:
+            due = set(self._scheduler.due([s["id"] for s in sources], time.monotonic()))
+            sources = [s for s in sources if s["id"] in due]
+        groups, sources = self._batch_groups(sources)
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def fetch_batch(token: str, group: list[dict]) -> list[tuple]:
+            async with semaphore:
+                polled_at = datetime.now(KST).isoformat()
+                start = time.monotonic()
+                try:
+                    with tracing.span("poll.fetch_batch", batch_size=len(group)):
+                        listings = await self._github.fetch_open_issues_batch(
+                            [(s["owner"], s["repo"]) for s in group], token=token, if_changed=True,
                         )
-                    ],
-                )
-                result = self._deliveries.create_delivery(body)
-                self._deliveries.advance_from_intake(result["id"])
-                created += 1
-                logger.info("Created delivery", owner=owner, repo=repo, label=label)
-
-            # Close deliveries whose request issues are no longer open
-            open_numbers = {issue.number for issue in gh_issues}
-            full_repo = f"{owner}/{repo}"
-            all_deliveries = self._deliveries.list_deliveries()
-            for delivery in all_deliveries:
-                if delivery["phase"] == "close":
-                    continue
-                if delivery.get("repository") != full_repo:
-                    continue
-
-                request_ref = next(
-                    (r for r in delivery.get("refs", [])
-                     if r.get("role") == "request" and r.get("type") == "github_issue"),
-                    None,
+                    error = None
+                except Exception as e:
+                    logger.error(
+                        "Failed to fetch issues", repositories=[_full_repo(s) for s in group], error=str(e),
+                    )
+                    listings, error = {}, e
+                duration_ms = round((time.monotonic() - start) * 1000, 1)
+            results = []
+            for source in group:
+                gh_issues = error or listings.get(
+                    _full_repo(source), RuntimeError(f"GitHub repository not readable: {_full_repo(source)}"),
                 )
-                if request_ref is None:
-                    continue
+                report: dict = {
+                    "source_id": source.get("id"),
+                    "repository": _full_repo(source),
+                    "mode": "batch",
+                    "batch_size": len(group),
+                    "duration_ms": duration_ms,
+                }
+                if isinstance(gh_issues, Exception):
+                    report["error"] = str(gh_issues)
+                elif gh_issues is None:
+                    report["unchanged"] = True
+                else:
+                    report["issues"] = len(gh_issues)
+                results.append((source, gh_issues, False, polled_at, report))
+            return results
+
+        async def fetch(source: dict) -> tuple:
+            if self._jitter_sec > 0:
+                await asyncio.sleep(random.uniform(0, self._jitter_sec))
+            owner, repo = source["owner"], source["repo"]
+            token = source.get("token", "")
+            since = self._since_for(source)
+            report: dict = {
+                "source_id": source.get("id"),
+                "repository": f"{owner}/{repo}",
+                "mode": "delta" if since else "full",
+            }
+            async with semaphore:
+                polled_at = datetime.now(KST).isoformat()
+                start = time.monotonic()
+                try:
+                    with tracing.span("poll.fetch", repository=report["repository"], mode=report["mode"]):
+                        if since:
+                            gh_issues = await self._github.fetch_issues_since(owner, repo, since, token=token)
+                        else:
+                            gh_issues = await self._github.fetch_open_issues(
+                                owner, repo, token=token, if_changed=True,
+                            )
+                except Exception as e:
+                    logger.error("Failed to fetch issues", owner=owner, repo=repo, error=str(e))
+                    gh_issues = e
+                    report["error"] = str(e)
+                report["duration_ms"] = round((time.monotonic() - start) * 1000, 1)
+            if gh_issues is None:
+                report["unchanged"] = True
+            elif isinstance(gh_issues, list):
+                report["issues"] = len(gh_issues)
+            return source, gh_issues, since is not None, polled_at, report
+
+        batched, single = await asyncio.gather(
+            asyncio.gather(*(fetch_batch(token, group) for token, group in groups.items())),
+            asyncio.gather(*(fetch(s) for s in sources)),
+        )
+        fetched = [item for group in batched for item in group] + list(single)
+        for *_, report in fetched:
+            _record_poll_metrics(report)
+
+        def reconcile_all() -> list[tuple[int, int]]:
+            return [
+                (0, 0) if isinstance(gh_issues, Exception)
+                else self._apply(source, gh_issues, delta=delta, polled_at=polled_at)
+                for source, gh_issues, delta, polled_at, _ in fetched
+            ]
+
+        with tracing.span("poll.reconcile", sources=len(fetched)):
+            outcomes = await asyncio.to_thread(reconcile_all)
+        created = sum(c for c, _ in outcomes)
+        closed = sum(d for _, d in outcomes)
+        # Schedule after reconciling, so "changed" reflects what the poll did
+        for (source, gh_issues, delta, _, report), (c, d) in zip(fetched, outcomes):
+            changed = self._note_updates(source, gh_issues, delta) or bool(c or d)
+            if self._scheduler is not None:
+                resource = "graphql" if report["mode"] == "batch" else "core"
+                report["next_poll_in"] = round(self._schedule(source, changed, resource), 1)
+        return {
+            "created": created,
+            "closed": closed,
+            "sources": [report for *_, report in fetched],
+        }
 
-                label = request_ref.get("label", "")
-                if not label.startswith("#"):
-                    continue
-                number = int(label[1:])
+    def next_poll_delay(self, default: float) -> float:
+        """Seconds to wait before the next ``poll_once(due_only=True)``."""
+        if self._scheduler is None:
+            return default
+        return self._scheduler.delay(time.monotonic())
 
-                if number not in open_numbers:
-                    self._deliveries.close_delivery(delivery["id"])
-                    closed += 1
-                    logger.info("Closed delivery", owner=owner, repo=repo, number=number)
+    def _note_updates(
+        self, source: dict, gh_issues: list[GitHubIssue] | None | Exception, delta: bool,
+    ) -> bool:
+        """Remember the listing's ``updated_at`` values; True if any is new.
 
+        Delta fetches overlap the previous window by ``SINCE_OVERLAP``, so the
+        same edit comes back on several polls; only the first one counts.
+        """
+        if not isinstance(gh_issues, list):
+            return False
+        seen = self._seen_updates.get(source["id"], {})
+        news = any(seen.get(issue.number, _UNSEEN) != issue.updated_at for issue in gh_issues)
+        listed = {issue.number: issue.updated_at for issue in gh_issues}
+        # A full listing is the whole open set; forget issues no longer in it
+        self._seen_updates[source["id"]] = {**seen, **listed} if delta else listed
+        return news
+
+    def _schedule(self, source: dict, changed: bool, resource: str = "core") -> float:
+        """Feed a poll outcome to the scheduler; return seconds until the source's next poll.
+
+        REST and GraphQL polls draw on separate rate-limit budgets, so each
+        is backed off on its own ``resource``.
+        """
+        token = source.get("token", "")
+        rate = self._github.rate_limit(token, resource)
+        now = time.monotonic()
+        next_at = self._scheduler.record(
+            source["id"],
+            (token_key(token), resource),
+            changed,
+            now,
+            remaining=rate.remaining if rate else None,
+            reset_in=rate.reset_at - time.time() if rate else None,
+        )
+        return next_at - now
+
+    def handle_issue_event(self, repository: str, action: str, issue: GitHubIssue) -> dict:
+        """Apply a single GitHub ``issues`` webhook event.
+
+        ``opened``/``reopened`` create the delivery if missing and ``closed``
+        closes it, using the same logic as polling. As in polling, a closed
+        delivery is final: reopening its issue is a no-op. Events for
+        repositories without an active source are ignored; GitHub owner and
+        repository names are case-insensitive, so they are compared that way.
+        """
+        repository = repository.lower()
+        source = next(
+            (s for s in self._active_sources() if f"{s['owner']}/{s['repo']}".lower() == repository),
+            None,
+        )
+        if source is None:
+            return {"created": 0, "closed": 0}
+        created = closed = 0
+        with self._lock:
+            if action in ("opened", "reopened"):
+                created = self._create_missing(source, [issue])
+            elif action == "closed":
+                closed = self._close_issues(source, [issue.number])
         return {"created": created, "closed": closed}
+
+    def _active_sources(self) -> list[dict]:
+        return [s for s in self._sources.list_sources() if s.get("active", True)]
+
+    def _batch_groups(self, sources: list[dict]) -> tuple[dict[str, list[dict]], list[dict]]:
+        """Split sources into per-token batch groups and those polled one by one.
+
+        GraphQL requires authentication, so sources without a token always
+        use the REST listing.
+        """
+        if not self._batch:
+            return {}, sources
+        groups: dict[str, list[dict]] = {}
+        rest: list[dict] = []
+        for source in sources:
+            token = source.get("token", "")
+            if token:
+                groups.setdefault(token, []).append(source)
+            else:
+                rest.append(source)
+        return groups, rest
+
+    def _since_for(self, source: dict) -> str | None:
+        """Return the ``since`` cursor for an incremental fetch, or None for a full listing."""
+        if not self._incremental:
+            return None
+        last_polled_at = source.get("last_polled_at")
+        delta_polls = self._delta_polls.get(source["id"])
+        # Always start with a full listing after a restart, and re-baseline
+        # periodically to catch transferred or deleted issues.
+        if not last_polled_at or delta_polls is None or delta_polls >= self._full_sync_every:
+            return None
+        return _since(last_polled_at)
+
+    def _apply(
+        self,
+        source: dict,
+        gh_issues: list[GitHubIssue] | None,
+        delta: bool,
+        polled_at: str,
+    ) -> tuple[int, int]:
+        with self._lock:
+            return self._apply_locked(source, gh_issues, delta, polled_at)
+
+    def _apply_locked(
+        self,
+        source: dict,
+        gh_issues: list[GitHubIssue] | None,
+        delta: bool,
+        polled_at: str,
+    ) -> tuple[int, int]:
+        source["last_polled_at"] = polled_at
+        self._sources.save_source(source["id"], source)
+
+        if delta:
+            self._delta_polls[source["id"]] += 1
+            opened = [i for i in gh_issues if i.state == "open"]
+            closed_numbers = [i.number for i in gh_issues if i.state == "closed"]
+            return (
+                self._create_missing(source, opened),
+                self._close_issues(source, closed_numbers),
+            )
+
+        self._delta_polls[source["id"]] = 0
+        if gh_issues is None:
+            return 0, 0
+        return (
+            self._create_missing(source, gh_issues),
+            self._close_missing(source, {issue.number for issue in gh_issues}),
+        )
+
+    def _ensure_index(self) -> None:
+        now = time.monotonic()
+        if self._index_built_at is not None and now - self._index_built_at < INDEX_REFRESH_SEC:
+            return
+        open_index: dict[str, dict[int, str]] = {}
+        closed_index: dict[str, set[int]] = {}
+        for delivery in self._deliveries.list_deliveries():
+            number = _request_issue_number(delivery)
+            if number is None:
+                continue
+            repository = delivery.get("repository", "")
+            if delivery["phase"] == "close":
+                closed_index.setdefault(repository, set()).add(number)
+            else:
+                open_index.setdefault(repository, {})[number] = delivery["id"]
+        self._open_index = open_index
+        self._closed_index = closed_index
+        self._index_built_at = now
+
+    def _mark_closed(self, repository: str, number: int) -> None:
+        self._open_index.get(repository, {}).pop(number, None)
+        self._closed_index.setdefault(repository, set()).add(number)
+
+    def _create_missing(self, source: dict, gh_issues: list[GitHubIssue]) -> int:
+        """Create deliveries for open issues that do not have one yet."""
+        self._ensure_index()
+        created = 0
+        owner, repo = source["owner"], source["repo"]
+        full_repo = f"{owner}/{repo}"
+        open_numbers = self._open_index.setdefault(full_repo, {})
+        closed_numbers = self._closed_index.setdefault(full_repo, set())
+        default_endpoint = source.get("endpoint", "deploy")
+        default_checkpoints = source.get("checkpoints", ["plan", "implement", "review"])
+
+        for gh_issue in gh_issues:
+            number = gh_issue.number
+            if number in open_numbers or number in closed_numbers:
+                continue
+            # Not indexed yet: confirm against storage before creating, since
+            # create_delivery would overwrite a delivery made since the last refresh.
+            existing = self._deliveries.get_delivery(_delivery_id(owner, repo, number))
+            if existing:
+                if existing["phase"] == "close":
+                    closed_numbers.add(number)
+                else:
+                    open_numbers[number] = existing["id"]
+                continue
+
+            label = f"#{number}"
+            body = DeliveryCreate(
+                phase=Phase.intake,
+                run_status=RunStatus.succeeded,
+                endpoint=Phase(default_endpoint),
+                checkpoints=[Phase(cp) for cp in default_checkpoints],
+                summary=f"GitHub Issue #{number}: {gh_issue.title}",
+                repository=full_repo,
+                refs=[
+                    Ref(
+                        role=RefRole.request,
+                        type=RefType.github_issue,
+                        label=label,
+                        url=gh_issue.html_url,
+                    )
+                ],
+            )
+            result = self._deliveries.create_delivery(body)
+            self._deliveries.advance_from_intake(result["id"])
+            open_numbers[number] = result["id"]
+            created += 1
+            logger.info("Created delivery", owner=owner, repo=repo, label=label)
+        return created
+
+    def _close_issues(self, source: dict, numbers: list[int] | set[int]) -> int:
+        """Close the open deliveries of the given issue numbers."""
+        self._ensure_index()
+        closed = 0
+        owner, repo = source["owner"], source["repo"]
+        full_repo = f"{owner}/{repo}"
+        open_numbers = self._open_index.get(full_repo, {})
+        for number in numbers:
+            delivery_id = open_numbers.get(number)
+            if delivery_id is None:
+                continue
+            # The index may lag behind closes made elsewhere
+            delivery = self._deliveries.get_delivery(delivery_id)
+            if delivery is not None and delivery["phase"] != "close":
+                self._deliveries.close_delivery(delivery_id)
+                closed += 1
+                logger.info("Closed delivery", owner=owner, repo=repo, number=number)
+            self._mark_closed(full_repo, number)
+        return closed
+
+    def _close_missing(self, source: dict, open_numbers: set[int]) -> int:
+        """Close deliveries whose request issues are no longer open."""
+        self._ensure_index()
+        full_repo = f"{source['owner']}/{source['repo']}"
+        indexed = self._open_index.get(full_repo, {})
+        return self._close_issues(source, set(indexed) - open_numbers)
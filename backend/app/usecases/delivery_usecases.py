@@ -3,12 +3,22 @@ import hashlib
 import shutil
 import tempfile
 import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
 from datetime import datetime
 
 import structlog
 
+from app import metrics, tracing
 from app.domain.constants import KST, SCHEMA_VERSION, ID_HEX_LENGTH
-from app.domain.models.delivery import DeliveryCreate, DeliveryUpdate, Phase, RunStatus, ExecutorKind
+from app.domain.models.delivery import (
+    DeliveryCreate,
+    DeliveryUpdate,
+    ExecutionStats,
+    Phase,
+    RunStatus,
+    ExecutorKind,
+)
 from app.domain.models.source import DEFAULT_CHECKPOINTS
 from app.domain.prompts import (
     build_prompt,
@@ -17,17 +27,12 @@ from app.domain.prompts import (
     REVIEW_SYSTEM_PROMPT,
 )
 from app.domain.services.session_parser import (
+    analyze_session_file,
     find_session_file,
-    parse_session_lines,
-    synthesize_result_event,
-)
-from app.domain.services.stream_parser import (
-    StreamMetaTracker,
-    extract_agent_buckets,
-    extract_metadata,
-    extract_transcript,
 )
-from app.domain.models.stream import StreamEvent, StreamMetadata
+from app.domain.services.run_timings import summarize_timings
+from app.domain.services.stream_parser import StreamAnalyzer
+from app.domain.models.stream import EventRecord, StreamMetadata
 from app.domain.services.event_bus import EventBus
 from app.ports.outbound.delivery_repository import DeliveryRepository
 from app.ports.outbound.subprocess_runner import SubprocessRunner
@@ -67,26 +72,21 @@ DEFAULT_EXECUTOR: dict[str, str] = {
 }
 
 
-_STREAM_EVENT_KEYS = {"type", "subtype", "parent_tool_use_id", "session_id"}
-
-
-def _raw_to_stream_event(e: dict) -> StreamEvent:
-    """Convert a raw stream-json dict to StreamEvent.
+def _raw_to_event_record(e: dict) -> EventRecord:
+    """Convert a raw stream-json dict to an EventRecord.
 
     stream-json events store data at top level (no ``message`` wrapper),
     while session JSONL and mocks may use a ``message`` key.  When
-    ``message`` is absent, we promote all non-structural keys into message
-    so that ``extract_metadata`` can read model / cost / tokens.
+    ``message`` is absent the raw dict itself serves as the message, so
+    that ``StreamAnalyzer`` can read model / cost / tokens without a copy.
     """
     message = e.get("message")
-    if message is None:
-        message = {k: v for k, v in e.items() if k not in _STREAM_EVENT_KEYS}
-    return StreamEvent(
-        type=e.get("type", ""),
-        subtype=e.get("subtype"),
-        parent_tool_use_id=e.get("parent_tool_use_id"),
-        message=message,
-        session_id=e.get("session_id"),
+    return EventRecord(
+        e.get("type", ""),
+        e.get("subtype"),
+        e.get("parent_tool_use_id"),
+        e if message is None else message,
+        e.get("session_id"),
     )
 
 
@@ -111,6 +111,47 @@ def _append_phase_run(
     delivery.setdefault("phase_runs", []).append(run)
 
 
+def _record_run_metrics(phase: str, repository: str, status: str, run_stats: dict | None = None) -> None:
+    """Count the run and, when it succeeded, its ``ExecutionStats``. Never raises."""
+    labels = {"phase": phase, "repository": repository}
+    try:
+        metrics.AGENT_RUNS.inc(status=status, **labels)
+        if run_stats is None:
+            return
+        stats = ExecutionStats.model_validate({k: v for k, v in run_stats.items() if v is not None})
+        metrics.AGENT_RUN_SECONDS.observe(stats.duration_ms / 1000, **labels)
+        metrics.AGENT_RUN_COST.inc(stats.cost_usd, **labels)
+        metrics.AGENT_RUN_TOKENS.inc(stats.input_tokens, direction="input", **labels)
+        metrics.AGENT_RUN_TOKENS.inc(stats.output_tokens, direction="output", **labels)
+    except Exception as e:
+        logger.warning("agent run metrics not recorded", error=str(e), **labels)
+
+
+@contextmanager
+def _timed_step(timings: dict, key: str, span_name: str, **attributes) -> Iterator[tracing.Span]:
+    """Run the block in a tracing span and record its duration as ``timings[key]``."""
+    step = tracing.start_span(span_name, **attributes)
+    try:
+        with tracing.use_span(step):
+            yield step
+    except BaseException as e:
+        step.record_error(e)
+        raise
+    finally:
+        step.end()
+        timings[key] = round(step.duration_ms, 1)
+
+
+def _queue_wait_ms(queued_at: str | None, now: datetime) -> float | None:
+    """Milliseconds since the delivery was last updated, i.e. queued for this run."""
+    if not queued_at:
+        return None
+    try:
+        return round(max((now - datetime.fromisoformat(queued_at)).total_seconds(), 0) * 1000, 1)
+    except ValueError:
+        return None
+
+
 def _skip_system_phases(
     delivery: dict,
     next_phase: str,
@@ -161,6 +202,9 @@ class DeliveryUseCasesImpl:
     def get_delivery(self, delivery_id: str) -> dict | None:
         return self._repo.get_delivery(delivery_id)
 
+    def get_run_timings(self) -> dict[str, dict]:
+        return summarize_timings(self._repo.list_deliveries())
+
     def create_delivery(self, body: DeliveryCreate) -> dict:
         data = body.model_dump()
         now = datetime.now(KST)
@@ -351,10 +395,8 @@ class DeliveryUseCasesImpl:
     def _get_source_token(self, owner: str, repo: str) -> str:
         if self._source_repo is None:
             return ""
-        for source in self._source_repo.list_sources():
-            if source.get("owner") == owner and source.get("repo") == repo:
-                return source.get("token", "")
-        return ""
+        source = self._source_repo.get_source_by_repo(owner, repo)
+        return source.get("token", "") if source else ""
 
     @staticmethod
     def _get_pr_branch(delivery: dict) -> str | None:
@@ -378,164 +420,182 @@ class DeliveryUseCasesImpl:
         if self._runner is None or self._git is None:
             raise RuntimeError("SubprocessRunner and GitOperations required for agent execution")
 
-        delivery = copy.deepcopy(delivery)
-        delivery["run_status"] = "running"
-        delivery.pop("error", None)
-        delivery["updated_at"] = datetime.now(KST).isoformat()
-        _append_phase_run(delivery, delivery["phase"], "running")
-        self._repo.save_delivery(delivery_id, delivery)
-
-        owner, repo_name = delivery["repository"].split("/", 1)
-        token = self._get_source_token(owner, repo_name)
-        work_dir = tempfile.mkdtemp(prefix="jakeops-work-")
+        with tracing.span(
+            "agent_phase",
+            delivery_id=delivery_id,
+            phase=delivery["phase"],
+            mode=mode,
+            repository=delivery["repository"],
+        ) as phase_span:
+            delivery = copy.deepcopy(delivery)
+            now = datetime.now(KST)
+            timings: dict[str, float | None] = {
+                "queue_wait_ms": _queue_wait_ms(delivery.get("updated_at"), now),
+            }
+            delivery["run_status"] = "running"
+            delivery.pop("error", None)
+            delivery["updated_at"] = now.isoformat()
+            _append_phase_run(delivery, delivery["phase"], "running")
+            self._repo.save_delivery(delivery_id, delivery)
 
-        run_id = uuid.uuid4().hex[:8]
-        collected_events: list[dict] = []
-        started_at = datetime.now(KST).isoformat()
+            owner, repo_name = delivery["repository"].split("/", 1)
+            token = self._get_source_token(owner, repo_name)
+            work_dir = tempfile.mkdtemp(prefix="jakeops-work-")
+
+            run_id = uuid.uuid4().hex[:8]
+            phase_span.set_attribute("run_id", run_id)
+            collected_events: list[dict] = []
+            analyzer = StreamAnalyzer()
+            started_at = datetime.now(KST).isoformat()
+
+            # Create run with "running" status upfront so the UI can show it
+            run = {
+                "id": run_id,
+                "mode": mode,
+                "status": "running",
+                "created_at": started_at,
+                "session": {"model": "unknown"},
+                "stats": {"cost_usd": 0, "input_tokens": 0, "output_tokens": 0, "duration_ms": 0},
+                "prompt": prompt,
+                "timings": timings,
+            }
+            delivery.setdefault("runs", []).append(run)
+            self._repo.save_delivery(delivery_id, delivery)
 
-        # Create run with "running" status upfront so the UI can show it
-        run = {
-            "id": run_id,
-            "mode": mode,
-            "status": "running",
-            "created_at": started_at,
-            "session": {"model": "unknown"},
-            "stats": {"cost_usd": 0, "input_tokens": 0, "output_tokens": 0, "duration_ms": 0},
-            "prompt": prompt,
-        }
-        delivery.setdefault("runs", []).append(run)
-        self._repo.save_delivery(delivery_id, delivery)
-
-        try:
-            self._git.clone_repo(owner, repo_name, token, work_dir)
-            if branch:
-                self._git.checkout_branch(work_dir, branch)
-
-            # Use streaming when event_bus is wired, blocking otherwise.
-            # Note: stream_log is only persisted in the streaming path.
-            # Non-streaming runs will not have a stream_log file.
-            if self._event_bus:
-                meta_tracker = StreamMetaTracker()
-                async for event in self._runner.run_stream(
-                    prompt=prompt,
-                    cwd=work_dir,
-                    allowed_tools=allowed_tools,
-                    append_system_prompt=system_prompt,
-                    delivery_id=delivery_id,
-                ):
-                    collected_events.append(event)
-                    await self._event_bus.publish(delivery_id, event)
-                    meta_event = meta_tracker.push(_raw_to_stream_event(event))
-                    if meta_event is not None:
-                        await self._event_bus.publish(delivery_id, {
-                            "type": "meta",
-                            "message": meta_event,
-                        })
-
-                stream_events = [_raw_to_stream_event(e) for e in collected_events]
-                metadata = extract_metadata(stream_events)
-                transcript = extract_transcript(stream_events)
-            else:
-                result_text, session_id = await self._runner.run(
-                    prompt=prompt,
-                    cwd=work_dir,
-                    allowed_tools=allowed_tools,
-                    append_system_prompt=system_prompt,
-                    delivery_id=delivery_id,
-                )
-                metadata = StreamMetadata(result_text=result_text)
-                transcript = {}
-                if session_id:
-                    try:
-                        session_file = find_session_file(session_id)
-                        if session_file:
-                            lines = session_file.read_text(encoding="utf-8").strip().splitlines()
-                            events = parse_session_lines(lines)
-                            result_event = synthesize_result_event(events)
-                            all_events = events + [result_event]
-                            metadata = extract_metadata(all_events)
-                            transcript = extract_transcript(all_events)
-                    except (ValueError, OSError) as parse_err:
-                        logger.warning(
-                            "session file parsing failed, using CLI result only",
-                            session_id=session_id, error=str(parse_err),
+            try:
+                with _timed_step(timings, "clone_ms", "git.clone"):
+                    self._git.clone_repo(owner, repo_name, token, work_dir)
+                if branch:
+                    with _timed_step(timings, "checkout_ms", "git.checkout", branch=branch):
+                        self._git.checkout_branch(work_dir, branch)
+
+                # Use streaming when event_bus is wired, blocking otherwise.
+                # Note: stream_log is only persisted in the streaming path.
+                # Non-streaming runs will not have a stream_log file.
+                if self._event_bus:
+                    with _timed_step(timings, "agent_ms", "agent.stream") as agent_span:
+                        async for event in self._runner.run_stream(
+                            prompt=prompt,
+                            cwd=work_dir,
+                            allowed_tools=allowed_tools,
+                            append_system_prompt=system_prompt,
+                            delivery_id=delivery_id,
+                        ):
+                            collected_events.append(event)
+                            await self._event_bus.publish(delivery_id, event)
+                            meta_event = analyzer.push(_raw_to_event_record(event))
+                            if meta_event is not None:
+                                await self._event_bus.publish(delivery_id, {
+                                    "type": "meta",
+                                    "message": meta_event,
+                                })
+                        agent_span.set_attribute("events", len(collected_events))
+
+                    with _timed_step(timings, "analyze_ms", "stream.analyze"):
+                        metadata = analyzer.metadata()
+                        transcript = analyzer.transcript()
+                else:
+                    with _timed_step(timings, "agent_ms", "agent.run"):
+                        result_text, session_id = await self._runner.run(
+                            prompt=prompt,
+                            cwd=work_dir,
+                            allowed_tools=allowed_tools,
+                            append_system_prompt=system_prompt,
+                            delivery_id=delivery_id,
                         )
-
-            # Update the running run to success
-            run["status"] = "success"
-            run["session"] = {"model": metadata.model}
-            run["stats"] = {
-                "cost_usd": metadata.cost_usd,
-                "input_tokens": metadata.input_tokens,
-                "output_tokens": metadata.output_tokens,
-                "duration_ms": metadata.duration_ms,
-            }
-            run["summary"] = metadata.result_text[:200] if metadata.result_text else None
-            run["skills"] = metadata.skills
-            run["used_skills"] = metadata.used_skills
-            run["plugins"] = metadata.plugins
-            run["agents"] = metadata.agents
-
-            # Persist stream log if events were collected
-            if collected_events:
-                agent_buckets = extract_agent_buckets(stream_events)
-                stream_log = {
+                    metadata = StreamMetadata(result_text=result_text)
+                    transcript = {}
+                    if session_id:
+                        try:
+                            with _timed_step(timings, "analyze_ms", "session.parse", session_id=session_id):
+                                session_file = find_session_file(session_id)
+                                if session_file:
+                                    metadata, transcript = analyze_session_file(session_file)
+                        except (ValueError, OSError) as parse_err:
+                            logger.warning(
+                                "session file parsing failed, using CLI result only",
+                                session_id=session_id, error=str(parse_err),
+                            )
+
+                # Update the running run to success
+                run["status"] = "success"
+                run["session"] = {"model": metadata.model}
+                run["stats"] = {
+                    "cost_usd": metadata.cost_usd,
+                    "input_tokens": metadata.input_tokens,
+                    "output_tokens": metadata.output_tokens,
+                    "duration_ms": metadata.duration_ms,
+                }
+                run["summary"] = metadata.result_text[:200] if metadata.result_text else None
+                run["skills"] = metadata.skills
+                run["used_skills"] = metadata.used_skills
+                run["plugins"] = metadata.plugins
+                run["agents"] = metadata.agents
+
+                # The delivery is saved last so that it carries persist_ms
+                with _timed_step(timings, "persist_ms", "repo.persist"):
+                    # Persist stream log if events were collected
+                    if collected_events:
+                        agent_buckets = analyzer.agent_buckets()
+                        stream_log = {
+                            "run_id": run_id,
+                            "started_at": started_at,
+                            "completed_at": datetime.now(KST).isoformat(),
+                            "events": collected_events,
+                            "agent_buckets": agent_buckets,
+                        }
+                        self._repo.save_stream_log(delivery_id, run_id, stream_log)
+                    if transcript:
+                        self._repo.save_run_transcript(delivery_id, run_id, transcript)
+
+                delivery["run_status"] = "succeeded"
+                delivery["updated_at"] = datetime.now(KST).isoformat()
+                _append_phase_run(delivery, delivery["phase"], "succeeded")
+                self._repo.save_delivery(delivery_id, delivery)
+                _record_run_metrics(delivery["phase"], delivery["repository"], "succeeded", run["stats"])
+
+                return {
+                    "id": delivery_id,
                     "run_id": run_id,
-                    "started_at": started_at,
-                    "completed_at": datetime.now(KST).isoformat(),
-                    "events": collected_events,
-                    "agent_buckets": agent_buckets,
+                    "phase": delivery["phase"],
+                    "run_status": "succeeded",
+                    "result_text": metadata.result_text,
                 }
-                self._repo.save_stream_log(delivery_id, run_id, stream_log)
-
-            delivery["run_status"] = "succeeded"
-            delivery["updated_at"] = datetime.now(KST).isoformat()
-            _append_phase_run(delivery, delivery["phase"], "succeeded")
-            self._repo.save_delivery(delivery_id, delivery)
-            if transcript:
-                self._repo.save_run_transcript(delivery_id, run_id, transcript)
-
-            return {
-                "id": delivery_id,
-                "run_id": run_id,
-                "phase": delivery["phase"],
-                "run_status": "succeeded",
-                "result_text": metadata.result_text,
-            }
-        except Exception as e:
-            # Persist partial stream log on error (best-effort)
-            if collected_events:
-                try:
-                    partial_stream_events = [_raw_to_stream_event(e) for e in collected_events]
-                    agent_buckets = extract_agent_buckets(partial_stream_events)
-                    stream_log = {
-                        "run_id": run_id,
-                        "started_at": started_at,
-                        "completed_at": datetime.now(KST).isoformat(),
-                        "events": collected_events,
-                        "agent_buckets": agent_buckets,
-                    }
-                    self._repo.save_stream_log(delivery_id, run_id, stream_log)
-                except Exception:
-                    logger.warning("Failed to persist partial stream log", delivery_id=delivery_id)
-
-            run["status"] = "failed"
-            run["error"] = str(e)
-            delivery["run_status"] = "failed"
-            delivery["error"] = str(e)
-            delivery["updated_at"] = datetime.now(KST).isoformat()
-            _append_phase_run(delivery, delivery["phase"], "failed")
-            self._repo.save_delivery(delivery_id, delivery)
-            return {
-                "id": delivery_id,
-                "phase": delivery["phase"],
-                "run_status": "failed",
-                "error": str(e),
-            }
-        finally:
-            shutil.rmtree(work_dir, ignore_errors=True)
-            if self._event_bus:
-                await self._event_bus.close(delivery_id)
+            except Exception as e:
+                # Persist partial stream log on error (best-effort)
+                if collected_events:
+                    try:
+                        agent_buckets = analyzer.agent_buckets()
+                        stream_log = {
+                            "run_id": run_id,
+                            "started_at": started_at,
+                            "completed_at": datetime.now(KST).isoformat(),
+                            "events": collected_events,
+                            "agent_buckets": agent_buckets,
+                        }
+                        self._repo.save_stream_log(delivery_id, run_id, stream_log)
+                    except Exception:
+                        logger.warning("Failed to persist partial stream log", delivery_id=delivery_id)
+
+                run["status"] = "failed"
+                run["error"] = str(e)
+                delivery["run_status"] = "failed"
+                delivery["error"] = str(e)
+                delivery["updated_at"] = datetime.now(KST).isoformat()
+                _append_phase_run(delivery, delivery["phase"], "failed")
+                self._repo.save_delivery(delivery_id, delivery)
+                _record_run_metrics(delivery["phase"], delivery["repository"], "failed")
+                phase_span.record_error(e)
+                return {
+                    "id": delivery_id,
+                    "phase": delivery["phase"],
+                    "run_status": "failed",
+                    "error": str(e),
+                }
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+                if self._event_bus:
+                    await self._event_bus.close(delivery_id)
 
     async def generate_plan(self, delivery_id: str) -> dict | None:
         existing = self._repo.get_delivery(delivery_id)
@@ -568,39 +628,46 @@ class DeliveryUseCasesImpl:
             }
 
             # Create branch + draft PR (non-fatal)
+            pr_timing: dict[str, float] = {}
             try:
-                owner, repo_name = delivery["repository"].split("/", 1)
-                token = self._get_source_token(owner, repo_name)
-                branch = f"jakeops/{delivery_id}"
-                repo_url = f"https://github.com/{owner}/{repo_name}.git"
-                self._git.create_branch_with_file(
-                    repo_url=repo_url,
-                    branch=branch,
-                    file_path="docs/plan.md",
-                    content=plan_content,
-                    commit_message=f"plan: {delivery['summary'][:50]}",
-                    token=token,
-                )
-                pr_url = self._git.create_draft_pr(
-                    owner=owner,
-                    repo=repo_name,
-                    branch=branch,
-                    title=f"[jakeops] {delivery['summary'][:60]}",
-                    body=plan_content[:500],
-                    token=token,
-                )
-                delivery.setdefault("refs", []).append({
-                    "role": "work",
-                    "type": "pr",
-                    "label": "Draft PR",
-                    "url": pr_url,
-                })
-                logger.info("draft PR created", delivery_id=delivery_id, pr_url=pr_url)
+                with _timed_step(pr_timing, "pr_ms", "plan.publish", delivery_id=delivery_id):
+                    owner, repo_name = delivery["repository"].split("/", 1)
+                    token = self._get_source_token(owner, repo_name)
+                    branch = f"jakeops/{delivery_id}"
+                    repo_url = f"https://github.com/{owner}/{repo_name}.git"
+                    with tracing.span("git.push_plan", delivery_id=delivery_id, branch=branch):
+                        self._git.create_branch_with_file(
+                            repo_url=repo_url,
+                            branch=branch,
+                            file_path="docs/plan.md",
+                            content=plan_content,
+                            commit_message=f"plan: {delivery['summary'][:50]}",
+                            token=token,
+                        )
+                    with tracing.span("git.create_pr", delivery_id=delivery_id, branch=branch):
+                        pr_url = self._git.create_draft_pr(
+                            owner=owner,
+                            repo=repo_name,
+                            branch=branch,
+                            title=f"[jakeops] {delivery['summary'][:60]}",
+                            body=plan_content[:500],
+                            token=token,
+                        )
+                    delivery.setdefault("refs", []).append({
+                        "role": "work",
+                        "type": "pr",
+                        "label": "Draft PR",
+                        "url": pr_url,
+                    })
+                    logger.info("draft PR created", delivery_id=delivery_id, pr_url=pr_url)
             except Exception as e:
                 logger.warning(
                     "draft PR creation failed (non-fatal)",
                     delivery_id=delivery_id, error=str(e),
                 )
+            for run in delivery.get("runs", []):
+                if run["id"] == result["run_id"]:
+                    run.setdefault("timings", {}).update(pr_timing)
 
             self._repo.save_delivery(delivery_id, delivery)
             await self._auto_advance_chain(delivery_id)
@@ -711,13 +778,7 @@ class DeliveryUseCasesImpl:
         if session_file is None:
             raise FileNotFoundError(f"Session file not found: {session_id}")
 
-        lines = session_file.read_text(encoding="utf-8").strip().splitlines()
-        events = parse_session_lines(lines)
-        result_event = synthesize_result_event(events)
-        all_events = events + [result_event]
-
-        metadata = extract_metadata(all_events)
-        transcript = extract_transcript(all_events)
+        metadata, transcript = analyze_session_file(session_file)
 
         run_id = uuid.uuid4().hex[:8]
         run = {
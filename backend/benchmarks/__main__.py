@@ -0,0 +1,88 @@
+"""Run the benchmark suite and store results as JSON.
+
+Usage (from backend/):
+    python -m benchmarks [-k PATTERN] [--scale smoke|default|full]
+                         [--output DIR] [--compare BASELINE.json] [--threshold 0.2]
+
+Results are written to ``<output>/<UTC timestamp>-<commit>.json``. With
+``--compare``, metrics that regressed beyond ``--threshold`` are listed
+and the exit status is 1.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import structlog
+
+from app import json_codec
+from benchmarks.suite import SCALES, compare, run_scenarios
+
+RESULTS_DIR = Path(__file__).resolve().parent / "results"
+
+
+def _commit() -> str:
+    try:
+        out = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        )
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="jakeops benchmark suite")
+    parser.add_argument("-k", dest="pattern", default="", help="only run scenarios whose name contains PATTERN")
+    parser.add_argument("--scale", choices=SCALES, default="default")
+    parser.add_argument("--output", type=Path, default=RESULTS_DIR)
+    parser.add_argument("--compare", type=Path, help="baseline results file")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed regression as a fraction")
+    args = parser.parse_args()
+
+    # Keep per-delivery info logs out of the measurements
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    started = datetime.now(timezone.utc)
+    results = run_scenarios(args.scale, args.pattern)
+    commit = _commit()
+    report = {
+        "meta": {
+            "commit": commit,
+            "timestamp": started.isoformat(),
+            "scale": args.scale,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "json_codec": json_codec.codec.name,
+        },
+        "results": results,
+    }
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    path = args.output / f"{started:%Y%m%dT%H%M%SZ}-{commit}.json"
+    path.write_bytes(json_codec.dumps_pretty(report))
+    for name, metrics in results.items():
+        print(name)
+        for metric, value in metrics.items():
+            print(f"  {metric:40s} {value:>14,.2f}")
+    print(f"Results written to {path}")
+
+    if args.compare:
+        baseline = json_codec.loads(args.compare.read_bytes())
+        regressions = compare(baseline["results"], results, args.threshold)
+        if regressions:
+            print(f"Regressions against {baseline['meta'].get('commit', args.compare.name)}:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions beyond threshold")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+"""Benchmark JSON codecs on a realistic stream log.
+
+Measures the three hot paths for every available backend: parsing CLI
+stdout lines, encoding SSE frames, and writing the stream log file.
+
+Usage (from backend/):
+    python -m benchmarks.bench_json_codec [--events N] [--repeat R]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+from app import json_codec
+from benchmarks.generators import synthetic_run
+
+
+def measure(fn: Callable[[], object], repeat: int) -> float:
+    """Best-of-``repeat`` wall time in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(n_events: int = 20_000, repeat: int = 5) -> dict[str, dict[str, float]]:
+    events = synthetic_run(n_events)
+    stdlib = json_codec.get_codec("json")
+    lines = [stdlib.dumps(e) for e in events]
+    stream_log = {"run_id": "bench", "events": events, "agent_buckets": []}
+
+    results: dict[str, dict[str, float]] = {}
+    for name in json_codec.available_codecs():
+        codec = json_codec.get_codec(name)
+        results[name] = {
+            "parse_lines_eps": n_events / measure(lambda: [codec.loads(line) for line in lines], repeat),
+            "encode_frames_eps": n_events / measure(
+                lambda: [b"data: " + codec.dumps(e) + b"\n\n" for e in events], repeat,
+            ),
+            "write_log_mb_s": len(stdlib.dumps_pretty(stream_log)) / 1e6
+            / measure(lambda: codec.dumps_pretty(stream_log), repeat),
+        }
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    for name, metrics in run(args.events, args.repeat).items():
+        print(name)
+        for metric, value in metrics.items():
+            print(f"  {metric:20s} {value:>14,.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""Benchmark per-event processing of a streamed agent run.
+
+Compares the former hot path (a Pydantic ``StreamEvent`` built twice per
+event, then three extraction passes) with the current one (one
+``EventRecord`` per event fed to ``StreamAnalyzer``).
+
+Usage (from backend/):
+    python -m benchmarks.bench_stream_events [--events N] [--repeat R]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+from app.domain.models.stream import StreamEvent
+from app.domain.services.stream_parser import (
+    StreamAnalyzer,
+    StreamMetaTracker,
+    extract_agent_buckets,
+    extract_metadata,
+    extract_transcript,
+)
+from app.usecases.delivery_usecases import _raw_to_event_record
+from benchmarks.generators import synthetic_run
+
+_STREAM_EVENT_KEYS = {"type", "subtype", "parent_tool_use_id", "session_id"}
+
+
+def _legacy_stream_event(e: dict) -> StreamEvent:
+    message = e.get("message")
+    if message is None:
+        message = {k: v for k, v in e.items() if k not in _STREAM_EVENT_KEYS}
+    return StreamEvent(
+        type=e.get("type", ""),
+        subtype=e.get("subtype"),
+        parent_tool_use_id=e.get("parent_tool_use_id"),
+        message=message,
+        session_id=e.get("session_id"),
+    )
+
+
+def legacy_pipeline(raw_events: list[dict]) -> None:
+    tracker = StreamMetaTracker()
+    for event in raw_events:
+        tracker.push(_legacy_stream_event(event))
+    stream_events = [_legacy_stream_event(e) for e in raw_events]
+    extract_metadata(stream_events)
+    extract_transcript(stream_events)
+    extract_agent_buckets(stream_events)
+
+
+def current_pipeline(raw_events: list[dict]) -> None:
+    analyzer = StreamAnalyzer()
+    for event in raw_events:
+        analyzer.push(_raw_to_event_record(event))
+    analyzer.metadata()
+    analyzer.transcript()
+    analyzer.agent_buckets()
+
+
+def measure(fn: Callable[[list[dict]], object], raw_events: list[dict], repeat: int) -> float:
+    """Best-of-``repeat`` throughput in events per second."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(raw_events)
+        best = min(best, time.perf_counter() - start)
+    return len(raw_events) / best
+
+
+def run(n_events: int = 20_000, repeat: int = 5) -> dict[str, float]:
+    raw_events = synthetic_run(n_events)
+    return {
+        "convert_pydantic_eps": measure(lambda evs: [_legacy_stream_event(e) for e in evs], raw_events, repeat),
+        "convert_record_eps": measure(lambda evs: [_raw_to_event_record(e) for e in evs], raw_events, repeat),
+        "pipeline_before_eps": measure(legacy_pipeline, raw_events, repeat),
+        "pipeline_after_eps": measure(current_pipeline, raw_events, repeat),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--events", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = run(args.events, args.repeat)
+    for name, eps in results.items():
+        print(f"{name:24s} {eps:>12,.0f} events/s")
+    speedup = results["pipeline_after_eps"] / results["pipeline_before_eps"]
+    print(f"{'pipeline speedup':24s} {speedup:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Deterministic stand-in for the ``claude`` CLI, for load and capacity testing.
+
+Accepts the flags ``ClaudeCliAdapter`` passes (``-p``, ``--output-format
+json|stream-json``, ``--verbose``, ``--allowedTools``,
+``--append-system-prompt``) and emits realistic output. Point the backend
+at it with ``CLAUDE_BIN="python /path/to/fake_claude.py"``.
+
+Behaviour is configured through environment variables:
+
+    FAKE_CLAUDE_TURNS          assistant/tool_result pairs per agent (default 10)
+    FAKE_CLAUDE_RATE           events per second, 0 for unthrottled (default 0)
+    FAKE_CLAUDE_TEXT_BYTES     assistant text size per turn (default 200)
+    FAKE_CLAUDE_RESULT_BYTES   tool_result size per turn (default 1000)
+    FAKE_CLAUDE_SUBAGENTS      Task subagents spawned by the leader (default 0)
+    FAKE_CLAUDE_FAILURE        none | exit | error | hang | garbage | truncate
+    FAKE_CLAUDE_FAILURE_RATE   probability that a run uses FAILURE (default 1.0)
+    FAKE_CLAUDE_SEED           seed; output is a pure function of seed + prompt
+    FAKE_CLAUDE_MODEL          model reported in init/result events
+
+Failure modes: ``exit`` stops halfway with exit status 1, ``error`` ends
+with an ``is_error`` result, ``hang`` stops emitting and never exits,
+``garbage`` interleaves non-JSON lines, and ``truncate`` drops the final
+newline.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import uuid
+
+FAILURE_MODES = ("none", "exit", "error", "hang", "garbage", "truncate")
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.environ.get(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.environ.get(name, default))
+
+
+def _filler(rng: random.Random, size: int) -> str:
+    words = ("parse", "module", "request", "handler", "test", "delivery", "stream", "config")
+    out: list[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(words)
+        out.append(word)
+        length += len(word) + 1
+    return " ".join(out)[:size]
+
+
+def build_events(prompt: str, cwd: str) -> tuple[list[dict], str]:
+    """Return the stream-json events for one run and the failure mode applied."""
+    seed = os.environ.get("FAKE_CLAUDE_SEED", "0")
+    rng = random.Random(f"{seed}:{prompt}")
+    turns = _env_int("FAKE_CLAUDE_TURNS", 10)
+    text_bytes = _env_int("FAKE_CLAUDE_TEXT_BYTES", 200)
+    result_bytes = _env_int("FAKE_CLAUDE_RESULT_BYTES", 1000)
+    subagents = _env_int("FAKE_CLAUDE_SUBAGENTS", 0)
+    model = os.environ.get("FAKE_CLAUDE_MODEL", "claude-fake-1")
+    failure = os.environ.get("FAKE_CLAUDE_FAILURE", "none")
+    if failure not in FAILURE_MODES:
+        raise SystemExit(f"unknown FAKE_CLAUDE_FAILURE: {failure}")
+    if failure != "none" and rng.random() >= _env_float("FAKE_CLAUDE_FAILURE_RATE", 1.0):
+        failure = "none"
+
+    session_id = str(uuid.UUID(int=rng.getrandbits(128)))
+    tool_counter = 0
+
+    def turn(parent: str | None) -> list[dict]:
+        nonlocal tool_counter
+        tool_counter += 1
+        tool_id = f"toolu_{tool_counter:06d}"
+        return [
+            {"type": "assistant", "parent_tool_use_id": parent, "session_id": session_id, "message": {
+                "role": "assistant", "model": model, "content": [
+                    {"type": "text", "text": _filler(rng, text_bytes)},
+                    {"type": "tool_use", "id": tool_id, "name": "Read", "input": {"file_path": f"{cwd}/f{tool_counter}.py"}},
+                ],
+                "usage": {"input_tokens": rng.randint(500, 5000), "output_tokens": rng.randint(50, 500)},
+            }},
+            {"type": "user", "parent_tool_use_id": parent, "session_id": session_id, "message": {
+                "role": "user", "content": [
+                    {"type": "tool_result", "tool_use_id": tool_id, "content": _filler(rng, result_bytes)},
+                ],
+            }},
+        ]
+
+    events: list[dict] = [{
+        "type": "system", "subtype": "init", "session_id": session_id, "model": model, "cwd": cwd,
+        "tools": ["Bash", "Read", "Edit", "Task"], "skills": [], "plugins": [], "agents": ["Explore"],
+    }]
+    for i in range(turns):
+        events.extend(turn(None))
+        # Spread subagent spawns across the leader's turns
+        if subagents and i % max(1, turns // subagents) == 0 and i // max(1, turns // subagents) < subagents:
+            tool_counter += 1
+            task_id = f"toolu_task{tool_counter:06d}"
+            events.append({"type": "assistant", "parent_tool_use_id": None, "session_id": session_id, "message": {
+                "role": "assistant", "model": model, "content": [{
+                    "type": "tool_use", "id": task_id, "name": "Task",
+                    "input": {"description": f"Investigate part {i}", "subagent_type": "Explore"},
+                }],
+            }})
+            for _ in range(max(1, turns // 2)):
+                events.extend(turn(task_id))
+
+    final_text = f"Fake run complete.\n\n{_filler(rng, text_bytes)}"
+    events.append({"type": "assistant", "parent_tool_use_id": None, "session_id": session_id, "message": {
+        "role": "assistant", "model": model, "content": [{"type": "text", "text": final_text}],
+    }})
+    events.append({
+        "type": "result", "subtype": "error_during_execution" if failure == "error" else "success",
+        "session_id": session_id, "is_error": failure == "error", "result": final_text,
+        "total_cost_usd": round(rng.uniform(0.01, 2.0), 4),
+        "usage": {"input_tokens": rng.randint(10_000, 200_000), "output_tokens": rng.randint(1_000, 20_000)},
+        "duration_ms": rng.randint(10_000, 600_000), "num_turns": turns,
+    })
+    return events, failure
+
+
+def emit_stream(events: list[dict], failure: str) -> int:
+    rate = _env_float("FAKE_CLAUDE_RATE", 0)
+    interval = 1 / rate if rate > 0 else 0
+    stop_at = len(events) // 2 if failure in ("exit", "hang") else None
+    out = sys.stdout
+    for i, event in enumerate(events):
+        if stop_at is not None and i == stop_at:
+            out.flush()
+            if failure == "hang":
+                while True:
+                    time.sleep(3600)
+            print("fake claude: simulated crash", file=sys.stderr)
+            return 1
+        line = json.dumps(event)
+        if failure == "truncate" and i == len(events) - 1:
+            out.write(line)
+        else:
+            out.write(line + "\n")
+        if failure == "garbage" and i % 5 == 0:
+            out.write("not json: progress bar ####\n")
+        if interval:
+            out.flush()
+            time.sleep(interval)
+    out.flush()
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="claude", add_help=False)
+    parser.add_argument("-p", dest="prompt", default="")
+    parser.add_argument("--output-format", default="text")
+    parser.add_argument("--verbose", action="store_true")
+    parser.add_argument("--allowedTools", default="")
+    parser.add_argument("--append-system-prompt", default="")
+    args, _ = parser.parse_known_args(argv)
+
+    events, failure = build_events(args.prompt, os.getcwd())
+    if args.output_format == "stream-json":
+        return emit_stream(events, failure)
+
+    result = events[-1]
+    if failure == "exit":
+        print("fake claude: simulated crash", file=sys.stderr)
+        return 1
+    if failure == "hang":
+        while True:
+            time.sleep(3600)
+    print(json.dumps({
+        "type": "result", "result": result["result"], "session_id": result["session_id"],
+        "is_error": result["is_error"], "total_cost_usd": result["total_cost_usd"],
+    }))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,141 @@
+"""Synthetic data for the benchmark suite."""
+
+from __future__ import annotations
+
+import hashlib
+from pathlib import Path
+
+from app import json_codec
+from app.domain.constants import ID_HEX_LENGTH, SCHEMA_VERSION
+from app.domain.models.github import GitHubIssue, RateLimit
+
+
+def synthetic_run(n_events: int) -> list[dict]:
+    """Build a stream-json run with leader/subagent turns and tool calls."""
+    events: list[dict] = [{
+        "type": "system", "subtype": "init", "session_id": "s1", "model": "claude-opus-4-6",
+        "cwd": "/work", "tools": ["Bash", "Read", "Task"], "skills": ["tdd"], "plugins": [], "agents": [],
+    }]
+    for i in range(n_events - 2):
+        parent = f"toolu_task{i // 500}" if (i // 100) % 3 == 2 else None
+        if i % 2 == 0:
+            events.append({"type": "assistant", "parent_tool_use_id": parent, "session_id": "s1", "message": {
+                "role": "assistant", "model": "claude-opus-4-6", "content": [
+                    {"type": "text", "text": f"Step {i}: reading the code " * 4},
+                    {"type": "tool_use", "id": f"toolu_{i}", "name": "Task" if i % 500 == 0 else "Read",
+                     "input": {"description": f"Task {i}", "subagent_type": "Explore", "file_path": "/w/x.py"}},
+                ],
+                "usage": {"input_tokens": 100, "output_tokens": 20},
+            }})
+        else:
+            events.append({"type": "user", "parent_tool_use_id": parent, "session_id": "s1", "message": {
+                "role": "user", "content": [
+                    {"type": "tool_result", "tool_use_id": f"toolu_{i - 1}", "content": "line\n" * 40},
+                ],
+            }})
+    events.append({
+        "type": "result", "subtype": "success", "session_id": "s1", "result": "done",
+        "total_cost_usd": 1.25, "usage": {"input_tokens": 1000, "output_tokens": 200},
+        "duration_ms": 60000, "is_error": False,
+    })
+    return events
+
+
+def synthetic_delivery(seq: int, repository: str = "bench/repo", phase: str = "plan") -> dict:
+    """A delivery document shaped like the ones DeliveryUseCasesImpl writes."""
+    number = seq
+    delivery_id = hashlib.sha256(f"{repository}:#{number}".encode()).hexdigest()[:ID_HEX_LENGTH]
+    created_at = f"2026-01-01T00:00:{seq % 60:02d}.{seq:06d}+09:00"
+    return {
+        "id": delivery_id,
+        "seq": seq,
+        "schema_version": SCHEMA_VERSION,
+        "phase": phase,
+        "run_status": "pending",
+        "endpoint": "deploy",
+        "checkpoints": ["plan", "implement", "review"],
+        "summary": f"GitHub Issue #{number}: synthetic issue {number}",
+        "repository": repository,
+        "refs": [{
+            "role": "request", "type": "github_issue", "label": f"#{number}",
+            "url": f"https://github.com/{repository}/issues/{number}",
+        }],
+        "runs": [],
+        "phase_runs": [{
+            "phase": "intake", "run_status": "succeeded", "executor": "system",
+            "verdict": None, "started_at": created_at, "ended_at": created_at,
+        }],
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+
+def populate_deliveries(data_dir: Path, count: int, repository: str = "bench/repo") -> list[dict]:
+    """Write ``count`` delivery directories the way FileSystemDeliveryRepository lays them out."""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    deliveries = []
+    for seq in range(1, count + 1):
+        delivery = synthetic_delivery(seq, repository)
+        delivery_dir = data_dir / delivery["id"]
+        delivery_dir.mkdir(exist_ok=True)
+        (delivery_dir / "delivery.json").write_bytes(json_codec.dumps_pretty(delivery))
+        deliveries.append(delivery)
+    return deliveries
+
+
+def synthetic_sources(count: int) -> list[dict]:
+    return [
+        {
+            "id": f"src{i:05d}",
+            "type": "github",
+            "owner": "bench",
+            "repo": f"repo{i}",
+            "token": f"ghp_bench{i % 4}",
+            "active": True,
+            "endpoint": "deploy",
+            "checkpoints": ["plan", "implement", "review"],
+            "created_at": f"2026-01-01T00:00:00.{i:06d}+09:00",
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_issues(repository: str, count: int) -> list[GitHubIssue]:
+    return [
+        GitHubIssue(
+            number=n,
+            title=f"Issue {n}",
+            html_url=f"https://github.com/{repository}/issues/{n}",
+            state="open",
+        )
+        for n in range(1, count + 1)
+    ]
+
+
+class FakeGitHub:
+    """In-memory GitHubRepository serving a fixed number of open issues per repository."""
+
+    def __init__(self, issues_per_repo: int) -> None:
+        self._issues_per_repo = issues_per_repo
+        self._cache: dict[str, list[GitHubIssue]] = {}
+
+    def _issues(self, owner: str, repo: str) -> list[GitHubIssue]:
+        full_repo = f"{owner}/{repo}"
+        if full_repo not in self._cache:
+            self._cache[full_repo] = synthetic_issues(full_repo, self._issues_per_repo)
+        return self._cache[full_repo]
+
+    async def fetch_open_issues(self, owner, repo, token="", if_changed=False):
+        return self._issues(owner, repo)
+
+    async def fetch_issues_since(self, owner, repo, since, token=""):
+        return []
+
+    async def fetch_open_issues_batch(self, repositories, token, if_changed=False):
+        return {f"{o}/{r}": self._issues(o, r) for o, r in repositories}
+
+    async def get_issue(self, owner, repo, number, token=""):
+        return None
+
+    def rate_limit(self, token="", resource="core"):
+        return RateLimit(remaining=5000, reset_at=0.0, limit=5000)
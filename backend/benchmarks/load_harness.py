@@ -0,0 +1,207 @@
+"""Drive concurrent deliveries end to end against the fake Claude CLI.
+
+Each delivery runs plan -> implement -> review through the real
+``DeliveryUseCasesImpl``, ``ClaudeCliAdapter`` (spawning
+``benchmarks/fake_claude.py``), ``EventBus`` and filesystem repository.
+Git operations are no-ops so only the backend itself is measured.
+
+Usage (from backend/):
+    python -m benchmarks.load_harness [--deliveries 50] [--concurrency 10]
+        [--turns 10] [--rate 0] [--subagents 0] [--event-bytes 1000]
+        [--failure none] [--failure-rate 0.1] [--seed 0] [--output FILE]
+
+Reports runs/min, p50/p99 latency per phase, failures and peak RSS.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+import structlog
+
+from app.adapters.outbound.claude_cli import ClaudeCliAdapter
+from app.adapters.outbound.filesystem_delivery import FileSystemDeliveryRepository
+from app.domain.services.event_bus import EventBus
+from app.usecases.delivery_usecases import DeliveryUseCasesImpl
+from benchmarks.generators import synthetic_delivery
+
+FAKE_CLAUDE = Path(__file__).resolve().parent / "fake_claude.py"
+AGENT_PHASES = ("plan", "implement", "review")
+
+
+class NullGitOperations:
+    """GitOperations that touches neither the network nor the disk."""
+
+    def create_branch_with_file(self, repo_url, branch, file_path, content, commit_message, token=""):
+        pass
+
+    def clone_repo(self, owner, repo, token, dest):
+        pass
+
+    def checkout_branch(self, cwd, branch):
+        pass
+
+    def create_draft_pr(self, owner, repo, branch, title, body, token=""):
+        return f"https://github.com/{owner}/{repo}/pull/1"
+
+
+@contextmanager
+def _patched_env(values: dict[str, str]):
+    saved = {key: os.environ.get(key) for key in values}
+    os.environ.update(values)
+    try:
+        yield
+    finally:
+        for key, value in saved.items():
+            if value is None:
+                os.environ.pop(key, None)
+            else:
+                os.environ[key] = value
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    if len(values) == 1:
+        return values[0]
+    return statistics.quantiles(values, n=100, method="inclusive")[int(pct) - 1]
+
+
+def _peak_rss_mb(who: int) -> float:
+    # ru_maxrss is KiB on Linux and bytes on macOS
+    rss = resource.getrusage(who).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def phase_latencies(delivery: dict) -> dict[str, float]:
+    """Seconds from each agent phase's ``running`` entry to its outcome."""
+    latencies: dict[str, float] = {}
+    started: dict[str, datetime] = {}
+    for entry in delivery.get("phase_runs", []):
+        phase, status = entry["phase"], entry["run_status"]
+        if phase not in AGENT_PHASES:
+            continue
+        at = datetime.fromisoformat(entry["started_at"])
+        if status == "running":
+            started[phase] = at
+        elif status in ("succeeded", "failed") and phase in started:
+            latencies[phase] = (at - started.pop(phase)).total_seconds()
+    return latencies
+
+
+async def run_load(
+    deliveries: int,
+    concurrency: int,
+    fake_env: dict[str, str] | None = None,
+    data_dir: Path | None = None,
+) -> dict:
+    """Run ``deliveries`` deliveries, at most ``concurrency`` at a time."""
+    with tempfile.TemporaryDirectory(prefix="jakeops-load-") as tmp, _patched_env(fake_env or {}):
+        repo = FileSystemDeliveryRepository(data_dir or Path(tmp))
+        usecases = DeliveryUseCasesImpl(
+            repo=repo,
+            runner=ClaudeCliAdapter(binary=[sys.executable, str(FAKE_CLAUDE)]),
+            git_ops=NullGitOperations(),
+            event_bus=EventBus(),
+        )
+        ids: list[str] = []
+        for seq in range(1, deliveries + 1):
+            delivery = synthetic_delivery(seq, repository="load/repo")
+            delivery.update(checkpoints=[], endpoint="review")
+            repo.save_delivery(delivery["id"], delivery)
+            ids.append(delivery["id"])
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def drive(delivery_id: str) -> None:
+            async with semaphore:
+                await usecases.generate_plan(delivery_id)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(drive(delivery_id) for delivery_id in ids))
+        elapsed = time.perf_counter() - started
+
+        per_phase: dict[str, list[float]] = {phase: [] for phase in AGENT_PHASES}
+        runs = failures = completed = 0
+        for delivery_id in ids:
+            delivery = repo.get_delivery(delivery_id)
+            runs += len(delivery.get("runs", []))
+            failures += sum(1 for run in delivery.get("runs", []) if run["status"] == "failed")
+            completed += delivery["phase"] == "close"
+            for phase, seconds in phase_latencies(delivery).items():
+                per_phase[phase].append(seconds)
+
+    return {
+        "deliveries": deliveries,
+        "concurrency": concurrency,
+        "completed": completed,
+        "runs": runs,
+        "failed_runs": failures,
+        "elapsed_sec": round(elapsed, 3),
+        "runs_per_min": round(runs / elapsed * 60, 1) if elapsed else 0.0,
+        "phases": {
+            phase: {
+                "count": len(values),
+                "p50_ms": round(_percentile(values, 50) * 1000, 1),
+                "p99_ms": round(_percentile(values, 99) * 1000, 1),
+            }
+            for phase, values in per_phase.items()
+        },
+        "peak_rss_mb": round(_peak_rss_mb(resource.RUSAGE_SELF), 1),
+        "peak_child_rss_mb": round(_peak_rss_mb(resource.RUSAGE_CHILDREN), 1),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="jakeops end-to-end load harness")
+    parser.add_argument("--deliveries", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--turns", type=int, default=10, help="assistant/tool_result pairs per agent")
+    parser.add_argument("--rate", type=float, default=0, help="events/sec per CLI, 0 for unthrottled")
+    parser.add_argument("--subagents", type=int, default=0)
+    parser.add_argument("--event-bytes", type=int, default=1000, help="tool_result size per turn")
+    parser.add_argument("--failure", default="none", help="fake CLI failure mode")
+    parser.add_argument("--failure-rate", type=float, default=1.0)
+    parser.add_argument("--seed", default="0")
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    fake_env = {
+        "FAKE_CLAUDE_TURNS": str(args.turns),
+        "FAKE_CLAUDE_RATE": str(args.rate),
+        "FAKE_CLAUDE_SUBAGENTS": str(args.subagents),
+        "FAKE_CLAUDE_RESULT_BYTES": str(args.event_bytes),
+        "FAKE_CLAUDE_FAILURE": args.failure,
+        "FAKE_CLAUDE_FAILURE_RATE": str(args.failure_rate),
+        "FAKE_CLAUDE_SEED": args.seed,
+    }
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    report = asyncio.run(run_load(args.deliveries, args.concurrency, fake_env))
+
+    print(
+        f"{report['completed']}/{report['deliveries']} deliveries closed, "
+        f"{report['runs']} runs ({report['failed_runs']} failed) in {report['elapsed_sec']}s "
+        f"-> {report['runs_per_min']} runs/min"
+    )
+    for phase, stats in report["phases"].items():
+        print(f"  {phase:<10} n={stats['count']:<5} p50={stats['p50_ms']:>9.1f}ms  p99={stats['p99_ms']:>9.1f}ms")
+    print(f"  peak RSS {report['peak_rss_mb']} MB (children {report['peak_child_rss_mb']} MB)")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
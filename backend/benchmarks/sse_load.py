@@ -0,0 +1,393 @@
+"""SSE fan-out and reconnect-storm load scenario.
+
+Starts the deliveries API under uvicorn in a child process and opens
+``--clients`` concurrent ``/api/deliveries/{id}/stream`` connections over
+real TCP. A synthetic publisher inside the server drives ``EventBus`` at
+``--rate`` events/sec; every event carries its publish time, so clients
+measure end-to-end latency.
+
+Phases:
+    steady     all clients watch one burst of ``--events`` live events
+    storm      every client drops its connection at once, then all
+               reconnect together and receive the replay buffer
+    recovery   a second live burst must reach every reconnected client
+
+Usage (from backend/):
+    python -m benchmarks.sse_load [--clients 50] [--events 500] [--rate 200]
+        [--event-bytes 1000] [--max-p99-ms 500] [--min-delivery 1.0]
+        [--max-rss-mb 512] [--max-reconnect-sec 5] [--max-replay-sec 10]
+        [--output FILE]
+
+Exit status is 1 when any threshold check fails.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import resource
+import socket
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import structlog
+
+from benchmarks.load_harness import _peak_rss_mb, _percentile
+
+DELIVERY_ID = "sse-load"
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+STARTUP_TIMEOUT_SEC = 15.0
+# How long cancelled streams may take to unsubscribe on the server
+CLEANUP_TIMEOUT_SEC = 5.0
+
+
+# --- server (child process) -------------------------------------------------
+
+
+def _rss_mb() -> float:
+    try:
+        pages = int(Path("/proc/self/statm").read_text().split()[1])
+    except (OSError, IndexError, ValueError):
+        return _peak_rss_mb(resource.RUSAGE_SELF)
+    return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def create_server_app():
+    """The deliveries API plus ``/bench`` endpoints to drive and inspect it."""
+    from fastapi import FastAPI
+
+    from app.adapters.inbound.deliveries import router as deliveries_router
+    from app.domain.services.event_bus import EventBus
+
+    bus = EventBus()
+    app = FastAPI()
+    app.include_router(deliveries_router, prefix="/api")
+    app.state.event_bus = bus
+    app.state.delivery_usecases = None
+    publishers: set[asyncio.Task] = set()
+
+    async def publish(burst: int, count: int, rate: float, event_bytes: int) -> None:
+        text = "x" * event_bytes
+        started = time.perf_counter()
+        for seq in range(count):
+            if rate > 0:
+                delay = started + seq / rate - time.perf_counter()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif seq % 50 == 0:
+                await asyncio.sleep(0)
+            await bus.publish(DELIVERY_ID, {
+                "type": "assistant",
+                "burst": burst,
+                "seq": seq,
+                "ts": time.time(),
+                "message": {"role": "assistant", "content": [{"type": "text", "text": text}]},
+            })
+
+    @app.post("/bench/publish")
+    async def start_publish(burst: int, count: int, rate: float = 0, event_bytes: int = 1000):
+        task = asyncio.create_task(publish(burst, count, rate, event_bytes))
+        publishers.add(task)
+        task.add_done_callback(publishers.discard)
+        return {"started": True}
+
+    @app.get("/bench/stats")
+    def stats():
+        return {
+            **bus.stats(),
+            "rss_mb": round(_rss_mb(), 1),
+            "peak_rss_mb": round(_peak_rss_mb(resource.RUSAGE_SELF), 1),
+        }
+
+    return app
+
+
+def serve(port: int) -> None:
+    import uvicorn
+
+    structlog.configure(wrapper_class=structlog.make_filtering_bound_logger(logging.WARNING))
+    uvicorn.run(create_server_app(), host="127.0.0.1", port=port, log_level="warning")
+
+
+# --- clients ----------------------------------------------------------------
+
+
+@dataclass
+class Viewer:
+    """One SSE client; counts events and latencies per burst."""
+
+    connected_at: float = 0.0
+    counts: dict[int, int] = field(default_factory=dict)
+    latencies: dict[int, list[float]] = field(default_factory=dict)
+    # perf_counter time at which each burst was fully received
+    completed: dict[int, float] = field(default_factory=dict)
+    expected: dict[int, int] = field(default_factory=dict)
+    error: str | None = None
+
+    async def watch(self, port: int) -> None:
+        """Stream over a raw connection; httpx's per-line cost would dominate."""
+        self.connected_at = time.perf_counter()
+        writer = None
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(
+                f"GET /api/deliveries/{DELIVERY_ID}/stream HTTP/1.1\r\n"
+                "Host: 127.0.0.1\r\nAccept: text/event-stream\r\n\r\n".encode()
+            )
+            head = await reader.readuntil(b"\r\n\r\n")
+            if not head.startswith(b"HTTP/1.1 200"):
+                raise ConnectionError(head.split(b"\r\n", 1)[0].decode())
+            async for frame in _chunks(reader):
+                for line in frame.split(b"\n"):
+                    if line.startswith(b"data: "):
+                        self._receive(json.loads(line[6:]))
+        except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+            self.error = f"{type(e).__name__}: {e}"
+        finally:
+            if writer is not None:
+                writer.close()
+
+    def _receive(self, event: dict) -> None:
+        burst = event.get("burst")
+        if burst is None:
+            return
+        count = self.counts[burst] = self.counts.get(burst, 0) + 1
+        self.latencies.setdefault(burst, []).append(time.time() - event["ts"])
+        if count == self.expected.get(burst):
+            self.completed[burst] = time.perf_counter()
+
+
+async def _chunks(reader: asyncio.StreamReader):
+    """Decode a chunked response body; each SSE frame is sent as one chunk."""
+    while True:
+        size = int((await reader.readline()).split(b";", 1)[0], 16)
+        if size == 0:
+            return
+        chunk = await reader.readexactly(size + 2)
+        yield chunk[:-2]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for(client: httpx.AsyncClient, predicate, timeout: float) -> dict | None:
+    """Poll ``/bench/stats`` until ``predicate(stats)``; ``None`` on timeout."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            stats = (await client.get("/bench/stats")).json()
+        except httpx.TransportError:
+            stats = None
+        if stats is not None and predicate(stats):
+            return stats
+        await asyncio.sleep(0.02)
+    return None
+
+
+def _connect(port: int, viewers: list[Viewer]) -> list[asyncio.Task]:
+    return [asyncio.create_task(viewer.watch(port)) for viewer in viewers]
+
+
+async def _await_bursts(viewers: list[Viewer], burst: int, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline and any(burst not in v.completed for v in viewers):
+        await asyncio.sleep(0.01)
+
+
+def _delivery_ratio(viewers: list[Viewer], burst: int, events: int) -> float:
+    delivered = sum(min(v.counts.get(burst, 0), events) for v in viewers)
+    return round(delivered / (events * len(viewers)), 4) if viewers else 0.0
+
+
+def _latency_ms(viewers: list[Viewer], burst: int) -> dict[str, float]:
+    values = [lat for v in viewers for lat in v.latencies.get(burst, [])]
+    return {
+        f"p{pct}_ms": round(_percentile(values, pct) * 1000, 1) for pct in (50, 95, 99)
+    }
+
+
+async def run_scenario(
+    clients: int = 50,
+    events: int = 500,
+    rate: float = 200,
+    event_bytes: int = 1000,
+    burst_timeout: float = 60.0,
+) -> dict:
+    """Run steady, storm and recovery phases and return the measurements."""
+    port = _free_port()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "benchmarks.sse_load", "serve", "--port", str(port)],
+        cwd=BACKEND_DIR,
+        stdout=subprocess.DEVNULL,
+    )
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=10.0) as client:
+            idle = await _wait_for(client, lambda s: True, STARTUP_TIMEOUT_SEC)
+            if idle is None:
+                raise RuntimeError("SSE load server did not start")
+
+            # Steady: N live viewers of one burst
+            viewers = [Viewer(expected={0: events}) for _ in range(clients)]
+            tasks = _connect(port, viewers)
+            await _wait_for(client, lambda s: s["subscribers"] >= clients, burst_timeout)
+            started = time.perf_counter()
+            await client.post("/bench/publish", params={
+                "burst": 0, "count": events, "rate": rate, "event_bytes": event_bytes,
+            })
+            await _await_bursts(viewers, 0, burst_timeout)
+            steady_sec = max((v.completed.get(0, time.perf_counter()) for v in viewers), default=started) - started
+            steady_stats = (await client.get("/bench/stats")).json()
+
+            # Storm: every connection drops at once...
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            dropped_at = time.perf_counter()
+            cleaned = await _wait_for(client, lambda s: s["subscribers"] == 0, CLEANUP_TIMEOUT_SEC)
+            cleanup_ms = (time.perf_counter() - dropped_at) * 1000
+            leaked = (await client.get("/bench/stats")).json()["subscribers"]
+
+            # ...and everyone reconnects together, replaying the buffer
+            reconnected = [Viewer(expected={0: events, 1: events}) for _ in range(clients)]
+            storm_started = time.perf_counter()
+            tasks = _connect(port, reconnected)
+            resubscribed = await _wait_for(client, lambda s: s["subscribers"] >= clients, burst_timeout)
+            reconnect_sec = time.perf_counter() - storm_started
+            await _await_bursts(reconnected, 0, burst_timeout)
+            replay_ms = [(v.completed[0] - v.connected_at) * 1000 for v in reconnected if 0 in v.completed]
+
+            # Recovery: live delivery still reaches every reconnected client
+            await client.post("/bench/publish", params={
+                "burst": 1, "count": events, "rate": rate, "event_bytes": event_bytes,
+            })
+            await _await_bursts(reconnected, 1, burst_timeout)
+            final_stats = (await client.get("/bench/stats")).json()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+
+    delivered = sum(min(v.counts.get(0, 0), events) for v in viewers)
+    return {
+        "clients": clients,
+        "events": events,
+        "rate": rate,
+        "event_bytes": event_bytes,
+        "steady": {
+            "delivered_events_per_sec": round(delivered / steady_sec, 1) if steady_sec > 0 else 0.0,
+            "delivery_ratio": _delivery_ratio(viewers, 0, events),
+            "latency": _latency_ms(viewers, 0),
+            "client_errors": sum(v.error is not None for v in viewers),
+        },
+        "storm": {
+            "cleanup_ms": round(cleanup_ms, 1) if cleaned is not None else None,
+            "leaked_subscribers": leaked,
+            "reconnect_sec": round(reconnect_sec, 3) if resubscribed is not None else None,
+            "replay_ratio": _delivery_ratio(reconnected, 0, events),
+            "replay_p99_ms": round(_percentile(replay_ms, 99), 1),
+        },
+        "recovery": {
+            "delivery_ratio": _delivery_ratio(reconnected, 1, events),
+            "latency": _latency_ms(reconnected, 1),
+            "client_errors": sum(v.error is not None for v in reconnected),
+        },
+        "server": {
+            "idle_rss_mb": idle["rss_mb"],
+            "steady_rss_mb": steady_stats["rss_mb"],
+            "peak_rss_mb": final_stats["peak_rss_mb"],
+            "max_queue_depth": max(steady_stats["max_queue_depth"], final_stats["max_queue_depth"]),
+        },
+    }
+
+
+def check(
+    report: dict,
+    max_p99_ms: float = 500.0,
+    min_delivery: float = 1.0,
+    max_rss_mb: float = 512.0,
+    max_reconnect_sec: float = 5.0,
+    max_replay_sec: float = 10.0,
+) -> dict[str, bool]:
+    """Pass/fail per threshold; a missing measurement (timeout) fails."""
+    storm = report["storm"]
+    return {
+        "steady_delivery": report["steady"]["delivery_ratio"] >= min_delivery,
+        "steady_p99_latency": report["steady"]["latency"]["p99_ms"] <= max_p99_ms,
+        "subscribers_cleaned_up": storm["leaked_subscribers"] == 0,
+        "reconnect_time": storm["reconnect_sec"] is not None and storm["reconnect_sec"] <= max_reconnect_sec,
+        "replay_delivery": storm["replay_ratio"] >= min_delivery,
+        "replay_time": storm["replay_p99_ms"] <= max_replay_sec * 1000,
+        "recovery_delivery": report["recovery"]["delivery_ratio"] >= min_delivery,
+        "recovery_p99_latency": report["recovery"]["latency"]["p99_ms"] <= max_p99_ms,
+        "server_rss": report["server"]["peak_rss_mb"] <= max_rss_mb,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="jakeops SSE fan-out and reconnect-storm load test")
+    sub = parser.add_subparsers(dest="command")
+    serve_parser = sub.add_parser("serve", help="run the load-test server (started automatically)")
+    serve_parser.add_argument("--port", type=int, required=True)
+    parser.add_argument("--clients", type=int, default=50)
+    parser.add_argument("--events", type=int, default=500, help="events per burst")
+    parser.add_argument("--rate", type=float, default=200, help="published events/sec, 0 for unthrottled")
+    parser.add_argument("--event-bytes", type=int, default=1000)
+    parser.add_argument("--max-p99-ms", type=float, default=500.0)
+    parser.add_argument("--min-delivery", type=float, default=1.0, help="fraction of events every client must get")
+    parser.add_argument("--max-rss-mb", type=float, default=512.0)
+    parser.add_argument("--max-reconnect-sec", type=float, default=5.0)
+    parser.add_argument("--max-replay-sec", type=float, default=10.0, help="p99 time to receive the replay buffer")
+    parser.add_argument("--output", type=Path, help="also write the report as JSON")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        serve(args.port)
+        return 0
+
+    report = asyncio.run(run_scenario(args.clients, args.events, args.rate, args.event_bytes))
+    checks = check(
+        report, args.max_p99_ms, args.min_delivery, args.max_rss_mb, args.max_reconnect_sec, args.max_replay_sec,
+    )
+    report["checks"] = checks
+    report["passed"] = all(checks.values())
+
+    steady, storm, recovery, server = report["steady"], report["storm"], report["recovery"], report["server"]
+    print(f"{report['clients']} clients x {report['events']} events at {report['rate']}/s")
+    print(
+        f"  steady    {steady['delivered_events_per_sec']:,.0f} events/s delivered, "
+        f"ratio {steady['delivery_ratio']}, p50/p95/p99 "
+        f"{steady['latency']['p50_ms']}/{steady['latency']['p95_ms']}/{steady['latency']['p99_ms']} ms"
+    )
+    print(
+        f"  storm     cleanup {storm['cleanup_ms']} ms, leaked {storm['leaked_subscribers']}, "
+        f"reconnect {storm['reconnect_sec']} s, replay ratio {storm['replay_ratio']}, "
+        f"replay p99 {storm['replay_p99_ms']} ms"
+    )
+    print(
+        f"  recovery  ratio {recovery['delivery_ratio']}, p99 {recovery['latency']['p99_ms']} ms"
+    )
+    print(
+        f"  server    RSS idle {server['idle_rss_mb']} MB, steady {server['steady_rss_mb']} MB, "
+        f"peak {server['peak_rss_mb']} MB, max queue depth {server['max_queue_depth']}"
+    )
+    for name, ok in checks.items():
+        print(f"  {'PASS' if ok else 'FAIL'}  {name}")
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+    return 0 if report["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,252 @@
+"""Benchmark scenarios for the delivery pipeline hot paths.
+
+Each scenario takes a scale (``smoke``, ``default`` or ``full``) and
+returns flat ``{metric: value}`` results. Metric names end with their
+unit; ``_ms`` and ``_sec`` are lower-is-better, everything else
+(``_eps``, ``_per_sec``, ``_mb_s``) is higher-is-better.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+
+import httpx
+from fastapi import FastAPI
+
+from app.adapters.inbound.deliveries import router as deliveries_router
+from app.adapters.outbound.filesystem_delivery import FileSystemDeliveryRepository
+from app.adapters.outbound.filesystem_source import FileSystemSourceRepository
+from app.domain.services.event_bus import EventBus
+from app.domain.services.stream_parser import extract_transcript
+from app.usecases.delivery_sync import DeliverySyncUseCase
+from app.usecases.delivery_usecases import DeliveryUseCasesImpl, _raw_to_event_record
+from benchmarks import bench_json_codec, bench_stream_events
+from benchmarks.generators import FakeGitHub, populate_deliveries, synthetic_run, synthetic_sources
+
+SCALES = ("smoke", "default", "full")
+
+Scenario = Callable[[str], dict[str, float]]
+SCENARIOS: dict[str, Scenario] = {}
+
+
+def scenario(name: str) -> Callable[[Scenario], Scenario]:
+    def register(fn: Scenario) -> Scenario:
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+
+def _pick(scale: str, smoke, default, full=None):
+    if scale == "smoke":
+        return smoke
+    if scale == "full" and full is not None:
+        return full
+    return default
+
+
+@contextmanager
+def _timer(results: dict[str, float], metric: str) -> Iterator[None]:
+    start = time.perf_counter()
+    yield
+    elapsed = time.perf_counter() - start
+    results[metric] = round(elapsed * 1000, 3) if metric.endswith("_ms") else round(elapsed, 4)
+
+
+@scenario("deliveries.list_and_next_seq")
+def deliveries_scan(scale: str) -> dict[str, float]:
+    results: dict[str, float] = {}
+    for count in _pick(scale, [50], [1_000, 10_000], [1_000, 10_000, 100_000]):
+        with tempfile.TemporaryDirectory() as tmp:
+            populate_deliveries(Path(tmp), count)
+            repo = FileSystemDeliveryRepository(Path(tmp))
+            with _timer(results, f"list_deliveries_{count}_ms"):
+                repo.list_deliveries()
+            with _timer(results, f"next_seq_{count}_ms"):
+                repo.next_seq()
+    return results
+
+
+@scenario("sync.sync_once")
+def sync_sources(scale: str) -> dict[str, float]:
+    n_sources = _pick(scale, 10, 500)
+    results: dict[str, float] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        source_repo = FileSystemSourceRepository(Path(tmp) / "sources")
+        for source in synthetic_sources(n_sources):
+            source_repo.save_source(source["id"], source)
+        deliveries = DeliveryUseCasesImpl(FileSystemDeliveryRepository(Path(tmp) / "deliveries"))
+        sync = DeliverySyncUseCase(FakeGitHub(issues_per_repo=2), source_repo, deliveries)
+
+        with _timer(results, f"initial_{n_sources}_sources_sec"):
+            created = sync.sync_once()["created"]
+        with _timer(results, f"steady_{n_sources}_sources_ms"):
+            sync.sync_once()
+        with _timer(results, f"poll_once_steady_{n_sources}_sources_ms"):
+            asyncio.run(sync.poll_once())
+        results["deliveries_created"] = created
+    return results
+
+
+@scenario("event_bus.fanout")
+def event_bus_fanout(scale: str) -> dict[str, float]:
+    n_subscribers = _pick(scale, 5, 100)
+    n_events = _pick(scale, 50, 2_000)
+    events = synthetic_run(n_events)
+
+    async def run() -> float:
+        bus = EventBus()
+        received = 0
+        ready = asyncio.Event()
+        attached = 0
+
+        async def consume() -> None:
+            nonlocal received, attached
+            sub = bus.subscribe_frames("d1")
+            first = asyncio.ensure_future(sub.__anext__())
+            attached += 1
+            if attached == n_subscribers:
+                ready.set()
+            try:
+                await first
+                received += 1
+                async for _ in sub:
+                    received += 1
+            except StopAsyncIteration:
+                pass
+
+        consumers = [asyncio.create_task(consume()) for _ in range(n_subscribers)]
+        await ready.wait()
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        for event in events:
+            await bus.publish("d1", event)
+        await bus.close("d1")
+        await asyncio.gather(*consumers)
+        elapsed = time.perf_counter() - start
+        assert received == n_events * n_subscribers
+        return elapsed
+
+    elapsed = asyncio.run(run())
+    return {
+        f"publish_{n_subscribers}_subs_eps": round(n_events / elapsed, 1),
+        f"deliveries_{n_subscribers}_subs_per_sec": round(n_events * n_subscribers / elapsed, 1),
+    }
+
+
+@scenario("event_bus.publish_at_budget")
+def event_bus_publish_at_budget(scale: str) -> dict[str, float]:
+    """Steady publishing once the replay budget is full; eviction must stay cheap."""
+    n_events = _pick(scale, 2_000, 50_000)
+    large = {"type": "user", "message": {"content": [{"type": "tool_result", "content": "x" * 40_000}]}}
+    small = {"type": "assistant", "message": {"content": "y" * 500}}
+    events = [large if i % 10 == 0 else small for i in range(n_events)]
+
+    async def run() -> float:
+        bus = EventBus(max_total_bytes=_pick(scale, 1, 8) * 1024 * 1024)
+        for i, event in enumerate(events):
+            await bus.publish(f"d{i % 20}", event)
+        start = time.perf_counter()
+        for i, event in enumerate(events):
+            await bus.publish(f"d{i % 20}", event)
+        return time.perf_counter() - start
+
+    elapsed = asyncio.run(run())
+    return {"publish_at_budget_eps": round(n_events / elapsed, 1)}
+
+
+@scenario("stream.extract_transcript")
+def transcript_extraction(scale: str) -> dict[str, float]:
+    n_events = _pick(scale, 500, 50_000)
+    records = [_raw_to_event_record(e) for e in synthetic_run(n_events)]
+    results: dict[str, float] = {}
+    with _timer(results, f"extract_transcript_{n_events}_ms"):
+        extract_transcript(records)
+    results[f"extract_transcript_{n_events}_eps"] = round(
+        n_events / (results[f"extract_transcript_{n_events}_ms"] / 1000), 1,
+    )
+    return results
+
+
+@scenario("stream.pipeline")
+def stream_pipeline(scale: str) -> dict[str, float]:
+    n_events = _pick(scale, 500, 20_000)
+    return {k: round(v, 1) for k, v in bench_stream_events.run(n_events, repeat=_pick(scale, 1, 3)).items()}
+
+
+@scenario("json.codecs")
+def json_codecs(scale: str) -> dict[str, float]:
+    n_events = _pick(scale, 500, 20_000)
+    results = bench_json_codec.run(n_events, repeat=_pick(scale, 1, 3))
+    return {f"{codec}.{metric}": round(value, 1) for codec, metrics in results.items() for metric, value in metrics.items()}
+
+
+@scenario("sse.throughput")
+def sse_throughput(scale: str) -> dict[str, float]:
+    n_events = _pick(scale, 50, 5_000)
+    events = synthetic_run(n_events)
+
+    async def run() -> tuple[float, int]:
+        bus = EventBus()
+        app = FastAPI()
+        app.include_router(deliveries_router, prefix="/api")
+        app.state.event_bus = bus
+        app.state.delivery_usecases = None
+
+        async def produce() -> None:
+            while "d1" not in bus._subscribers:
+                await asyncio.sleep(0.001)
+            for event in events:
+                await bus.publish("d1", event)
+            await bus.close("d1")
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            start = time.perf_counter()
+            producer = asyncio.create_task(produce())
+            response = await client.get("/api/deliveries/d1/stream")
+            await producer
+            elapsed = time.perf_counter() - start
+        assert response.content.count(b"data: ") >= n_events
+        return elapsed, len(response.content)
+
+    elapsed, size = asyncio.run(run())
+    return {
+        f"sse_{n_events}_events_eps": round(n_events / elapsed, 1),
+        "sse_mb_s": round(size / 1e6 / elapsed, 2),
+    }
+
+
+def run_scenarios(scale: str = "default", pattern: str = "") -> dict[str, dict[str, float]]:
+    return {
+        name: fn(scale)
+        for name, fn in SCENARIOS.items()
+        if pattern in name
+    }
+
+
+def lower_is_better(metric: str) -> bool:
+    return metric.endswith(("_ms", "_sec"))
+
+
+def compare(
+    baseline: dict[str, dict[str, float]],
+    current: dict[str, dict[str, float]],
+    threshold: float,
+) -> list[str]:
+    """Describe metrics that got worse than ``baseline`` by more than ``threshold`` (fraction)."""
+    regressions = []
+    for name, metrics in current.items():
+        for metric, value in metrics.items():
+            old = baseline.get(name, {}).get(metric)
+            if not old or not isinstance(value, (int, float)):
+                continue
+            change = (value - old) / old
+            worse = change > threshold if lower_is_better(metric) else change < -threshold
+            if worse:
+                regressions.append(f"{name}.{metric}: {old:g} -> {value:g} ({change:+.0%})")
+    return regressions
@@ -5,6 +5,7 @@ from pathlib import Path
 
 import pytest
 
+from app import metrics, tracing
 from app.adapters.outbound.filesystem_delivery import FileSystemDeliveryRepository
 from app.adapters.outbound.filesystem_source import FileSystemSourceRepository
 from app.domain.models.delivery import DeliveryCreate, DeliveryUpdate, Plan
@@ -396,3 +397,50 @@ class TestStreamingExecution:
         run = delivery["runs"][-1]
         assert run["stats"]["cost_usd"] == 0.01
         assert run["session"]["model"] == "test-model"
+
+    @pytest.mark.asyncio
+    async def test_traces_each_step_under_the_phase_span(self, uc):
+        exporter = tracing.InMemorySpanExporter()
+        previous = tracing.set_exporter(exporter)
+        try:
+            result = _create_delivery(uc)
+            with tracing.span("request") as request:
+                await uc.generate_plan(result["id"])
+        finally:
+            tracing.set_exporter(previous)
+
+        spans = {s.name: s for s in exporter.spans}
+        phase = spans["agent_phase"]
+        assert phase.attributes["phase"] == "plan"
+        assert phase.attributes["repository"] == "owner/repo"
+        for step in ("git.clone", "agent.stream", "stream.analyze", "repo.persist"):
+            assert spans[step].parent_id == phase.span_id
+        assert spans["agent.stream"].attributes["events"] == 3
+        assert phase.parent_id == request.span_id
+        assert spans["plan.publish"].parent_id == request.span_id
+        assert spans["git.create_pr"].parent_id == spans["plan.publish"].span_id
+
+    @pytest.mark.asyncio
+    async def test_records_step_timings_on_the_run(self, uc):
+        result = _create_delivery(uc)
+        await uc.generate_plan(result["id"])
+
+        run = uc.get_delivery(result["id"])["runs"][0]
+        timings = run["timings"]
+        for key in ("queue_wait_ms", "clone_ms", "agent_ms", "analyze_ms", "persist_ms", "pr_ms"):
+            assert timings[key] >= 0
+        assert "checkout_ms" not in timings
+
+    @pytest.mark.asyncio
+    async def test_records_run_metrics_per_phase_and_repo(self, uc):
+        labels = {"phase": "plan", "repository": "owner/repo"}
+        runs_before = metrics.AGENT_RUNS.value(status="succeeded", **labels)
+        cost_before = metrics.AGENT_RUN_COST.value(**labels)
+        tokens_before = metrics.AGENT_RUN_TOKENS.value(direction="input", **labels)
+
+        result = _create_delivery(uc)
+        await uc.generate_plan(result["id"])
+
+        assert metrics.AGENT_RUNS.value(status="succeeded", **labels) == runs_before + 1
+        assert metrics.AGENT_RUN_COST.value(**labels) == pytest.approx(cost_before + 0.01)
+        assert metrics.AGENT_RUN_TOKENS.value(direction="input", **labels) == tokens_before + 10
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+import structlog
+
+from benchmarks import load_harness, sse_load, suite
+from benchmarks.__main__ import main
+
+
+def test_smoke_scale_runs_every_scenario():
+    results = suite.run_scenarios("smoke")
+
+    assert set(results) == set(suite.SCENARIOS)
+    assert all(metrics for metrics in results.values())
+    assert results["sync.sync_once"]["deliveries_created"] == 20
+
+
+def test_compare_flags_regressions_by_direction():
+    baseline = {"s": {"list_ms": 100.0, "publish_eps": 1000.0, "steady_sec": 1.0}}
+    current = {"s": {"list_ms": 130.0, "publish_eps": 700.0, "steady_sec": 0.5}}
+
+    regressions = suite.compare(baseline, current, threshold=0.2)
+
+    assert len(regressions) == 2
+    assert regressions[0].startswith("s.list_ms: 100 -> 130")
+    assert regressions[1].startswith("s.publish_eps: 1000 -> 700")
+
+
+@pytest.fixture
+def restore_structlog():
+    config = structlog.get_config()
+    yield
+    structlog.configure(**config)
+
+
+def test_main_writes_json_results(tmp_path, monkeypatch, restore_structlog):
+    monkeypatch.setattr("sys.argv", ["benchmarks", "-k", "extract_transcript", "--scale", "smoke", "--output", str(tmp_path)])
+
+    assert main() == 0
+
+    [path] = tmp_path.glob("*.json")
+    report = json.loads(path.read_text())
+    assert report["meta"]["scale"] == "smoke"
+    assert list(report["results"]) == ["stream.extract_transcript"]
+
+
+def test_load_harness_drives_deliveries_through_review():
+    report = asyncio.run(load_harness.run_load(
+        deliveries=3, concurrency=3, fake_env={"FAKE_CLAUDE_TURNS": "2"},
+    ))
+
+    assert report["completed"] == 3
+    assert report["runs"] == 9
+    assert report["failed_runs"] == 0
+    assert {phase: stats["count"] for phase, stats in report["phases"].items()} == {
+        "plan": 3, "implement": 3, "review": 3,
+    }
+
+
+def test_load_harness_counts_failed_runs():
+    report = asyncio.run(load_harness.run_load(
+        deliveries=2, concurrency=2, fake_env={"FAKE_CLAUDE_TURNS": "2", "FAKE_CLAUDE_FAILURE": "exit"},
+    ))
+
+    assert report["completed"] == 0
+    assert report["failed_runs"] == 2
+    assert report["phases"]["plan"]["count"] == 2
+
+
+def test_sse_load_measures_fanout_and_reconnect_storm():
+    report = asyncio.run(sse_load.run_scenario(clients=5, events=20, rate=0, burst_timeout=20))
+
+    assert report["steady"]["delivery_ratio"] == 1.0
+    assert report["steady"]["client_errors"] == 0
+    assert report["storm"]["leaked_subscribers"] == 0
+    assert report["storm"]["replay_ratio"] == 1.0
+    assert report["recovery"]["delivery_ratio"] == 1.0
+    assert report["server"]["peak_rss_mb"] > 0
+    checks = sse_load.check(report, max_p99_ms=60_000, max_rss_mb=10_000, max_reconnect_sec=60, max_replay_sec=60)
+    assert all(checks.values()), checks
+
+
+def test_sse_load_check_fails_on_lost_events_and_leaks():
+    report = {
+        "steady": {"delivery_ratio": 0.9, "latency": {"p99_ms": 10.0}},
+        "storm": {"leaked_subscribers": 3, "reconnect_sec": None, "replay_ratio": 1.0, "replay_p99_ms": 5.0},
+        "recovery": {"delivery_ratio": 1.0, "latency": {"p99_ms": 10.0}},
+        "server": {"peak_rss_mb": 60.0},
+    }
+
+    checks = sse_load.check(report)
+
+    assert {name for name, ok in checks.items() if not ok} == {
+        "steady_delivery", "subscribers_cleaned_up", "reconnect_time",
+    }
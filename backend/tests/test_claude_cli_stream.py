@@ -1,5 +1,6 @@
 import asyncio
 import json
+import sys
 
 import pytest
 
@@ -228,3 +229,42 @@ class TestRunStream:
 async def async_exhaust(agen):
     async for _ in agen:
         pass
+
+
+class TestFakeClaudeBinary:
+    @pytest.fixture
+    def adapter(self):
+        from benchmarks.load_harness import FAKE_CLAUDE
+        return ClaudeCliAdapter(binary=[sys.executable, str(FAKE_CLAUDE)])
+
+    def test_streams_events_from_configured_binary(self, adapter, monkeypatch, tmp_path):
+        monkeypatch.setenv("FAKE_CLAUDE_TURNS", "3")
+        monkeypatch.setenv("FAKE_CLAUDE_SUBAGENTS", "1")
+
+        async def run():
+            return [ev async for ev in adapter.run_stream("prompt", str(tmp_path))]
+
+        events = asyncio.run(run())
+        assert events[0]["subtype"] == "init"
+        assert events[-1]["type"] == "result"
+        assert any(ev.get("parent_tool_use_id") for ev in events)
+        assert asyncio.run(run()) == events
+
+    def test_recovers_truncated_and_skips_garbage_lines(self, adapter, monkeypatch, tmp_path):
+        monkeypatch.setenv("FAKE_CLAUDE_FAILURE", "garbage")
+        garbage = asyncio.run(collect(adapter.run_stream("prompt", str(tmp_path))))
+        monkeypatch.setenv("FAKE_CLAUDE_FAILURE", "truncate")
+        truncated = asyncio.run(collect(adapter.run_stream("prompt", str(tmp_path))))
+
+        assert garbage[-1]["type"] == truncated[-1]["type"] == "result"
+        assert len(garbage) == len(truncated)
+
+    def test_run_raises_on_simulated_crash(self, adapter, monkeypatch, tmp_path):
+        monkeypatch.setenv("FAKE_CLAUDE_FAILURE", "exit")
+
+        with pytest.raises(RuntimeError, match="simulated crash"):
+            asyncio.run(adapter.run("prompt", str(tmp_path)))
+
+
+async def collect(agen):
+    return [item async for item in agen]
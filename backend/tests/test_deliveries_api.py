@@ -1,5 +1,6 @@
 from fastapi.testclient import TestClient
 
+from app.adapters.outbound.filesystem_delivery import FileSystemDeliveryRepository
 from app.main import app
 
 client = TestClient(app)
@@ -131,3 +132,19 @@ def test_get_schema():
     resp = client.get("/api/deliveries/schema")
     assert resp.status_code == 200
     assert "properties" in resp.json()
+
+
+def test_get_run_timings(_test_storage):
+    resp = client.post("/api/deliveries", json=VALID_DELIVERY)
+    delivery_id = resp.json()["id"]
+    repo = FileSystemDeliveryRepository(_test_storage / "deliveries")
+    delivery = repo.get_delivery(delivery_id)
+    delivery["runs"] = [{"id": "r1", "timings": {"clone_ms": 120.0, "agent_ms": 880.0}}]
+    repo.save_delivery(delivery_id, delivery)
+
+    resp = client.get("/api/deliveries/timings")
+
+    assert resp.status_code == 200
+    steps = resp.json()["jakeops"]["steps"]
+    assert steps["clone_ms"]["mean_ms"] == 120.0
+    assert steps["agent_ms"]["share"] == 0.88
@@ -1,7 +1,12 @@
+import asyncio
 import hashlib
+import time
+
+import pytest
 
 from app.domain.constants import ID_HEX_LENGTH
-from app.domain.models.github import GitHubIssue
+from app.domain.models.github import GitHubIssue, RateLimit, token_key
+from app.domain.services.poll_scheduler import PollScheduler
 from app.domain.models.delivery import DeliveryCreate
 from app.usecases.delivery_sync import DeliverySyncUseCase
 
@@ -11,7 +16,7 @@ class FakeGitHubRepo:
         self._issues = issues or []
         self.last_token: str | None = None
 
-    def list_open_issues(self, owner: str, repo: str, token: str = "") -> list[GitHubIssue]:
+    async def fetch_open_issues(self, owner: str, repo: str, token: str = "", if_changed: bool = False) -> list[GitHubIssue]:
         self.last_token = token
         return self._issues
 
@@ -282,3 +287,419 @@ def test_sync_returns_dict_with_created_and_closed():
     assert isinstance(result, dict)
     assert "created" in result
     assert "closed" in result
+
+
+class SlowGitHubRepo(FakeGitHubRepo):
+    """Async fake that records peak in-flight fetches."""
+
+    def __init__(self, issues=None, fail_repos=()):
+        super().__init__(issues)
+        self.in_flight = 0
+        self.peak = 0
+        self._fail_repos = set(fail_repos)
+
+    async def fetch_open_issues(self, owner: str, repo: str, token: str = "", if_changed: bool = False) -> list[GitHubIssue]:
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            if repo in self._fail_repos:
+                raise RuntimeError("boom")
+            return self._issues
+        finally:
+            self.in_flight -= 1
+
+
+@pytest.mark.asyncio
+async def test_poll_once_fetches_concurrently_within_limit():
+    issues = [GitHubIssue(number=1, title="Bug", html_url="https://github.com/o/r/issues/1", state="open")]
+    github_repo = SlowGitHubRepo(issues)
+    source_repo = FakeSourceRepo([
+        {"id": f"s{i}", "owner": "o", "repo": f"r{i}"} for i in range(10)
+    ])
+    delivery_uc = FakeDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc, max_concurrency=3)
+    result = await uc.poll_once()
+
+    assert github_repo.peak == 3
+    assert result["created"] == 10
+    assert len(result["sources"]) == 10
+    assert all(r["duration_ms"] >= 0 and r["issues"] == 1 for r in result["sources"])
+
+
+@pytest.mark.asyncio
+async def test_poll_once_reports_failed_source_and_continues():
+    issues = [GitHubIssue(number=1, title="Bug", html_url="https://github.com/o/r/issues/1", state="open")]
+    github_repo = SlowGitHubRepo(issues, fail_repos={"bad"})
+    source_repo = FakeSourceRepo([
+        {"id": "s1", "owner": "o", "repo": "bad"},
+        {"id": "s2", "owner": "o", "repo": "good"},
+    ])
+    delivery_uc = FakeDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc)
+    result = await uc.poll_once()
+
+    assert result["created"] == 1
+    reports = {r["repository"]: r for r in result["sources"]}
+    assert reports["o/bad"]["error"] == "boom"
+    assert reports["o/good"]["issues"] == 1
+    assert "s1" not in source_repo.saved
+
+
+@pytest.mark.asyncio
+async def test_poll_once_matches_sync_once_reconciliation():
+    issue1 = GitHubIssue(number=1, title="Bug", html_url="https://github.com/o/r/issues/1", state="open")
+    github_repo = FakeGitHubRepo([issue1])
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "r"}])
+    delivery_uc = FakeDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc)
+    await uc.poll_once()
+    github_repo._issues = []
+    result = await uc.poll_once()
+
+    assert result["closed"] == 1
+    assert len(delivery_uc.created) == 1
+
+
+class UnchangedGitHubRepo(FakeGitHubRepo):
+    """Reports every listing as unchanged (HTTP 304)."""
+
+    async def fetch_open_issues(self, owner, repo, token="", if_changed=False):
+        return None if if_changed else self._issues
+
+
+class CountingDeliveryUseCases(FakeDeliveryUseCases):
+    def __init__(self):
+        super().__init__()
+        self.list_calls = 0
+
+    def list_deliveries(self) -> list[dict]:
+        self.list_calls += 1
+        return super().list_deliveries()
+
+
+def test_sync_skips_reconcile_when_listing_unchanged():
+    github_repo = UnchangedGitHubRepo([])
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "r"}])
+    delivery_uc = CountingDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc)
+    result = uc.sync_once()
+
+    assert result == {"created": 0, "closed": 0}
+    assert delivery_uc.list_calls == 0
+    assert source_repo.saved["s1"]["last_polled_at"]
+
+
+@pytest.mark.asyncio
+async def test_poll_once_marks_unchanged_sources():
+    github_repo = UnchangedGitHubRepo([])
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "r"}])
+    delivery_uc = CountingDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc)
+    result = await uc.poll_once()
+
+    assert result["sources"][0]["unchanged"] is True
+    assert delivery_uc.list_calls == 0
+    assert "s1" in source_repo.saved
+
+
+class DeltaGitHubRepo(FakeGitHubRepo):
+    """Serves a full listing plus a separate incremental delta."""
+
+    def __init__(self, issues=None):
+        super().__init__(issues)
+        self.delta: list[GitHubIssue] = []
+        self.since_calls: list[str] = []
+
+    async def fetch_issues_since(self, owner, repo, since, token=""):
+        self.since_calls.append(since)
+        return self.delta
+
+
+def test_incremental_sync_applies_delta_after_full_listing():
+    issue1 = GitHubIssue(number=1, title="Bug", html_url="https://github.com/o/r/issues/1", state="open")
+    github_repo = DeltaGitHubRepo([issue1])
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "r"}])
+    delivery_uc = CountingDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc, incremental=True)
+    uc.sync_once()
+    assert github_repo.since_calls == []
+    list_calls_after_full = delivery_uc.list_calls
+
+    github_repo.delta = [
+        issue1.model_copy(update={"state": "closed"}),
+        GitHubIssue(number=2, title="New", html_url="https://github.com/o/r/issues/2", state="open"),
+    ]
+    result = uc.sync_once()
+
+    assert len(github_repo.since_calls) == 1
+    assert github_repo.since_calls[0].endswith("Z")
+    assert result == {"created": 1, "closed": 1}
+    assert delivery_uc.list_calls == list_calls_after_full
+
+
+def test_incremental_sync_rebaselines_with_full_listing():
+    github_repo = DeltaGitHubRepo([])
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "r"}])
+    delivery_uc = FakeDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc, incremental=True, full_sync_every=2)
+    for _ in range(4):
+        uc.sync_once()
+
+    # full, delta, delta, full
+    assert len(github_repo.since_calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_poll_once_reports_delta_mode():
+    github_repo = DeltaGitHubRepo([])
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "r"}])
+    delivery_uc = FakeDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc, incremental=True)
+    first = await uc.poll_once()
+    second = await uc.poll_once()
+
+    assert first["sources"][0]["mode"] == "full"
+    assert second["sources"][0]["mode"] == "delta"
+
+
+class RecordingScheduler(PollScheduler):
+    def __init__(self):
+        super().__init__(base_interval=60)
+        self.changes: list[bool] = []
+        self.token_keys: list = []
+
+    def record(self, source_id, token_key, changed, now, remaining=None, reset_in=None):
+        self.changes.append(changed)
+        self.token_keys.append(token_key)
+        return super().record(source_id, token_key, changed, now, remaining, reset_in)
+
+
+@pytest.mark.asyncio
+async def test_overlapping_delta_counts_an_edit_as_changed_once():
+    edited = GitHubIssue(
+        number=1, title="Bug", html_url="https://github.com/o/r/issues/1", state="open",
+        updated_at="2026-10-19T01:00:00Z",
+    )
+    github_repo = DeltaGitHubRepo([edited.model_copy(update={"updated_at": "2026-10-19T00:00:00Z"})])
+    github_repo.rate_limit = lambda token="", resource="core": None
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "r"}])
+    scheduler = RecordingScheduler()
+
+    uc = DeliverySyncUseCase(
+        github_repo, source_repo, FakeDeliveryUseCases(), incremental=True, scheduler=scheduler,
+    )
+    await uc.poll_once()
+    # The edit falls inside SINCE_OVERLAP, so every delta returns it again
+    github_repo.delta = [edited]
+    for _ in range(3):
+        await uc.poll_once()
+
+    # full listing created the delivery; then one real edit, then repeats
+    assert scheduler.changes == [True, True, False, False]
+
+
+@pytest.mark.asyncio
+async def test_scheduler_budgets_share_the_adapter_token_key():
+    github_repo = FakeGitHubRepo([])
+    github_repo.rate_limit = lambda token="", resource="core": None
+    source_repo = FakeSourceRepo([
+        {"id": "s1", "owner": "o", "repo": "r", "token": "ghp_a"},
+        {"id": "s2", "owner": "o", "repo": "public"},
+    ])
+    scheduler = RecordingScheduler()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, FakeDeliveryUseCases(), scheduler=scheduler)
+    await uc.poll_once()
+
+    assert scheduler.token_keys == [(token_key("ghp_a"), "core"), ("", "core")]
+
+
+def test_sync_builds_issue_index_once_per_refresh():
+    """Reconciling many sources does not rescan all deliveries per source."""
+    issues = [GitHubIssue(number=1, title="Bug", html_url="https://github.com/o/r/issues/1", state="open")]
+    github_repo = FakeGitHubRepo(issues)
+    source_repo = FakeSourceRepo([
+        {"id": f"s{i}", "owner": "o", "repo": f"r{i}"} for i in range(5)
+    ])
+    delivery_uc = CountingDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc)
+    uc.sync_once()
+    github_repo._issues = []
+    result = uc.sync_once()
+
+    assert result["closed"] == 5
+    assert delivery_uc.list_calls == 1
+
+
+def test_sync_does_not_recreate_delivery_missing_from_index():
+    """A delivery created after the index was built is found, not overwritten."""
+    issue1 = GitHubIssue(number=1, title="Bug", html_url="https://github.com/o/r/issues/1", state="open")
+    github_repo = FakeGitHubRepo([])
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "r"}])
+    delivery_uc = FakeDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc)
+    uc.sync_once()
+    delivery_uc.create_delivery(DeliveryCreate(
+        summary="manual", repository="o/r",
+        refs=[{"role": "request", "type": "github_issue", "label": "#1"}],
+    ))
+    github_repo._issues = [issue1]
+    result = uc.sync_once()
+
+    assert result["created"] == 0
+    assert len(delivery_uc.created) == 1
+
+
+@pytest.mark.asyncio
+async def test_poll_once_due_only_skips_sources_not_yet_due():
+    github_repo = FakeGitHubRepo([])
+    github_repo.rate_limit = lambda token="", resource="core": RateLimit(remaining=5000, reset_at=time.time() + 3600)
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "r"}])
+    delivery_uc = FakeDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(
+        github_repo, source_repo, delivery_uc, scheduler=PollScheduler(base_interval=60),
+    )
+    first = await uc.poll_once(due_only=True)
+    second = await uc.poll_once(due_only=True)
+    manual = await uc.poll_once()
+
+    assert len(first["sources"]) == 1
+    assert first["sources"][0]["next_poll_in"] > 0
+    assert second["sources"] == []
+    assert len(manual["sources"]) == 1
+    assert 1 <= uc.next_poll_delay(60) <= 60
+
+
+class BatchGitHubRepo(FakeGitHubRepo):
+    """Serves open issues per repository through the batched listing."""
+
+    def __init__(self, listings: dict[str, list[GitHubIssue]]):
+        super().__init__()
+        self.listings = listings
+        self.batches: list[tuple[str, list[tuple[str, str]]]] = []
+        self.single: list[str] = []
+        # Repositories the batched listing leaves out, as the adapter does on FORBIDDEN
+        self.unreadable: set[str] = set()
+
+    async def fetch_open_issues(self, owner, repo, token="", if_changed=False):
+        self.single.append(f"{owner}/{repo}")
+        return self.listings.get(f"{owner}/{repo}", [])
+
+    async def fetch_open_issues_batch(self, repositories, token, if_changed=False):
+        self.batches.append((token, list(repositories)))
+        return {
+            f"{o}/{r}": self.listings.get(f"{o}/{r}", [])
+            for o, r in repositories if f"{o}/{r}" not in self.unreadable
+        }
+
+    def rate_limit(self, token="", resource="core"):
+        return None
+
+
+def _issue(repo: str, number: int, state: str = "open") -> GitHubIssue:
+    return GitHubIssue(number=number, title=f"Issue {number}", html_url=f"https://github.com/{repo}/issues/{number}", state=state)
+
+
+def test_batch_sync_lists_sources_per_token_in_one_call():
+    github_repo = BatchGitHubRepo({
+        "o/a": [_issue("o/a", 1)],
+        "o/b": [_issue("o/b", 2)],
+        "o/c": [_issue("o/c", 3)],
+        "o/public": [_issue("o/public", 4)],
+    })
+    source_repo = FakeSourceRepo([
+        {"id": "s1", "owner": "o", "repo": "a", "token": "t1"},
+        {"id": "s2", "owner": "o", "repo": "b", "token": "t1"},
+        {"id": "s3", "owner": "o", "repo": "c", "token": "t2"},
+        {"id": "s4", "owner": "o", "repo": "public"},
+    ])
+    delivery_uc = FakeDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc, batch=True)
+    result = uc.sync_once()
+
+    assert result == {"created": 4, "closed": 0}
+    assert github_repo.batches == [("t1", [("o", "a"), ("o", "b")]), ("t2", [("o", "c")])]
+    # GraphQL needs a token; anonymous sources keep using REST
+    assert github_repo.single == ["o/public"]
+
+
+def test_batch_sync_closes_deliveries_missing_from_listing():
+    github_repo = BatchGitHubRepo({"o/a": [_issue("o/a", 1), _issue("o/a", 2)]})
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "a", "token": "t"}])
+    delivery_uc = FakeDeliveryUseCases()
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc, batch=True)
+    uc.sync_once()
+
+    github_repo.listings["o/a"] = [_issue("o/a", 2)]
+    result = uc.sync_once()
+
+    assert result == {"created": 0, "closed": 1}
+
+
+def test_batch_sync_keeps_deliveries_of_unreadable_repository():
+    github_repo = BatchGitHubRepo({"o/a": [_issue("o/a", 1)], "o/b": [_issue("o/b", 2)]})
+    source_repo = FakeSourceRepo([
+        {"id": "s1", "owner": "o", "repo": "a", "token": "t"},
+        {"id": "s2", "owner": "o", "repo": "b", "token": "t"},
+    ])
+    delivery_uc = FakeDeliveryUseCases()
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc, batch=True)
+    uc.sync_once()
+
+    github_repo.unreadable.add("o/a")
+    github_repo.listings["o/b"] = []
+    result = uc.sync_once()
+
+    # Only o/b is reconciled; losing access to o/a closes nothing there
+    assert result == {"created": 0, "closed": 1}
+
+
+@pytest.mark.asyncio
+async def test_batch_poll_once_reports_unreadable_repository_as_error():
+    github_repo = BatchGitHubRepo({"o/a": [_issue("o/a", 1)]})
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "a", "token": "t"}])
+    delivery_uc = FakeDeliveryUseCases()
+    uc = DeliverySyncUseCase(github_repo, source_repo, delivery_uc, batch=True)
+    await uc.poll_once()
+
+    github_repo.unreadable.add("o/a")
+    result = await uc.poll_once()
+
+    assert result["closed"] == 0
+    assert "not readable" in result["sources"][0]["error"]
+
+
+@pytest.mark.asyncio
+async def test_batch_poll_once_reports_each_source():
+    github_repo = BatchGitHubRepo({"o/a": [_issue("o/a", 1)], "o/b": []})
+    source_repo = FakeSourceRepo([
+        {"id": "s1", "owner": "o", "repo": "a", "token": "t"},
+        {"id": "s2", "owner": "o", "repo": "b", "token": "t"},
+    ])
+    delivery_uc = FakeDeliveryUseCases()
+
+    uc = DeliverySyncUseCase(
+        github_repo, source_repo, delivery_uc, batch=True, scheduler=PollScheduler(base_interval=60),
+    )
+    result = await uc.poll_once()
+
+    assert result["created"] == 1
+    assert len(github_repo.batches) == 1
+    reports = {r["repository"]: r for r in result["sources"]}
+    assert reports["o/a"]["mode"] == "batch"
+    assert reports["o/a"]["batch_size"] == 2
+    assert reports["o/b"]["issues"] == 0
+    assert "next_poll_in" in reports["o/b"]
@@ -1,5 +1,9 @@
 import asyncio
+import json
+import time
+
 import pytest
+from app.domain.services import event_bus as event_bus_module
 from app.domain.services.event_bus import EventBus
 
 
@@ -76,3 +80,124 @@ class TestEventBus:
         assert bus.is_active("d1")
         await bus.close("d1")
         assert not bus.is_active("d1")
+
+    @pytest.mark.asyncio
+    async def test_subscribe_frames_yields_encoded_sse_frames(self, bus):
+        await bus.publish("d1", {"type": "assistant", "text": "héllo"})
+
+        frames = []
+        async for frame in bus.subscribe_frames("d1"):
+            frames.append(frame)
+            break
+        assert len(frames) == 1
+        assert frames[0].startswith(b"data: ") and frames[0].endswith(b"\n\n")
+        assert json.loads(frames[0][len(b"data: "):]) == {"type": "assistant", "text": "héllo"}
+
+    @pytest.mark.asyncio
+    async def test_publish_encodes_once_for_all_subscribers(self, bus, monkeypatch):
+        calls = []
+        original = event_bus_module.encode_frame
+
+        def counting_encode(event):
+            calls.append(event)
+            return original(event)
+
+        monkeypatch.setattr(event_bus_module, "encode_frame", counting_encode)
+        subs = [bus.subscribe_frames("d1") for _ in range(5)]
+        pending = [asyncio.create_task(anext(sub)) for sub in subs]
+        await asyncio.sleep(0.01)
+        await bus.publish("d1", {"type": "assistant"})
+        frames = await asyncio.gather(*pending)
+        for sub in subs:
+            await sub.aclose()
+
+        assert len(calls) == 1
+        assert len({id(f) for f in frames}) == 1
+
+
+class TestEventBusMemory:
+    @pytest.mark.asyncio
+    async def test_queries_do_not_create_entries(self):
+        bus = EventBus()
+        assert not bus.is_active("d1")
+        sub = bus.subscribe("d1")
+        task = asyncio.create_task(anext(sub))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        assert bus._subscribers == {}
+        assert bus._buffers == {}
+
+    @pytest.mark.asyncio
+    async def test_budget_evicts_large_tool_results_first(self):
+        big = {"type": "user", "message": {"content": [
+            {"type": "tool_result", "content": "x" * 40_000},
+        ]}}
+        small = {"type": "assistant", "message": {"content": "hi"}}
+        bus = EventBus(max_total_bytes=50_000)
+        await bus.publish("d1", small)
+        await bus.publish("d1", big)
+        await bus.publish("d2", big)
+
+        assert bus.buffered_bytes <= 50_000
+        replay = [f.event for f in bus._buffers["d1"]] + [f.event for f in bus._buffers["d2"]]
+        assert small in replay
+        assert replay.count(big) == 1
+
+    @pytest.mark.asyncio
+    async def test_budget_trims_least_recently_active_buffer(self):
+        event = {"type": "assistant", "message": {"content": "y" * 1000}}
+        bus = EventBus(max_total_bytes=5_000)
+        for _ in range(4):
+            await bus.publish("old", event)
+        for _ in range(4):
+            await bus.publish("new", event)
+
+        assert bus.buffered_bytes <= 5_000
+        assert len(bus._buffers["new"]) == 4
+        assert len(bus._buffers["old"]) < 4
+        assert bus.is_active("old")
+
+    @pytest.mark.asyncio
+    async def test_steady_publishing_at_budget_evicts_incrementally(self):
+        big = {"type": "user", "message": {"content": [
+            {"type": "tool_result", "content": "x" * 40_000},
+        ]}}
+        small = {"type": "assistant", "message": {"content": "y" * 500}}
+        bus = EventBus(max_total_bytes=500_000)
+        for i in range(2_000):
+            await bus.publish(f"d{i % 5}", big if i % 10 == 0 else small)
+
+            assert bus.buffered_bytes <= 500_000
+        frames = [f for buffer in bus._buffers.values() for f in buffer]
+        assert bus.buffered_bytes == sum(len(f.data) for f in frames)
+        # The large-frame index only tracks frames still buffered, in order
+        for delivery_id, large in bus._large.items():
+            buffered = [f for f in bus._buffers[delivery_id] if f.event is big]
+            assert list(large) == buffered
+        # Small frames survive: only large payloads had to go
+        assert sum(f.event is small for f in frames) > 500
+
+    @pytest.mark.asyncio
+    async def test_close_releases_buffered_bytes(self):
+        bus = EventBus()
+        await bus.publish("d1", {"type": "assistant"})
+        assert bus.buffered_bytes > 0
+        await bus.close("d1")
+        assert bus.buffered_bytes == 0
+
+    @pytest.mark.asyncio
+    async def test_sweep_drops_idle_buffers_without_subscribers(self):
+        bus = EventBus(idle_ttl=10)
+        await bus.publish("idle", {"type": "assistant"})
+        await bus.publish("watched", {"type": "assistant"})
+        sub = bus.subscribe("watched")
+        await anext(sub)
+
+        dropped = bus.sweep(now=time.monotonic() + 11)
+
+        assert dropped == 1
+        assert not bus.is_active("idle")
+        assert bus.is_active("watched")
+        await sub.aclose()
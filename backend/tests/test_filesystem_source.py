@@ -82,3 +82,57 @@ class TestCorruptedFile:
         items = repo.list_sources()
         assert len(items) == 1
         assert items[0]["id"] == "good0001"
+
+
+class TestGetSourceByRepo:
+    def test_lookup_by_repo(self, repo):
+        repo.save_source("src00001", _make_source("src00001", "2026-02-20T10:00:00+09:00"))
+
+        result = repo.get_source_by_repo("jakeraft", "jakeops")
+        assert result is not None
+        assert result["id"] == "src00001"
+        assert repo.get_source_by_repo("jakeraft", "other") is None
+
+    def test_lookup_does_not_read_disk_after_first_call(self, repo, monkeypatch):
+        repo.save_source("src00001", _make_source("src00001", "2026-02-20T10:00:00+09:00"))
+        repo.get_source_by_repo("jakeraft", "jakeops")
+
+        monkeypatch.setattr(repo, "list_sources", lambda: pytest.fail("disk scan"))
+        assert repo.get_source_by_repo("jakeraft", "jakeops")["id"] == "src00001"
+
+    def test_save_updates_index(self, repo):
+        data = _make_source("src00001", "2026-02-20T10:00:00+09:00")
+        repo.save_source("src00001", data)
+        repo.get_source_by_repo("jakeraft", "jakeops")
+
+        data["token"] = "ghp_new"
+        repo.save_source("src00001", data)
+        assert repo.get_source_by_repo("jakeraft", "jakeops")["token"] == "ghp_new"
+
+        data["repo"] = "renamed"
+        repo.save_source("src00001", data)
+        assert repo.get_source_by_repo("jakeraft", "jakeops") is None
+        assert repo.get_source_by_repo("jakeraft", "renamed")["id"] == "src00001"
+
+    def test_delete_removes_from_index(self, repo):
+        repo.save_source("src00001", _make_source("src00001", "2026-02-20T10:00:00+09:00"))
+        repo.get_source_by_repo("jakeraft", "jakeops")
+
+        repo.delete_source("src00001")
+        assert repo.get_source_by_repo("jakeraft", "jakeops") is None
+
+    def test_newest_source_wins_for_shared_repo(self, repo):
+        repo.save_source("src00001", _make_source("src00001", "2026-02-20T10:00:00+09:00"))
+        repo.save_source("src00002", _make_source("src00002", "2026-02-21T10:00:00+09:00"))
+        assert repo.get_source_by_repo("jakeraft", "jakeops")["id"] == "src00002"
+
+        repo.save_source("src00003", _make_source("src00003", "2026-02-19T10:00:00+09:00"))
+        assert repo.get_source_by_repo("jakeraft", "jakeops")["id"] == "src00002"
+
+        repo.delete_source("src00002")
+        assert repo.get_source_by_repo("jakeraft", "jakeops")["id"] == "src00001"
+
+    def test_returned_source_is_a_copy(self, repo):
+        repo.save_source("src00001", _make_source("src00001", "2026-02-20T10:00:00+09:00"))
+        repo.get_source_by_repo("jakeraft", "jakeops")["token"] = "mutated"
+        assert repo.get_source_by_repo("jakeraft", "jakeops")["token"] == ""
@@ -186,3 +186,24 @@ def test_raises_on_pr_failure():
                 title="t",
                 body="b",
             )
+
+
+# ── metrics ──────────────────────────────────────────────────────────
+
+
+def test_records_git_operation_durations():
+    from app.adapters.outbound.git_cli import GitCliAdapter
+    from app.metrics import GIT_OPERATION_SECONDS
+
+    adapter = GitCliAdapter()
+    before_ok = GIT_OPERATION_SECONDS.count(operation="clone", status="ok")
+    before_err = GIT_OPERATION_SECONDS.count(operation="pr", status="error")
+
+    with patch("app.adapters.outbound.git_cli.subprocess.run", return_value=_ok_result()):
+        adapter.clone_repo("owner", "repo", "", "/tmp/dest")
+    with patch("app.adapters.outbound.git_cli.subprocess.run", return_value=_fail_result()):
+        with pytest.raises(RuntimeError):
+            adapter.create_draft_pr("owner", "repo", "b", "t", "body")
+
+    assert GIT_OPERATION_SECONDS.count(operation="clone", status="ok") == before_ok + 1
+    assert GIT_OPERATION_SECONDS.count(operation="pr", status="error") == before_err + 1
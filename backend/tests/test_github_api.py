@@ -1,177 +1,472 @@
-from unittest.mock import patch, MagicMock
+import asyncio
+import json
 
 import httpx
 import pytest
 
-from app.adapters.outbound.github_api import GitHubApiAdapter
+from app.adapters.outbound.github_api import GitHubApiAdapter, create_http_client
 
 
-def test_list_open_issues():
-    adapter = GitHubApiAdapter()
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = [
-        {
-            "number": 1,
-            "title": "Bug report",
-            "html_url": "https://github.com/owner/repo/issues/1",
-            "state": "open",
-        },
-        {
-            "number": 2,
-            "title": "Feature request",
-            "html_url": "https://github.com/owner/repo/issues/2",
-            "state": "open",
-        },
-    ]
-    mock_response.raise_for_status = MagicMock()
+def _call(handler, call, **kwargs):
+    """Run ``call(adapter)`` against an adapter whose client is served by ``handler``."""
+
+    async def run():
+        adapter = GitHubApiAdapter(client=httpx.AsyncClient(transport=httpx.MockTransport(handler)), **kwargs)
+        try:
+            return await call(adapter)
+        finally:
+            await adapter.aclose()
+
+    return asyncio.run(run())
+
+
+def _issue_json(number: int, state: str = "open") -> dict:
+    return {
+        "number": number,
+        "title": f"Issue {number}",
+        "html_url": f"https://github.com/o/r/issues/{number}",
+        "state": state,
+    }
+
+
+def test_fetch_open_issues():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json=[
+            {"number": 1, "title": "Bug report", "html_url": "https://github.com/owner/repo/issues/1", "state": "open"},
+            {"number": 2, "title": "Feature request", "html_url": "https://github.com/owner/repo/issues/2",
+             "state": "open"},
+        ])
 
-    with patch("httpx.get", return_value=mock_response) as mock_get:
-        issues = adapter.list_open_issues("owner", "repo", token="fake-token")
+    issues = _call(handler, lambda adapter: adapter.fetch_open_issues("owner", "repo", token="fake-token"))
 
     assert len(issues) == 2
     assert issues[0].number == 1
     assert issues[0].title == "Bug report"
-    mock_get.assert_called_once()
-
-
-def test_list_open_issues_filters_pull_requests():
-    adapter = GitHubApiAdapter()
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = [
-        {
-            "number": 1,
-            "title": "Bug report",
-            "html_url": "https://github.com/owner/repo/issues/1",
-            "state": "open",
-        },
-        {
-            "number": 2,
-            "title": "PR title",
-            "html_url": "https://github.com/owner/repo/pull/2",
-            "state": "open",
-            "pull_request": {"url": "..."},
-        },
-    ]
-    mock_response.raise_for_status = MagicMock()
+    assert len(seen) == 1
 
-    with patch("httpx.get", return_value=mock_response):
-        issues = adapter.list_open_issues("owner", "repo", token="fake-token")
 
-    assert len(issues) == 1
-    assert issues[0].number == 1
+def test_fetch_open_issues_filters_pull_requests():
+    """Goes through the injected client and drops pull requests."""
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json=[
+            {"number": 1, "title": "Bug", "html_url": "https://github.com/o/r/issues/1", "state": "open"},
+            {"number": 2, "title": "PR", "html_url": "https://github.com/o/r/pull/2", "state": "open",
+             "pull_request": {"url": "..."}},
+        ])
+
+    issues = _call(handler, lambda adapter: adapter.fetch_open_issues("o", "r", token="ghp_test"))
 
+    assert [i.number for i in issues] == [1]
+    assert seen[0].url.path == "/repos/o/r/issues"
+    assert seen[0].headers["Authorization"] == "Bearer ghp_test"
 
-def test_list_open_issues_no_token():
+
+def test_fetch_open_issues_no_token():
     """Can fetch issues from a public repo without a token."""
-    adapter = GitHubApiAdapter()
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = [
-        {
-            "number": 1,
-            "title": "Public issue",
-            "html_url": "https://github.com/owner/repo/issues/1",
-            "state": "open",
-        },
-    ]
-    mock_response.raise_for_status = MagicMock()
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json=[_issue_json(1)])
 
-    with patch("httpx.get", return_value=mock_response) as mock_get:
-        issues = adapter.list_open_issues("owner", "repo")
+    issues = _call(handler, lambda adapter: adapter.fetch_open_issues("owner", "repo"))
 
     assert len(issues) == 1
     # Authorization header should not be present
-    call_headers = mock_get.call_args.kwargs.get("headers", {})
-    assert "Authorization" not in call_headers
+    assert "Authorization" not in seen[0].headers
 
 
 def test_get_issue():
     """Get a single issue — includes body."""
-    adapter = GitHubApiAdapter()
-    mock_response = MagicMock()
-    mock_response.status_code = 200
-    mock_response.json.return_value = {
-        "number": 42,
-        "title": "Feature request",
-        "html_url": "https://github.com/o/r/issues/42",
-        "state": "open",
-        "body": "## Requirements\nNeed to add feature",
-    }
-    mock_response.raise_for_status = MagicMock()
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json={
+            "number": 42,
+            "title": "Feature request",
+            "html_url": "https://github.com/o/r/issues/42",
+            "state": "open",
+            "body": "## Requirements\nNeed to add feature",
+        })
 
-    with patch("httpx.get", return_value=mock_response) as mock_get:
-        issue = adapter.get_issue("o", "r", 42, token="ghp_test")
+    issue = _call(handler, lambda adapter: adapter.get_issue("o", "r", 42, token="ghp_test"))
 
     assert issue is not None
     assert issue.number == 42
     assert issue.body == "## Requirements\nNeed to add feature"
-    mock_get.assert_called_once()
+    assert [r.url.path for r in seen] == ["/repos/o/r/issues/42"]
 
 
 def test_get_issue_not_found():
     """Non-existent issue — returns None."""
-    adapter = GitHubApiAdapter()
-    mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "Not Found", request=MagicMock(), response=MagicMock(status_code=404)
-    )
-
-    with patch("httpx.get", return_value=mock_response):
-        issue = adapter.get_issue("o", "r", 999)
+    issue = _call(lambda r: httpx.Response(404), lambda adapter: adapter.get_issue("o", "r", 999))
 
     assert issue is None
 
 
-def test_list_open_issues_not_found_returns_empty():
+def test_fetch_open_issues_not_found_returns_empty():
     """Returns empty list on 404 response."""
-    adapter = GitHubApiAdapter()
-    mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "Not Found", request=MagicMock(), response=MagicMock(status_code=404)
-    )
-
-    with patch("httpx.get", return_value=mock_response):
-        issues = adapter.list_open_issues("owner", "nonexistent")
+    issues = _call(lambda r: httpx.Response(404), lambda adapter: adapter.fetch_open_issues("o", "missing"))
 
     assert issues == []
 
 
-def test_list_open_issues_server_error_raises():
-    """Propagates exception on 500 error."""
-    adapter = GitHubApiAdapter()
-    mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "Internal Server Error", request=MagicMock(), response=MagicMock(status_code=500)
-    )
-
-    with patch("httpx.get", return_value=mock_response):
-        with pytest.raises(httpx.HTTPStatusError):
-            adapter.list_open_issues("owner", "repo")
+def test_fetch_open_issues_server_error_raises():
+    """Propagates exception on 500 error once retries are exhausted."""
+    with pytest.raises(httpx.HTTPStatusError):
+        _call(lambda r: httpx.Response(500), lambda adapter: adapter.fetch_open_issues("o", "r"), max_retries=0)
 
 
 def test_get_issue_server_error_raises():
-    """Propagates exception on 500 error."""
-    adapter = GitHubApiAdapter()
-    mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "Internal Server Error", request=MagicMock(), response=MagicMock(status_code=500)
-    )
-
-    with patch("httpx.get", return_value=mock_response):
-        with pytest.raises(httpx.HTTPStatusError):
-            adapter.get_issue("o", "r", 42)
+    """Propagates exception on 500 error once retries are exhausted."""
+    with pytest.raises(httpx.HTTPStatusError):
+        _call(lambda r: httpx.Response(500), lambda adapter: adapter.get_issue("o", "r", 42), max_retries=0)
 
 
-def test_list_open_issues_rate_limit_raises():
+def test_fetch_open_issues_rate_limit_raises():
     """Propagates exception on 403 Rate Limit."""
-    adapter = GitHubApiAdapter()
-    mock_response = MagicMock()
-    mock_response.raise_for_status.side_effect = httpx.HTTPStatusError(
-        "Forbidden", request=MagicMock(), response=MagicMock(status_code=403)
-    )
-
-    with patch("httpx.get", return_value=mock_response):
-        with pytest.raises(httpx.HTTPStatusError):
-            adapter.list_open_issues("owner", "repo")
+    with pytest.raises(httpx.HTTPStatusError):
+        _call(lambda r: httpx.Response(403), lambda adapter: adapter.fetch_open_issues("o", "r"))
+
+
+def test_fetch_open_issues_revalidates_with_etag():
+    """Second call sends If-None-Match; a 304 reuses the cached listing."""
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"abc"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": '"abc"'}, json=[
+            {"number": 7, "title": "Bug", "html_url": "https://github.com/o/r/issues/7", "state": "open"},
+        ])
+
+    async def calls(adapter):
+        return (
+            await adapter.fetch_open_issues("o", "r"),
+            await adapter.fetch_open_issues("o", "r"),
+            await adapter.fetch_open_issues("o", "r", if_changed=True),
+        )
+
+    first, second, unchanged = _call(handler, calls)
+
+    assert [i.number for i in first] == [7]
+    assert [i.number for i in second] == [7]
+    assert unchanged is None
+    assert "If-None-Match" not in requests[0].headers
+    assert requests[1].headers["If-None-Match"] == '"abc"'
+
+
+def test_validators_are_not_shared_between_tokens():
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.headers.get("If-None-Match") == '"abc"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"ETag": '"abc"'}, json=[])
+
+    async def calls(adapter):
+        await adapter.fetch_open_issues("o", "r", token="token-a")
+        await adapter.fetch_open_issues("o", "r", token="token-b")
+        await adapter.fetch_open_issues("o", "r", token="token-a")
+
+    _call(handler, calls)
+
+    assert "If-None-Match" not in requests[1].headers
+    assert requests[2].headers["If-None-Match"] == '"abc"'
+
+
+def test_fetch_open_issues_returns_none_when_not_modified():
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.headers.get("If-Modified-Since"):
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"Last-Modified": "Mon, 19 Oct 2026 00:00:00 GMT"}, json=[])
+
+    async def calls(adapter):
+        first = await adapter.fetch_open_issues("o", "r", if_changed=True)
+        second = await adapter.fetch_open_issues("o", "r", if_changed=True)
+        return first, second
+
+    first, second = _call(handler, calls)
+    assert first == []
+    assert second is None
+
+
+def test_fetch_open_issues_follows_link_pagination():
+    """Issues beyond the first page are fetched via the Link next URL."""
+    base = "https://api.github.com/repos/o/r/issues"
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params.get("page") == "2":
+            return httpx.Response(200, json=[_issue_json(101)])
+        return httpx.Response(
+            200,
+            headers={"Link": f'<{base}?state=open&per_page=100&page=2>; rel="next"'},
+            json=[_issue_json(n) for n in range(1, 101)],
+        )
+
+    issues = _call(handler, lambda adapter: adapter.fetch_open_issues("o", "r"))
+
+    assert len(issues) == 101
+    assert issues[-1].number == 101
+
+
+def test_fetch_open_issues_changed_when_any_page_changes():
+    """Only a 304 on every page counts as unchanged."""
+    base = "https://api.github.com/repos/o/r/issues"
+    page2_version = ["v1"]
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        if request.url.params.get("page") == "2":
+            etag = f'"p2-{page2_version[0]}"'
+            if request.headers.get("If-None-Match") == etag:
+                return httpx.Response(304)
+            return httpx.Response(200, headers={"ETag": etag}, json=[_issue_json(101)])
+        if request.headers.get("If-None-Match") == '"p1"':
+            return httpx.Response(304)
+        return httpx.Response(
+            200,
+            headers={"ETag": '"p1"', "Link": f'<{base}?state=open&per_page=100&page=2>; rel="next"'},
+            json=[_issue_json(1)],
+        )
+
+    async def calls(adapter):
+        await adapter.fetch_open_issues("o", "r", if_changed=True)
+        unchanged = await adapter.fetch_open_issues("o", "r", if_changed=True)
+        page2_version[0] = "v2"
+        changed = await adapter.fetch_open_issues("o", "r", if_changed=True)
+        return unchanged, changed
+
+    unchanged, changed = _call(handler, calls)
+
+    assert unchanged is None
+    assert [i.number for i in changed] == [1, 101]
+
+
+def test_fetch_issues_since_requests_all_states():
+    seen = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen.append(request)
+        return httpx.Response(200, json=[_issue_json(1, "closed"), _issue_json(2)])
+
+    issues = _call(handler, lambda adapter: adapter.fetch_issues_since("o", "r", "2026-10-19T00:00:00Z"))
+
+    assert [(i.number, i.state) for i in issues] == [(1, "closed"), (2, "open")]
+    assert seen[0].url.params["state"] == "all"
+    assert seen[0].url.params["since"] == "2026-10-19T00:00:00Z"
+    assert "If-None-Match" not in seen[0].headers
+
+
+def test_rate_limit_is_tracked_per_token():
+    def handler(request: httpx.Request) -> httpx.Response:
+        remaining = "4999" if request.headers.get("Authorization") else "59"
+        return httpx.Response(
+            200,
+            headers={"X-RateLimit-Remaining": remaining, "X-RateLimit-Reset": "1800000000", "X-RateLimit-Limit": "5000"},
+            json=[],
+        )
+
+    async def calls(adapter):
+        await adapter.fetch_open_issues("o", "r", token="ghp_a")
+        await adapter.fetch_open_issues("o", "r2")
+        return adapter
+
+    adapter = _call(handler, calls)
+
+    assert adapter.rate_limit("ghp_a").remaining == 4999
+    assert adapter.rate_limit("ghp_a").reset_at == 1800000000
+    assert adapter.rate_limit("").remaining == 59
+    assert adapter.rate_limit("ghp_other") is None
+
+
+def _flaky_handler(responses: list[httpx.Response]):
+    calls = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return responses[min(len(calls), len(responses)) - 1]
+
+    return handler, calls
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr("app.adapters.outbound.github_api.asyncio.sleep", fake_sleep)
+    return delays
+
+
+def test_retries_server_errors(sleeps):
+    handler, calls = _flaky_handler([
+        httpx.Response(502),
+        httpx.Response(503),
+        httpx.Response(200, json=[_issue_json(1)]),
+    ])
+
+    issues = _call(handler, lambda adapter: adapter.fetch_open_issues("o", "r"))
+
+    assert [i.number for i in issues] == [1]
+    assert len(calls) == 3
+    assert sleeps == [0.5, 1.0]
+
+
+def test_retries_give_up_after_max_retries(sleeps):
+    handler, calls = _flaky_handler([httpx.Response(500)])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _call(handler, lambda adapter: adapter.fetch_open_issues("o", "r"), max_retries=2)
+    assert len(calls) == 3
+
+
+def test_honours_secondary_rate_limit_retry_after(sleeps):
+    handler, calls = _flaky_handler([
+        httpx.Response(403, headers={"Retry-After": "7"}, json={"message": "You have exceeded a secondary rate limit"}),
+        httpx.Response(200, json=[]),
+    ])
+
+    assert _call(handler, lambda adapter: adapter.fetch_open_issues("o", "r")) == []
+    assert sleeps == [7.0]
+
+
+def test_exhausted_primary_rate_limit_is_not_retried(sleeps):
+    handler, calls = _flaky_handler([
+        httpx.Response(403, headers={"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "1800000000"}),
+    ])
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _call(handler, lambda adapter: adapter.fetch_open_issues("o", "r"))
+    assert len(calls) == 1
+    assert sleeps == []
+
+
+def test_create_http_client_applies_pool_settings():
+    client = create_http_client(max_connections=5, max_keepalive_connections=2, http2=False)
+    try:
+        assert isinstance(client, httpx.AsyncClient)
+    finally:
+        asyncio.run(client.aclose())
+
+
+def _graphql_stub(repos: dict[str, list[list[int]] | str | None]):
+    """Local GraphQL stub serving recorded pages of open issues per repository.
+
+    ``repos`` maps ``"owner/repo"`` to its pages of issue numbers, None for a
+    repository that does not exist, or the GraphQL error type it fails with.
+    """
+    queries = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        assert request.url.path == "/graphql"
+        body = json.loads(request.content)
+        variables = body["variables"]
+        queries.append(variables)
+        data, errors = {}, []
+        i = 0
+        while f"o{i}" in variables:
+            full_repo = f"{variables[f'o{i}']}/{variables[f'n{i}']}"
+            pages = repos[full_repo]
+            if pages is None or isinstance(pages, str):
+                data[f"r{i}"] = None
+                errors.append({"type": pages or "NOT_FOUND", "path": [f"r{i}"], "message": full_repo})
+            else:
+                page = int(variables[f"c{i}"] or 0)
+                data[f"r{i}"] = {"issues": {
+                    "pageInfo": {"hasNextPage": page + 1 < len(pages), "endCursor": str(page + 1)},
+                    "nodes": [
+                        {"number": n, "title": f"Issue {n}", "url": f"https://github.com/{full_repo}/issues/{n}",
+                         "state": "OPEN"}
+                        for n in pages[page]
+                    ],
+                }}
+            i += 1
+        payload = {"data": data, "errors": errors} if errors else {"data": data}
+        return httpx.Response(200, json=payload, headers={
+            "X-RateLimit-Remaining": "4990", "X-RateLimit-Reset": "1700000000",
+        })
+
+    return handler, queries
+
+
+def test_fetch_open_issues_batch_uses_one_query_per_page_round():
+    handler, queries = _graphql_stub({
+        "o/a": [[1, 2], [3]],
+        "o/b": [[10]],
+        "o/gone": None,
+    })
+
+    async def calls(adapter):
+        listings = await adapter.fetch_open_issues_batch([("o", "a"), ("o", "b"), ("o", "gone")], token="tok")
+        return adapter, listings
+
+    adapter, listings = _call(handler, calls)
+
+    assert {k: [i.number for i in v] for k, v in listings.items()} == {
+        "o/a": [1, 2, 3], "o/b": [10], "o/gone": [],
+    }
+    assert listings["o/a"][0].html_url == "https://github.com/o/a/issues/1"
+    assert listings["o/a"][0].state == "open"
+    # Second round only asks for the repository that still has pages
+    assert len(queries) == 2
+    assert queries[1] == {"o0": "o", "n0": "a", "c0": "1"}
+    assert adapter.rate_limit("tok", "graphql").remaining == 4990
+    # GraphQL points are a separate budget from REST requests
+    assert adapter.rate_limit("tok") is None
+
+
+def test_fetch_open_issues_batch_omits_repositories_it_cannot_read():
+    handler, _ = _graphql_stub({"o/a": [[1]], "o/sso": "FORBIDDEN", "o/gone": None})
+
+    listings = _call(handler, lambda adapter: adapter.fetch_open_issues_batch(
+        [("o", "a"), ("o", "sso"), ("o", "gone")], token="tok",
+    ))
+
+    # Not found means no open issues; forbidden says nothing about them
+    assert {k: [i.number for i in v] for k, v in listings.items()} == {"o/a": [1], "o/gone": []}
+
+
+def test_fetch_open_issues_batch_splits_large_fleets(monkeypatch):
+    monkeypatch.setattr("app.adapters.outbound.github_api.GRAPHQL_BATCH_SIZE", 2)
+    handler, queries = _graphql_stub({f"o/r{n}": [[n]] for n in range(5)})
+
+    listings = _call(handler, lambda adapter: adapter.fetch_open_issues_batch(
+        [("o", f"r{n}") for n in range(5)], token="tok",
+    ))
+
+    assert [len(q) // 3 for q in queries] == [2, 2, 1]
+    assert [i.number for i in listings["o/r4"]] == [4]
+
+
+def test_fetch_open_issues_batch_if_changed_reports_unchanged_as_none():
+    repos = {"o/a": [[1]], "o/b": [[2]]}
+    handler, _ = _graphql_stub(repos)
+
+    async def calls(adapter):
+        await adapter.fetch_open_issues_batch([("o", "a"), ("o", "b")], token="tok", if_changed=True)
+        repos["o/b"] = [[2, 3]]
+        return await adapter.fetch_open_issues_batch([("o", "a"), ("o", "b")], token="tok", if_changed=True)
+
+    listings = _call(handler, calls)
+
+    assert listings["o/a"] is None
+    assert [i.number for i in listings["o/b"]] == [2, 3]
+
+
+def test_fetch_open_issues_batch_raises_on_query_error():
+    def handler(request: httpx.Request) -> httpx.Response:
+        return httpx.Response(200, json={"errors": [{"message": "Bad credentials"}]})
+
+    with pytest.raises(RuntimeError, match="Bad credentials"):
+        _call(handler, lambda adapter: adapter.fetch_open_issues_batch([("o", "a")], token="tok"))
@@ -0,0 +1,48 @@
+import json
+
+import pytest
+
+from app import json_codec
+
+CODECS = json_codec.available_codecs()
+
+SAMPLE = {
+    "type": "assistant",
+    "message": {"content": [{"type": "text", "text": "héllo 🚀"}], "usage": {"input_tokens": 12}},
+    "nested": [1, 2.5, None, True, {"k": []}],
+}
+
+
+@pytest.mark.parametrize("name", CODECS)
+class TestCodecs:
+    def test_round_trip(self, name):
+        codec = json_codec.get_codec(name)
+        assert codec.loads(codec.dumps(SAMPLE)) == SAMPLE
+        assert codec.loads(codec.dumps(SAMPLE).decode()) == SAMPLE
+
+    def test_dumps_is_compact_utf8(self, name):
+        out = json_codec.get_codec(name).dumps({"a": "é"})
+        assert out == '{"a":"é"}'.encode()
+
+    def test_pretty_matches_stdlib_layout(self, name):
+        out = json_codec.get_codec(name).dumps_pretty(SAMPLE)
+        assert out.decode() == json.dumps(SAMPLE, ensure_ascii=False, indent=2)
+
+    def test_decode_error(self, name):
+        codec = json_codec.get_codec(name)
+        with pytest.raises(codec.decode_error):
+            codec.loads(b"{not json")
+
+
+def test_stdlib_is_always_available():
+    assert "json" in CODECS
+    assert json_codec.get_codec("json").name == "json"
+
+
+def test_auto_prefers_fastest_available():
+    assert json_codec.get_codec("auto").name == CODECS[0]
+
+
+def test_unknown_codec_rejected():
+    with pytest.raises(ValueError, match="Unknown JSON codec"):
+        json_codec.get_codec("yaml")
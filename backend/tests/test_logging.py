@@ -0,0 +1,112 @@
+import json
+import logging
+import queue
+import threading
+
+import httpx
+import pytest
+import structlog
+from fastapi import FastAPI
+
+from app import logging as app_logging
+from app.middleware.logging import RequestLoggingMiddleware
+
+
+@pytest.fixture
+def restore_logging():
+    config = structlog.get_config()
+    root = logging.getLogger()
+    handlers, level = list(root.handlers), root.level
+    yield
+    app_logging.stop_log_listener()
+    root.handlers[:] = handlers
+    root.setLevel(level)
+    structlog.configure(**config)
+
+
+class TestRateLimiter:
+    def test_drops_warnings_beyond_limit_and_reports_suppressed(self, monkeypatch):
+        clock = [100.0]
+        monkeypatch.setattr(app_logging.time, "monotonic", lambda: clock[0])
+        limiter = app_logging.RateLimiter(limit=2, window=10)
+        before = app_logging.LOG_RECORDS_DROPPED.value(reason="rate_limited")
+
+        passed = 0
+        for _ in range(5):
+            try:
+                limiter(None, "warning", {"event": "skipping non-JSON line"})
+                passed += 1
+            except structlog.DropEvent:
+                pass
+        clock[0] += 10
+        event = limiter(None, "warning", {"event": "skipping non-JSON line"})
+
+        assert passed == 2
+        assert event["suppressed"] == 3
+        assert app_logging.LOG_RECORDS_DROPPED.value(reason="rate_limited") == before + 3
+
+    def test_other_levels_and_events_pass(self):
+        limiter = app_logging.RateLimiter(limit=1, window=60)
+        limiter(None, "warning", {"event": "a"})
+
+        assert limiter(None, "warning", {"event": "b"}) == {"event": "b"}
+        for _ in range(3):
+            assert limiter(None, "error", {"event": "a"}) == {"event": "a"}
+            assert limiter(None, "info", {"event": "a"}) == {"event": "a"}
+
+
+class TestQueueLogging:
+    def test_renders_json_on_listener_thread(self, monkeypatch, capsys, restore_logging):
+        monkeypatch.setenv("LOG_QUEUE", "true")
+        monkeypatch.setenv("LOG_FORMAT", "json")
+        app_logging.configure_logging()
+        render_threads = []
+        handler = app_logging._listener.handlers[0]
+        monkeypatch.setattr(handler, "emit", _recording_emit(handler.emit, render_threads))
+
+        structlog.get_logger("queued").info("queued event", delivery_id="d1")
+        logging.getLogger("stdlib").warning("foreign %s", "record")
+        app_logging.stop_log_listener()
+
+        lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+        assert {"event": "queued event", "delivery_id": "d1"}.items() <= lines[0].items()
+        assert lines[1]["event"] == "foreign record"
+        assert render_threads and threading.main_thread() not in render_threads
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        handler = app_logging._NonBlockingQueueHandler(queue.Queue(maxsize=1))
+        before = app_logging.LOG_RECORDS_DROPPED.value(reason="queue_full")
+        record = logging.LogRecord("x", logging.INFO, __file__, 1, "msg", None, None)
+
+        handler.handle(record)
+        handler.handle(record)
+
+        assert handler.queue.qsize() == 1
+        assert app_logging.LOG_RECORDS_DROPPED.value(reason="queue_full") == before + 1
+
+
+def _recording_emit(emit, threads):
+    def wrapper(record):
+        threads.append(threading.current_thread())
+        emit(record)
+    return wrapper
+
+
+class TestRequestSampling:
+    @pytest.mark.asyncio
+    async def test_unsampled_requests_still_log_errors(self):
+        app = FastAPI()
+        app.add_middleware(RequestLoggingMiddleware, sample_rate=0.0)
+
+        @app.get("/ok")
+        def ok():
+            return {}
+
+        transport = httpx.ASGITransport(app=app)
+        with structlog.testing.capture_logs() as logs:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                await client.get("/ok")
+                await client.get("/missing")
+
+        requests = [log for log in logs if log["event"] == "request"]
+        assert [r["path"] for r in requests] == ["/missing"]
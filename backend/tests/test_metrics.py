@@ -0,0 +1,138 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.adapters.inbound import metrics as metrics_api
+from app.domain.services.event_bus import EventBus
+from app.metrics import REGISTRY, Registry, _Metric, instrument_event_bus
+from app.middleware.logging import RequestLoggingMiddleware
+
+
+class TestRegistry:
+    def test_counter_renders_labelled_samples(self):
+        registry = Registry()
+        runs = registry.counter("runs_total", "Runs.", ("phase",))
+        runs.inc(phase="plan")
+        runs.inc(2, phase="plan")
+
+        text = registry.render()
+
+        assert "# TYPE runs_total counter" in text
+        assert 'runs_total{phase="plan"} 3' in text
+
+    def test_counter_rejects_unknown_labels_and_decrements(self):
+        runs = Registry().counter("runs_total", "Runs.", ("phase",))
+
+        with pytest.raises(ValueError):
+            runs.inc(repo="x")
+        with pytest.raises(ValueError):
+            runs.inc(-1, phase="plan")
+
+    def test_histogram_buckets_are_cumulative(self):
+        registry = Registry()
+        latency = registry.histogram("latency_seconds", "Latency.", buckets=(0.1, 1))
+        for value in (0.05, 0.1, 0.5, 5):
+            latency.observe(value)
+
+        lines = registry.render().splitlines()
+
+        assert 'latency_seconds_bucket{le="0.1"} 2' in lines
+        assert 'latency_seconds_bucket{le="1"} 3' in lines
+        assert 'latency_seconds_bucket{le="+Inf"} 4' in lines
+        assert "latency_seconds_count 4" in lines
+        assert "latency_seconds_sum 5.65" in lines
+
+    def test_label_values_are_escaped(self):
+        registry = Registry()
+        registry.counter("c_total", "C.", ("path",)).inc(path='a"b\\c')
+
+        assert 'c_total{path="a\\"b\\\\c"} 1' in registry.render()
+
+    def test_duplicate_names_are_rejected(self):
+        registry = Registry()
+        registry.gauge("g", "G.")
+        with pytest.raises(ValueError):
+            registry.counter("g", "G.")
+
+    def test_gauge_function_is_read_at_scrape_time(self):
+        registry = Registry()
+        value = [1]
+        registry.gauge("g", "G.").set_function(lambda: value[0])
+        value[0] = 7
+
+        assert "g 7" in registry.render().splitlines()
+
+    def test_metric_types_must_implement_samples(self):
+        class Incomplete(_Metric):
+            type_name = "untyped"
+
+        with pytest.raises(TypeError):
+            Incomplete("x", "X.")
+
+
+class TestEventBusGauges:
+    @pytest.mark.asyncio
+    async def test_stats_report_queue_depth(self):
+        bus = EventBus()
+        await bus.publish("d1", {"type": "assistant"})
+        sub = bus.subscribe("d1")
+        await anext(sub)
+        await bus.publish("d1", {"type": "assistant"})
+        await bus.publish("d1", {"type": "assistant"})
+
+        stats = bus.stats()
+
+        assert stats["buffers"] == 1
+        assert stats["subscribers"] == 1
+        assert stats["queue_depth"] == stats["max_queue_depth"] == 2
+        await sub.aclose()
+
+    @pytest.mark.asyncio
+    async def test_scrape_reads_stats_once(self):
+        class CountingBus(EventBus):
+            calls = 0
+
+            def stats(self):
+                CountingBus.calls += 1
+                return super().stats()
+
+        bus = CountingBus()
+        instrument_event_bus(bus)
+        await bus.publish("d1", {"type": "assistant"})
+        sub = bus.subscribe("d1")
+        await anext(sub)
+        before = CountingBus.calls
+
+        text = REGISTRY.render()
+
+        assert CountingBus.calls == before + 1
+        assert "jakeops_event_bus_buffers 1" in text.splitlines()
+        assert "jakeops_event_bus_subscribers 1" in text.splitlines()
+        await sub.aclose()
+
+
+class TestMetricsEndpoint:
+    @pytest.mark.asyncio
+    async def test_exposes_request_latency_by_route_template(self):
+        app = FastAPI()
+        app.add_middleware(RequestLoggingMiddleware)
+        app.include_router(metrics_api.router)
+
+        @app.get("/api/items/{item_id}")
+        def get_item(item_id: str):
+            return {"id": item_id}
+
+        instrument_event_bus(EventBus())
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            await client.get("/api/items/abc")
+            response = await client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert (
+            'jakeops_http_request_duration_seconds_count{method="GET",route="/api/items/{item_id}",status="200"}'
+            in response.text
+        )
+        assert "/api/items/abc" not in response.text
+        assert "jakeops_event_bus_subscribers 0" in response.text
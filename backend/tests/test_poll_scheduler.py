@@ -0,0 +1,68 @@
+from app.domain.services.poll_scheduler import PollScheduler
+
+
+def test_unseen_sources_are_due_immediately():
+    scheduler = PollScheduler(base_interval=60)
+    assert scheduler.due(["s1", "s2"], now=0) == ["s1", "s2"]
+
+
+def test_changed_source_speeds_up_and_quiet_source_backs_off():
+    scheduler = PollScheduler(base_interval=60, min_interval=15, max_interval=900)
+    scheduler.record("hot", "t", changed=True, now=0)
+    scheduler.record("quiet", "t", changed=False, now=0)
+
+    assert scheduler.interval("hot") == 30
+    assert scheduler.interval("quiet") == 90
+    assert scheduler.due(["hot", "quiet"], now=30) == ["hot"]
+
+
+def test_intervals_are_clamped():
+    scheduler = PollScheduler(base_interval=60, min_interval=15, max_interval=120)
+    for i in range(10):
+        scheduler.record("hot", "t", changed=True, now=i)
+        scheduler.record("quiet", "t", changed=False, now=i)
+
+    assert scheduler.interval("hot") == 15
+    assert scheduler.interval("quiet") == 120
+
+
+def test_shared_token_budget_stretches_intervals():
+    scheduler = PollScheduler(base_interval=60, min_interval=60, max_interval=60)
+    # 10 sources on one token need 10 * 3600/60 = 600 polls before reset,
+    # but only 100 requests remain (80 usable after the reserve).
+    for i in range(10):
+        next_at = scheduler.record(f"s{i}", "t", changed=False, now=0, remaining=100, reset_in=3600)
+
+    assert next_at == 60 * 600 / 80
+
+
+def test_other_tokens_are_not_throttled():
+    scheduler = PollScheduler(base_interval=60, min_interval=60, max_interval=60)
+    scheduler.record("a", "t1", changed=False, now=0, remaining=1, reset_in=3600)
+    next_at = scheduler.record("b", "t2", changed=False, now=0, remaining=5000, reset_in=3600)
+
+    assert next_at == 60
+
+
+def test_exhausted_budget_waits_for_reset():
+    scheduler = PollScheduler(base_interval=60)
+    next_at = scheduler.record("s1", "t", changed=True, now=0, remaining=0, reset_in=600)
+
+    assert next_at == 600
+
+
+def test_removed_sources_are_forgotten():
+    scheduler = PollScheduler(base_interval=60)
+    scheduler.record("s1", "t", changed=False, now=0)
+    scheduler.due(["s2"], now=0)
+
+    assert scheduler.delay(now=0) == 60
+    assert scheduler.interval("s1") == 60
+
+
+def test_delay_is_capped_at_base_interval():
+    scheduler = PollScheduler(base_interval=60, max_interval=900)
+    for i in range(5):
+        scheduler.record("s1", "t", changed=False, now=0)
+
+    assert scheduler.delay(now=0) == 60
@@ -0,0 +1,245 @@
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+import pytest
+import structlog
+from fastapi import FastAPI
+
+from app import profiling
+from app.adapters.inbound import admin
+from app.metrics import EVENT_LOOP_BLOCKED_SECONDS, EVENT_LOOP_BLOCKS, EVENT_LOOP_LAG_SECONDS
+from app.middleware.logging import RequestLoggingMiddleware
+
+TOKEN = "t0ken"
+
+
+def _busy_wait(seconds: float) -> None:
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def _make_app(token: str = TOKEN) -> FastAPI:
+    app = FastAPI()
+    app.add_middleware(RequestLoggingMiddleware)
+    app.include_router(admin.router, prefix="/api")
+    app.state.admin_token = token
+
+    @app.get("/slow")
+    async def slow():
+        _busy_wait(0.05)
+        return {}
+
+    return app
+
+
+async def _get(app: FastAPI, path: str, **kwargs) -> httpx.Response:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.get(path, **kwargs)
+
+
+class TestStackSampler:
+    def test_samples_other_threads_as_collapsed_stacks(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=stop.wait, name="waiter")
+        worker.start()
+        try:
+            sampler = profiling.StackSampler(interval=0.001).start()
+            time.sleep(0.05)
+            counts = sampler.stop()
+        finally:
+            stop.set()
+            worker.join()
+
+        assert sampler.samples > 0
+        waiter = [stack for stack in counts if stack.startswith("waiter;")]
+        assert waiter
+        assert "wait (" in waiter[0]
+        assert not any(stack.startswith("jakeops-profiler") for stack in counts)
+
+    def test_render_collapsed_is_one_line_per_stack(self):
+        text = profiling.render_collapsed({"main;b (x.py:2)": 2, "main;a (x.py:1)": 3})
+
+        assert text == "main;a (x.py:1) 3\nmain;b (x.py:2) 2\n"
+
+    def test_rejects_samplers_beyond_the_limit(self):
+        samplers = [profiling.StackSampler().start() for _ in range(profiling.MAX_ACTIVE_SAMPLERS)]
+        try:
+            with pytest.raises(profiling.ProfilerBusyError):
+                profiling.StackSampler().start()
+        finally:
+            for sampler in samplers:
+                sampler.stop()
+        profiling.StackSampler().start().stop()
+
+
+class TestProfileEndpoint:
+    @pytest.mark.asyncio
+    async def test_requires_admin_token(self):
+        assert (await _get(_make_app(""), "/api/admin/profile")).status_code == 503
+        assert (await _get(_make_app(), "/api/admin/profile")).status_code == 401
+        wrong = await _get(_make_app(), "/api/admin/profile", headers={"X-Admin-Token": "nope"})
+        assert wrong.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_non_ascii_token_is_rejected_not_an_error(self):
+        headers = {"X-Admin-Token": "s\xe9cret".encode("latin-1")}
+
+        response = await _get(_make_app(), "/api/admin/profile", headers=headers)
+
+        assert response.status_code == 401
+
+    @pytest.mark.asyncio
+    async def test_accepts_non_ascii_configured_token(self):
+        headers = {"X-Admin-Token": "s\xe9cret".encode()}
+
+        response = await _get(
+            _make_app("s\xe9cret"), "/api/admin/profile", params={"seconds": 0.01}, headers=headers,
+        )
+
+        assert response.status_code == 200
+
+    @pytest.mark.asyncio
+    async def test_returns_collapsed_stacks(self):
+        response = await _get(
+            _make_app(), "/api/admin/profile",
+            params={"seconds": 0.05, "interval_ms": 1},
+            headers={"X-Admin-Token": TOKEN},
+        )
+
+        assert response.status_code == 200
+        lines = response.text.splitlines()
+        assert lines
+        stack, count = lines[0].rsplit(" ", 1)
+        assert int(count) > 0 and ";" in stack
+
+    @pytest.mark.asyncio
+    async def test_caps_profile_duration(self):
+        response = await _get(
+            _make_app(), "/api/admin/profile",
+            params={"seconds": profiling.MAX_PROFILE_SECONDS + 1},
+            headers={"X-Admin-Token": TOKEN},
+        )
+
+        assert response.status_code == 422
+
+
+class TestRequestProfiling:
+    @pytest.mark.asyncio
+    async def test_profile_header_captures_the_request(self):
+        app = _make_app()
+        headers = {"X-Profile": "1", "X-Admin-Token": TOKEN}
+
+        response = await _get(app, "/slow", headers=headers)
+
+        profile_id = response.headers["x-profile-id"]
+        profile = await _get(app, f"/api/admin/profiles/{profile_id}", headers={"X-Admin-Token": TOKEN})
+        assert profile.status_code == 200
+        assert "_busy_wait (" in profile.text
+
+    @pytest.mark.asyncio
+    async def test_profile_header_is_ignored_without_admin_token(self):
+        response = await _get(_make_app(), "/slow", headers={"X-Profile": "1"})
+
+        assert "x-profile-id" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_non_ascii_token_does_not_break_the_request(self):
+        headers = {"X-Profile": "1", "X-Admin-Token": "s\xe9cret".encode("latin-1")}
+
+        response = await _get(_make_app(), "/slow", headers=headers)
+
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+
+    @pytest.mark.asyncio
+    async def test_unknown_profile_is_404(self):
+        response = await _get(_make_app(), "/api/admin/profiles/nope", headers={"X-Admin-Token": TOKEN})
+
+        assert response.status_code == 404
+
+
+class TestLoopLagMonitor:
+    @pytest.mark.asyncio
+    async def test_logs_when_loop_is_blocked(self):
+        before = EVENT_LOOP_LAG_SECONDS.count()
+        with structlog.testing.capture_logs() as logs:
+            task = asyncio.create_task(profiling.monitor_loop_lag(threshold_ms=20, interval=0.01))
+            await asyncio.sleep(0)
+            _busy_wait(0.05)
+            await asyncio.sleep(0.02)
+            task.cancel()
+
+        blocked = [log for log in logs if log["event"] == "event loop blocked"]
+        assert blocked and blocked[0]["lag_ms"] >= 20
+        assert EVENT_LOOP_LAG_SECONDS.count() > before
+
+    @pytest.mark.asyncio
+    async def test_leaves_the_warning_to_the_watchdog(self):
+        before = EVENT_LOOP_LAG_SECONDS.count()
+        with structlog.testing.capture_logs() as logs:
+            task = asyncio.create_task(profiling.monitor_loop_lag(threshold_ms=20, interval=0.01, warn=False))
+            await asyncio.sleep(0)
+            _busy_wait(0.05)
+            await asyncio.sleep(0.02)
+            task.cancel()
+
+        assert not [log for log in logs if log["event"] == "event loop blocked"]
+        assert EVENT_LOOP_LAG_SECONDS.count() > before
+
+
+def _blocking_sync_call(seconds: float) -> None:
+    # Stands in for a synchronous adapter call made from a coroutine
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+class TestLoopWatchdog:
+    @pytest.mark.asyncio
+    async def test_attributes_stall_to_call_site(self):
+        watchdog = profiling.LoopWatchdog(
+            asyncio.get_running_loop(), threshold_ms=20, interval=0.005,
+            roots=[str(Path(__file__).parent)],
+        )
+        with structlog.testing.capture_logs() as logs:
+            watchdog.start()
+            try:
+                await asyncio.sleep(0.02)
+                _blocking_sync_call(0.1)
+                await asyncio.sleep(0.05)
+            finally:
+                watchdog.stop()
+
+        reports = [log for log in logs if log["event"] == "blocking call detected"]
+        assert len(reports) == 1
+        site = reports[0]["call_site"]
+        assert site.endswith("test_profiling.py:_blocking_sync_call")
+        assert reports[0]["blocked_ms"] >= 20
+        assert reports[0]["stack"][-1].startswith("_blocking_sync_call (")
+        assert EVENT_LOOP_BLOCKS.value(call_site=site) >= 1
+        assert EVENT_LOOP_BLOCKED_SECONDS.value(call_site=site) >= 0.02
+
+    @pytest.mark.asyncio
+    async def test_responsive_loop_is_not_reported(self):
+        watchdog = profiling.LoopWatchdog(asyncio.get_running_loop(), threshold_ms=50, interval=0.005)
+        with structlog.testing.capture_logs() as logs:
+            watchdog.start()
+            await asyncio.sleep(0.05)
+            watchdog.stop()
+
+        assert not [log for log in logs if log["event"] == "blocking call detected"]
+
+    def test_call_site_falls_back_to_innermost_frame(self):
+        loop = asyncio.new_event_loop()
+        watchdog = profiling.LoopWatchdog(loop, roots=["/nonexistent"])
+
+        site = watchdog.call_site(sys._getframe())
+        loop.close()
+
+        assert site.endswith(":TestLoopWatchdog.test_call_site_falls_back_to_innermost_frame")
@@ -0,0 +1,35 @@
+from app.domain.services.run_timings import summarize_timings
+
+
+def _delivery(repository: str, *timings: dict | None) -> dict:
+    return {
+        "repository": repository,
+        "runs": [{"id": f"r{i}", "timings": t} for i, t in enumerate(timings)],
+    }
+
+
+def test_groups_steps_by_repository():
+    summary = summarize_timings([
+        _delivery("a/one", {"clone_ms": 100.0, "agent_ms": 900.0}),
+        _delivery("a/one", {"clone_ms": 300.0, "agent_ms": 700.0, "pr_ms": 1000.0}),
+        _delivery("b/two", {"clone_ms": 50.0}),
+    ])
+
+    one = summary["a/one"]
+    assert one["runs"] == 2
+    assert one["steps"]["clone_ms"] == {
+        "count": 2, "mean_ms": 200.0, "p50_ms": 100.0, "p95_ms": 300.0, "total_ms": 400.0, "share": 0.133,
+    }
+    assert one["steps"]["pr_ms"]["count"] == 1
+    assert summary["b/two"]["steps"]["clone_ms"]["share"] == 1.0
+
+
+def test_skips_runs_and_steps_without_timings():
+    summary = summarize_timings([
+        _delivery("a/one", None, {"clone_ms": 10.0, "checkout_ms": None}),
+        {"repository": "c/none", "runs": []},
+    ])
+
+    assert summary == {"a/one": {"runs": 1, "steps": {"clone_ms": {
+        "count": 1, "mean_ms": 10.0, "p50_ms": 10.0, "p95_ms": 10.0, "total_ms": 10.0, "share": 1.0,
+    }}}}
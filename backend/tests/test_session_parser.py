@@ -1,10 +1,19 @@
 import json
+import os
+from pathlib import Path
 
 import pytest
 
 from app.domain.models.stream import StreamEvent
-from app.domain.services.session_parser import find_session_file, parse_session_lines, synthesize_result_event
-from app.domain.services.stream_parser import extract_metadata
+from app.domain.services.session_parser import (
+    SessionIndex,
+    analyze_session_file,
+    find_session_file,
+    iter_session_events,
+    parse_session_lines,
+    synthesize_result_event,
+)
+from app.domain.services.stream_parser import extract_metadata, extract_transcript
 
 
 class TestParseSessionLines:
@@ -138,3 +147,143 @@ class TestFindSessionFile:
     def test_returns_none_when_not_found(self, tmp_path):
         result = find_session_file("nonexistent", search_dirs=[tmp_path])
         assert result is None
+
+
+def _session_lines() -> list[str]:
+    return [
+        json.dumps({"type": "system", "subtype": "init", "sessionId": "s1",
+                    "message": {"model": "claude-opus-4-6", "cwd": "/repo"}}),
+        json.dumps({"type": "progress", "sessionId": "s1"}),
+        json.dumps({"type": "user", "sessionId": "s1", "message": {"role": "user", "content": "q"}}),
+        json.dumps({"type": "assistant", "sessionId": "s1", "parentToolUseID": "toolu_abc", "message": {
+            "role": "assistant", "content": [{"type": "text", "text": "sub"}],
+            "usage": {"input_tokens": 10, "output_tokens": 5},
+        }}),
+        "{not json",
+        json.dumps({"type": "assistant", "sessionId": "s1", "message": {
+            "role": "assistant", "content": [{"type": "text", "text": "final"}],
+            "usage": {"input_tokens": 20, "output_tokens": 7},
+        }}),
+    ]
+
+
+class TestIterSessionEvents:
+    def test_is_lazy(self):
+        consumed = []
+
+        def lines():
+            for line in _session_lines():
+                consumed.append(line)
+                yield line
+
+        events = iter_session_events(lines())
+        first = next(events)
+        assert first.subtype == "init"
+        assert len(consumed) == 1
+
+    def test_matches_parse_session_lines(self):
+        assert list(iter_session_events(_session_lines())) == parse_session_lines(_session_lines())
+
+
+class TestAnalyzeSessionFile:
+    def test_matches_list_based_extraction(self, tmp_path):
+        session_file = tmp_path / "s1.jsonl"
+        session_file.write_text("\n".join(_session_lines()) + "\n", encoding="utf-8")
+
+        metadata, transcript = analyze_session_file(session_file)
+
+        events = parse_session_lines(_session_lines())
+        all_events = events + [synthesize_result_event(events)]
+        assert metadata == extract_metadata(all_events)
+        assert transcript == extract_transcript(all_events)
+        assert metadata.result_text == "final"
+        assert metadata.input_tokens == 30
+
+    def test_raises_without_assistant_text(self, tmp_path):
+        session_file = tmp_path / "s1.jsonl"
+        session_file.write_text(_session_lines()[0] + "\n", encoding="utf-8")
+
+        with pytest.raises(ValueError, match="no assistant message text found"):
+            analyze_session_file(session_file)
+
+
+class TestSessionIndex:
+    def _project(self, base, name="proj-hash"):
+        project_dir = base / name
+        project_dir.mkdir()
+        return project_dir
+
+    def test_finds_across_projects(self, tmp_path):
+        self._project(tmp_path, "a")
+        b = self._project(tmp_path, "b")
+        (b / "sess-1.jsonl").write_text("{}")
+
+        index = SessionIndex([tmp_path])
+        assert index.find("sess-1") == b / "sess-1.jsonl"
+        assert index.find("missing") is None
+
+    def test_hit_does_not_rescan(self, tmp_path, monkeypatch):
+        project_dir = self._project(tmp_path)
+        (project_dir / "sess-1.jsonl").write_text("{}")
+        index = SessionIndex([tmp_path])
+        index.find("sess-1")
+
+        monkeypatch.setattr(index, "_refresh", lambda now: pytest.fail("rescanned"))
+        assert index.find("sess-1") == project_dir / "sess-1.jsonl"
+
+    def test_picks_up_new_sessions_and_projects(self, tmp_path):
+        project_dir = self._project(tmp_path)
+        index = SessionIndex([tmp_path])
+        assert index.find("sess-1") is None
+
+        (project_dir / "sess-1.jsonl").write_text("{}")
+        assert index.find("sess-1") == project_dir / "sess-1.jsonl"
+
+        other = self._project(tmp_path, "other")
+        (other / "sess-2.jsonl").write_text("{}")
+        assert index.find("sess-2") == other / "sess-2.jsonl"
+
+    def test_only_changed_directories_are_relisted(self, tmp_path, monkeypatch):
+        dirs = [self._project(tmp_path, f"p{i}") for i in range(3)]
+        index = SessionIndex([tmp_path])
+        index.find("warmup")
+
+        listed = []
+        real_glob = Path.glob
+        monkeypatch.setattr(Path, "glob", lambda self, pattern: listed.append(self) or real_glob(self, pattern))
+        (dirs[1] / "sess-1.jsonl").write_text("{}")
+
+        assert index.find("sess-1") == dirs[1] / "sess-1.jsonl"
+        assert listed == [dirs[1]]
+
+    def test_deleted_session_is_not_returned(self, tmp_path):
+        project_dir = self._project(tmp_path)
+        session_file = project_dir / "sess-1.jsonl"
+        session_file.write_text("{}")
+        index = SessionIndex([tmp_path])
+        assert index.find("sess-1") == session_file
+
+        session_file.unlink()
+        assert index.find("sess-1") is None
+
+    @pytest.mark.parametrize("rescan_interval, found", [(3600, False), (0, True)])
+    def test_periodic_full_rescan(self, tmp_path, rescan_interval, found):
+        project_dir = self._project(tmp_path)
+        index = SessionIndex([tmp_path], rescan_interval=rescan_interval)
+        index.find("warmup")
+
+        # A change the mtime check cannot see
+        stat = project_dir.stat()
+        (project_dir / "sess-1.jsonl").write_text("{}")
+        os.utime(project_dir, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert (index.find("sess-1") is not None) is found
+
+    def test_lru_is_bounded(self, tmp_path):
+        project_dir = self._project(tmp_path)
+        for i in range(5):
+            (project_dir / f"sess-{i}.jsonl").write_text("{}")
+        index = SessionIndex([tmp_path], lru_size=2)
+        for i in range(5):
+            index.find(f"sess-{i}")
+        assert list(index._lru) == ["sess-3", "sess-4"]
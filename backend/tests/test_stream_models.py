@@ -1,4 +1,4 @@
-from app.domain.models.stream import StreamEvent, StreamMetadata
+from app.domain.models.stream import EventRecord, StreamEvent, StreamMetadata
 
 
 class TestStreamEvent:
@@ -57,3 +57,16 @@ class TestStreamMetadata:
         assert meta.model == "claude-opus-4-6"
         assert meta.cost_usd == 0.05
         assert meta.is_success is True
+
+
+class TestEventRecord:
+    def test_defaults_match_stream_event(self):
+        rec = EventRecord("assistant")
+        assert rec.to_model() == StreamEvent(type="assistant")
+
+    def test_to_model_round_trip(self):
+        rec = EventRecord("assistant", None, "toolu_abc", {"role": "assistant"}, "sess-1")
+        ev = rec.to_model()
+        assert ev.parent_tool_use_id == "toolu_abc"
+        assert ev.message == {"role": "assistant"}
+        assert ev.session_id == "sess-1"
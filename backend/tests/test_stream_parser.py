@@ -5,6 +5,7 @@ import pytest
 
 from app.domain.models.stream import StreamEvent
 from app.domain.services.stream_parser import (
+    StreamAnalyzer,
     StreamMetaTracker,
     extract_agent_buckets,
     extract_metadata,
@@ -422,3 +423,77 @@ class TestStreamMetaTracker:
     def test_skips_system_and_result(self):
         tracker = StreamMetaTracker()
         assert tracker.push(StreamEvent(type="result", message={"result": "ok"})) is None
+
+    def test_task_label_applies_when_subagent_appears_later(self):
+        tracker = StreamMetaTracker()
+        tracker.push(StreamEvent(type="assistant", message={
+            "role": "assistant",
+            "content": [{
+                "type": "tool_use", "id": "toolu_abc", "name": "Task",
+                "input": {"description": "Find files", "subagent_type": "Explore"},
+            }],
+        }))
+        meta = tracker.push(StreamEvent(
+            type="assistant", parent_tool_use_id="toolu_abc",
+            message={"role": "assistant", "content": [{"type": "text", "text": "r"}]},
+        ))
+        assert meta["agent_buckets"][1] == {"id": "toolu_abc", "label": "Explore: Find files"}
+
+
+def _run_events() -> list[StreamEvent]:
+    return [
+        StreamEvent(type="system", subtype="init", message={
+            "model": "claude-opus-4-6", "cwd": "/w", "tools": ["Bash"], "skills": ["tdd"],
+            "plugins": [{"name": "p1"}, "p2"], "agents": ["Explore"],
+        }),
+        StreamEvent(type="user", message={"role": "user", "content": "go"}),
+        StreamEvent(type="assistant", message={"role": "assistant", "content": [
+            {"type": "thinking", "thinking": "hmm"},
+            {"type": "tool_use", "id": "toolu_abc", "name": "Task",
+             "input": {"description": "Find files", "subagent_type": "Explore"}},
+            {"type": "tool_use", "id": "toolu_s", "name": "Skill", "input": {"skill": "tdd"}},
+        ]}),
+        StreamEvent(type="assistant", parent_tool_use_id="toolu_abc", message={
+            "role": "assistant", "model": "claude-haiku", "content": [{"type": "text", "text": "found"}],
+        }),
+        StreamEvent(type="progress", message={"step": 1}),
+        StreamEvent(type="user", message={"role": "user", "content": [
+            {"type": "tool_result", "tool_use_id": "toolu_abc", "content": "ok", "extra": 1},
+        ]}),
+        StreamEvent(type="assistant", message={"role": "assistant", "content": [
+            {"type": "text", "text": "first"}, {"type": "text", "text": "second"},
+        ]}),
+    ]
+
+
+class TestStreamAnalyzer:
+    def test_matches_separate_extraction_passes(self):
+        events = _run_events() + [StreamEvent(type="result", message={
+            "result": "done", "total_cost_usd": 0.5, "usage": {"input_tokens": 10, "output_tokens": 20},
+            "duration_ms": 1200, "is_error": False,
+        })]
+        analyzer = StreamAnalyzer()
+        for ev in events:
+            analyzer.push(ev)
+
+        assert analyzer.metadata() == extract_metadata(events)
+        assert analyzer.metadata().used_skills == ["tdd"]
+        assert analyzer.metadata().plugins == ["p1", "p2"]
+        assert analyzer.transcript() == extract_transcript(events)
+        assert analyzer.transcript()["meta"]["agents"]["subagent_toolu_abc"] == {"model": "claude-haiku"}
+        assert analyzer.agent_buckets() == extract_agent_buckets(events)
+
+    def test_falls_back_to_last_assistant_text_without_result(self):
+        analyzer = StreamAnalyzer()
+        for ev in _run_events():
+            analyzer.push(ev)
+
+        meta = analyzer.metadata()
+        assert meta == extract_metadata(_run_events())
+        assert meta.is_success is True
+
+    def test_push_still_emits_live_meta(self):
+        analyzer = StreamAnalyzer()
+        meta = analyzer.push(StreamEvent(type="system", subtype="init", message={"model": "m"}))
+        assert meta == {"model": "m", "agent_buckets": [], "used_skills": []}
+        assert analyzer.push(StreamEvent(type="progress", message={})) is not None
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import threading
+
+import httpx
+import pytest
+import structlog
+from fastapi import FastAPI
+
+from app import tracing
+from app.middleware.logging import RequestLoggingMiddleware
+
+
+@pytest.fixture
+def exporter():
+    exporter = tracing.InMemorySpanExporter()
+    previous = tracing.set_exporter(exporter)
+    yield exporter
+    tracing.set_exporter(previous)
+
+
+class TestSpans:
+    def test_nested_spans_share_trace_and_link_parents(self, exporter):
+        with tracing.span("outer", delivery_id="d1") as outer:
+            with tracing.span("inner") as inner:
+                assert tracing.current_span() is inner
+            assert tracing.current_span() is outer
+        assert tracing.current_span() is None
+
+        inner_done, outer_done = exporter.spans
+        assert inner_done.trace_id == outer_done.trace_id
+        assert inner_done.parent_id == outer_done.span_id
+        assert outer_done.parent_id is None
+        assert outer_done.attributes == {"delivery_id": "d1"}
+        assert outer_done.status == "ok"
+        assert outer_done.duration_ms >= inner_done.duration_ms
+
+    def test_exception_marks_span_as_error(self, exporter):
+        with pytest.raises(RuntimeError):
+            with tracing.span("boom"):
+                raise RuntimeError("clone failed")
+
+        [span] = exporter.spans
+        assert span.status == "error"
+        assert span.error == "clone failed"
+
+    def test_binds_trace_ids_into_structlog_context(self):
+        with tracing.span("outer") as span:
+            bound = structlog.contextvars.get_contextvars()
+            assert bound["trace_id"] == span.trace_id
+            assert bound["span_id"] == span.span_id
+        assert "span_id" not in structlog.contextvars.get_contextvars()
+
+    @pytest.mark.asyncio
+    async def test_propagates_into_threads_and_tasks(self, exporter):
+        def work():
+            with tracing.span("in_thread"):
+                pass
+
+        async def task():
+            with tracing.span("in_task"):
+                await asyncio.sleep(0)
+
+        with tracing.span("root") as root:
+            await asyncio.to_thread(work)
+            await asyncio.create_task(task())
+
+        children = [s for s in exporter.spans if s.name != "root"]
+        assert {s.name for s in children} == {"in_thread", "in_task"}
+        assert all(s.parent_id == root.span_id for s in children)
+
+    def test_no_exporter_is_a_noop(self):
+        previous = tracing.set_exporter(None)
+        try:
+            with tracing.span("quiet") as span:
+                pass
+            assert span.status == "ok"
+        finally:
+            tracing.set_exporter(previous)
+
+
+class TestTraceparent:
+    def test_parses_valid_header(self):
+        header = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+        assert tracing.parse_traceparent(header) == ("4bf92f3577b34da6a3ce929d0e0e4736", "00f067aa0ba902b7")
+
+    @pytest.mark.parametrize("header", [
+        None, "", "garbage", "00-00000000000000000000000000000000-00f067aa0ba902b7-01",
+    ])
+    def test_rejects_invalid_headers(self, header):
+        assert tracing.parse_traceparent(header) is None
+
+    def test_start_span_continues_remote_parent(self):
+        header = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+        span = tracing.start_span("GET /x", traceparent=header)
+        assert span.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+        assert span.parent_id == "00f067aa0ba902b7"
+        assert span.traceparent().startswith("00-4bf92f3577b34da6a3ce929d0e0e4736-")
+
+
+class TestExporters:
+    def test_file_exporter_writes_json_lines(self, tmp_path):
+        path = tmp_path / "traces" / "spans.jsonl"
+        exporter = tracing.FileSpanExporter(path)
+        previous = tracing.set_exporter(exporter)
+        try:
+            with tracing.span("outer"):
+                with tracing.span("inner", step="clone"):
+                    pass
+        finally:
+            tracing.set_exporter(previous)
+            exporter.close()
+
+        records = [json.loads(line) for line in path.read_text().splitlines()]
+        assert [r["name"] for r in records] == ["inner", "outer"]
+        assert records[0]["parentSpanId"] == records[1]["spanId"]
+        assert records[0]["attributes"] == {"step": "clone"}
+        assert records[0]["endTimeUnixNano"] >= records[0]["startTimeUnixNano"]
+
+    def test_file_exporter_writes_off_the_calling_thread(self, tmp_path, monkeypatch):
+        exporter = tracing.FileSpanExporter(tmp_path / "spans.jsonl")
+        writers = set()
+        original = tracing.json_codec.dumps
+
+        def recording_dumps(obj):
+            writers.add(threading.current_thread().name)
+            return original(obj)
+
+        monkeypatch.setattr(tracing.json_codec, "dumps", recording_dumps)
+        previous = tracing.set_exporter(exporter)
+        try:
+            for i in range(100):
+                with tracing.span("step", i=i):
+                    pass
+            exporter.flush()
+            records = [json.loads(line) for line in (tmp_path / "spans.jsonl").read_text().splitlines()]
+        finally:
+            tracing.set_exporter(previous)
+            exporter.close()
+
+        assert [r["attributes"]["i"] for r in records] == list(range(100))
+        assert writers == {"jakeops-span-writer"}
+
+    def test_file_exporter_drops_spans_when_queue_is_full(self, tmp_path, monkeypatch):
+        release = threading.Event()
+        original = tracing.json_codec.dumps
+
+        def stalled_dumps(obj):
+            release.wait()
+            return original(obj)
+
+        monkeypatch.setattr(tracing.json_codec, "dumps", stalled_dumps)
+        exporter = tracing.FileSpanExporter(tmp_path / "spans.jsonl", max_queue=1)
+        before = tracing.SPANS_DROPPED.value()
+        for i in range(5):
+            exporter.export(tracing.start_span("step", i=i))
+        release.set()
+        exporter.close()
+
+        assert tracing.SPANS_DROPPED.value() > before
+
+    def test_configure_from_env(self, monkeypatch, tmp_path):
+        previous = tracing.set_exporter(None)
+        try:
+            monkeypatch.setenv("TRACE_EXPORTER", "file")
+            monkeypatch.setenv("TRACE_FILE", str(tmp_path / "t.jsonl"))
+            tracing.configure_tracing()
+            exporter = tracing.set_exporter(None)
+            assert isinstance(exporter, tracing.FileSpanExporter)
+            exporter.close()
+
+            monkeypatch.setenv("TRACE_EXPORTER", "bogus")
+            with pytest.raises(ValueError):
+                tracing.configure_tracing()
+        finally:
+            tracing.set_exporter(previous)
+
+
+class TestRequestSpan:
+    @pytest.mark.asyncio
+    async def test_request_span_is_named_by_route_and_parents_handler_spans(self, exporter):
+        app = FastAPI()
+        app.add_middleware(RequestLoggingMiddleware)
+
+        @app.get("/api/items/{item_id}")
+        def get_item(item_id: str):
+            with tracing.span("load_item"):
+                return {"id": item_id}
+
+        header = "00-4bf92f3577b34da6a3ce929d0e0e4736-00f067aa0ba902b7-01"
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            response = await client.get("/api/items/abc", headers={"traceparent": header})
+
+        assert response.status_code == 200
+        spans = {s.name: s for s in exporter.spans}
+        request_span = spans["GET /api/items/{item_id}"]
+        assert request_span.trace_id == "4bf92f3577b34da6a3ce929d0e0e4736"
+        assert request_span.parent_id == "00f067aa0ba902b7"
+        assert request_span.attributes["http_status_code"] == 200
+        assert spans["load_item"].parent_id == request_span.span_id
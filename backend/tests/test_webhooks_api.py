@@ -0,0 +1,171 @@
+import hashlib
+import hmac
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.adapters.inbound.webhooks import router, verify_signature
+from app.usecases.delivery_sync import DeliverySyncUseCase
+
+from tests.test_delivery_sync import FakeDeliveryUseCases, FakeGitHubRepo, FakeSourceRepo
+
+SECRET = "s3cret"
+
+# Trimmed recording of a GitHub "issues" webhook delivery
+ISSUE_OPENED = {
+    "action": "opened",
+    "issue": {
+        "url": "https://api.github.com/repos/o/r/issues/42",
+        "html_url": "https://github.com/o/r/issues/42",
+        "id": 1,
+        "number": 42,
+        "title": "Crash on startup",
+        "user": {"login": "octocat", "id": 1},
+        "labels": [],
+        "state": "open",
+        "locked": False,
+        "comments": 0,
+        "created_at": "2026-10-19T01:00:00Z",
+        "updated_at": "2026-10-19T01:00:00Z",
+        "closed_at": None,
+        "body": "Steps to reproduce...",
+    },
+    "repository": {"id": 7, "name": "r", "full_name": "o/r", "private": False},
+    "sender": {"login": "octocat", "id": 1},
+}
+
+
+def _with_action(action: str, state: str) -> dict:
+    payload = json.loads(json.dumps(ISSUE_OPENED))
+    payload["action"] = action
+    payload["issue"]["state"] = state
+    return payload
+
+
+def _sign(body: bytes, secret: str = SECRET) -> str:
+    return "sha256=" + hmac.new(secret.encode(), body, hashlib.sha256).hexdigest()
+
+
+@pytest.fixture
+def delivery_uc():
+    return FakeDeliveryUseCases()
+
+
+@pytest.fixture
+def client(delivery_uc):
+    test_app = FastAPI()
+    test_app.include_router(router, prefix="/api")
+    source_repo = FakeSourceRepo([{"id": "s1", "owner": "o", "repo": "r"}])
+    test_app.state.delivery_sync = DeliverySyncUseCase(FakeGitHubRepo(), source_repo, delivery_uc)
+    test_app.state.github_webhook_secret = SECRET
+    return TestClient(test_app)
+
+
+def _post(client, payload: dict, event: str = "issues", signature: str | None = None):
+    body = json.dumps(payload).encode()
+    return client.post(
+        "/api/webhooks/github",
+        content=body,
+        headers={
+            "Content-Type": "application/json",
+            "X-GitHub-Event": event,
+            "X-Hub-Signature-256": signature or _sign(body),
+        },
+    )
+
+
+def test_verify_signature():
+    body = b'{"zen": "Keep it logically awesome."}'
+    assert verify_signature(SECRET, body, _sign(body))
+    assert not verify_signature(SECRET, body, _sign(body, "other"))
+    assert not verify_signature(SECRET, body, None)
+
+
+def test_opened_creates_delivery(client, delivery_uc):
+    resp = _post(client, ISSUE_OPENED)
+
+    assert resp.status_code == 202
+    assert resp.json()["created"] == 1
+    body = delivery_uc.created[0]
+    assert body.repository == "o/r"
+    assert body.refs[0].label == "#42"
+
+
+def test_closed_closes_delivery(client, delivery_uc):
+    _post(client, ISSUE_OPENED)
+    resp = _post(client, _with_action("closed", "closed"))
+
+    assert resp.json()["closed"] == 1
+    assert len(delivery_uc.closed) == 1
+
+
+def test_redelivered_opened_is_idempotent(client, delivery_uc):
+    _post(client, ISSUE_OPENED)
+    resp = _post(client, ISSUE_OPENED)
+
+    assert resp.json()["created"] == 0
+    assert len(delivery_uc.created) == 1
+
+
+def test_rejects_bad_signature(client, delivery_uc):
+    resp = _post(client, ISSUE_OPENED, signature="sha256=deadbeef")
+
+    assert resp.status_code == 401
+    assert delivery_uc.created == []
+
+
+def test_ignores_unknown_repository(client, delivery_uc):
+    payload = json.loads(json.dumps(ISSUE_OPENED))
+    payload["repository"]["full_name"] = "other/repo"
+    resp = _post(client, payload)
+
+    assert resp.json()["created"] == 0
+    assert delivery_uc.created == []
+
+
+def test_ignores_unhandled_events(client):
+    assert _post(client, {"zen": "hi"}, event="ping").json() == {"status": "pong"}
+    resp = _post(client, _with_action("labeled", "open"))
+    assert resp.json()["status"] == "ignored"
+
+
+def test_unconfigured_secret_is_rejected(client):
+    client.app.state.github_webhook_secret = ""
+    assert _post(client, ISSUE_OPENED).status_code == 503
+
+
+def test_reopened_creates_missing_delivery(client, delivery_uc):
+    resp = _post(client, _with_action("reopened", "open"))
+
+    assert resp.json()["created"] == 1
+    assert len(delivery_uc.created) == 1
+
+
+def test_reopened_after_close_is_a_noop(client, delivery_uc):
+    _post(client, ISSUE_OPENED)
+    _post(client, _with_action("closed", "closed"))
+    resp = _post(client, _with_action("reopened", "open"))
+
+    assert resp.status_code == 202
+    assert resp.json()["created"] == 0
+    assert len(delivery_uc.created) == 1
+
+
+def test_repository_match_is_case_insensitive(client, delivery_uc):
+    payload = json.loads(json.dumps(ISSUE_OPENED))
+    payload["repository"]["full_name"] = "O/R"
+    resp = _post(client, payload)
+
+    assert resp.json()["created"] == 1
+
+
+@pytest.mark.parametrize("issue", [{"number": 42}, "not-an-object", None])
+def test_malformed_issue_is_rejected(client, delivery_uc, issue):
+    payload = json.loads(json.dumps(ISSUE_OPENED))
+    payload["issue"] = issue
+    resp = _post(client, payload)
+
+    assert resp.status_code == 400
+    assert delivery_uc.created == []